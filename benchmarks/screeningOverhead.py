@@ -0,0 +1,103 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+# Measures how long StockConsumer.screenStocks takes for each stock with
+# logging turned off, on made up data that is already cached, and how much
+# of it goes into the work that is not screening at all: formatting
+# DataFrames for log lines, setting up the loggers and suppressing output.
+#
+#   python benchmarks/screeningOverhead.py [stocksCount]
+import cProfile
+import logging
+import multiprocessing
+import os
+import pstats
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import syntheticData
+
+import pkscreener.classes.ConfigManager as ConfigManager
+from pkscreener.classes.CandlePatterns import CandlePatterns
+from pkscreener.classes.log import default_logger
+from pkscreener.classes.ParallelProcessing import StockConsumer
+from pkscreener.classes.Screener import tools
+
+OVERHEADS = {
+    "DataFrame formatting": ("frame.py", "__repr__"),
+    "Logger setup": ("ParallelProcessing.py", "setupLoggers"),
+    "Output suppression": ("SuppressOutput.py", "__enter__"),
+}
+
+
+def hostRef(stocksCount):
+    configManager = ConfigManager.tools()
+    return SimpleNamespace(
+        configManager=configManager,
+        fetcher=None,
+        screener=tools(configManager, default_logger()),
+        candlePatterns=CandlePatterns(),
+        default_logger=default_logger(),
+        objectDictionary=syntheticData.universe(stocksCount),
+        processingCounter=multiprocessing.Value("i", 0),
+        processingResultsCounter=multiprocessing.Value("i", 0),
+        proxyServer=None,
+    )
+
+
+def screenAll(consumer, host):
+    for stock in host.objectDictionary.keys():
+        consumer.screenStocks(
+            0, None, None, 10, 30, 60, 1, 7, len(host.objectDictionary), True,
+            stock, False, False, 1.5, logLevel=logging.NOTSET,
+            dataPrefetched=True, hostRef=host,
+        )
+
+
+def main(stocksCount=100):
+    host = hostRef(stocksCount)
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    screenAll(consumer, host)
+    start = time.perf_counter()
+    screenAll(consumer, host)
+    elapsed = time.perf_counter() - start
+    print(f"{stocksCount} stocks: {elapsed * 1000 / stocksCount:8.2f}ms per stock")
+    profile = cProfile.Profile()
+    profile.runcall(screenAll, consumer, host)
+    stats = pstats.Stats(profile).stats
+    for name, (fileName, functionName) in OVERHEADS.items():
+        cumulative = sum(
+            stat[3]
+            for (path, _, function), stat in stats.items()
+            if path.endswith(fileName) and function == functionName
+        )
+        print(f"{name:>22}: {cumulative * 1000 / stocksCount:8.2f}ms per stock (profiled)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,287 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+# Runs the screening of every scanner, the backtests and the stock data
+# cache on a made up universe of stocks (see syntheticData.py), entirely
+# offline, and reports how many stocks each of them gets through in a
+# second, the percentiles of the time taken for each stock and the peak
+# memory of the process. The numbers can be kept as a baseline to compare
+# later runs against on the same machine:
+#
+#   python benchmarks/suite.py --stocks 500 --save-baseline
+#   python benchmarks/suite.py --stocks 500
+#
+# A run that is more than --tolerance percent slower than the baseline for
+# any of the benchmarks is reported as a regression and exits with 1.
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from tabulate import tabulate
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import syntheticData
+
+import pkscreener.classes.ConfigManager as ConfigManager
+from pkscreener.classes.Backtest import BacktestResults, backtest, backtestSummary
+from pkscreener.classes.CandlePatterns import CandlePatterns
+from pkscreener.classes.log import default_logger
+from pkscreener.classes.ParallelProcessing import StockConsumer
+from pkscreener.classes.Screener import tools
+from pkscreener.classes.StockDataStore import StockDataStore
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+ROWS = {"1d": 280, "1m": 5 * syntheticData.MINUTES_PER_DAY}
+
+# (name, executeOption, reversalOption, maLength, respChartPattern) of
+# every scanner in the X menu
+SCANS = (
+    [(f"X-{option}", option, None, None, 1) for option in range(0, 6)]
+    + [
+        (f"X-6-{reversal}", 6, reversal, {4: 50, 6: 4}.get(reversal), 1)
+        for reversal in range(1, 7)
+    ]
+    + [(f"X-7-{pattern}", 7, None, None, pattern) for pattern in range(1, 6)]
+    + [(f"X-{option}", option, None, None, 1) for option in range(8, 21)]
+)
+
+
+# Whether the benchmark is one of those asked for with --only, so that X-6
+# picks X-6-1 to X-6-6 but X-1 does not pick X-10
+def selected(name, only):
+    return not only or name == only or name.startswith((f"{only}-", f"{only} "))
+
+
+def peakMemory():
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def hostRef(objectDictionary):
+    configManager = ConfigManager.tools()
+    return SimpleNamespace(
+        configManager=configManager,
+        fetcher=None,
+        screener=tools(configManager, default_logger()),
+        candlePatterns=CandlePatterns(),
+        default_logger=default_logger(),
+        objectDictionary=objectDictionary,
+        processingCounter=multiprocessing.Value("i", 0),
+        processingResultsCounter=multiprocessing.Value("i", 0),
+        proxyServer=None,
+    )
+
+
+def total(name, stocks, elapsed):
+    return {
+        "Benchmark": name,
+        "Stocks/s": len(stocks) / elapsed if elapsed > 0 else None,
+        "p50 (ms)": None,
+        "p95 (ms)": None,
+        "p99 (ms)": None,
+        "Peak RSS (MB)": peakMemory(),
+    }
+
+
+def measure(name, stocks, run):
+    latencies = []
+    start = time.perf_counter()
+    for stock in stocks:
+        stockStart = time.perf_counter()
+        run(stock)
+        latencies.append(time.perf_counter() - stockStart)
+    elapsed = time.perf_counter() - start
+    return {
+        "Benchmark": name,
+        "Stocks/s": len(stocks) / elapsed if elapsed > 0 else None,
+        "p50 (ms)": np.percentile(latencies, 50) * 1000,
+        "p95 (ms)": np.percentile(latencies, 95) * 1000,
+        "p99 (ms)": np.percentile(latencies, 99) * 1000,
+        "Peak RSS (MB)": peakMemory(),
+    }
+
+
+def screenStocks(consumer, host, scan, backtestDuration=0, backtest=False):
+    _, executeOption, reversalOption, maLength, respChartPattern = scan
+    screen = consumer.backtestStocks if backtest else consumer.screenStocks
+    return lambda stock: screen(
+        executeOption, reversalOption, maLength, 10, 30, 60, respChartPattern, 7,
+        len(host.objectDictionary), True, stock, False, False, 2.5,
+        backtestDuration=backtestDuration, backtestPeriodToLookback=30,
+        logLevel=logging.NOTSET, dataPrefetched=True, hostRef=host,
+    )
+
+
+def screeningBenchmarks(host, stocks, only):
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    # The first stocks to be screened pay for the imports and the set up
+    # of the loggers, which is not what is being measured
+    warmUp = screenStocks(consumer, host, SCANS[0])
+    for stock in stocks[:5]:
+        warmUp(stock)
+    results = []
+    for scan in SCANS:
+        if not selected(scan[0], only):
+            continue
+        results.append(measure(scan[0], stocks, screenStocks(consumer, host, scan)))
+    return results
+
+
+def backtestBenchmarks(host, stocks, backtestDays):
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    # The results of the full screening of each stock for each of the days
+    # are what gets backtested
+    screen = screenStocks(
+        consumer, host, SCANS[0], backtestDuration=backtestDays, backtest=True
+    )
+    screened = {}
+    results = [
+        measure(
+            f"B-0 ({backtestDays} days)",
+            stocks,
+            lambda stock: screened.update({stock: screen(stock)}),
+        )
+    ]
+    start = time.perf_counter()
+    backTestedData = None
+    for stock in stocks:
+        for result in screened[stock]:
+            backTestedData = backtest(
+                result[3], result[2], result[0], 30, backTestedData=backTestedData
+            )
+    results.append(total("backtest", stocks, time.perf_counter() - start))
+    start = time.perf_counter()
+    backtestResults = BacktestResults()
+    for stock in stocks:
+        for result in screened[stock]:
+            backtestResults.add(result[3], result[2], result[0], 30)
+    results.append(total("BacktestResults.add", stocks, time.perf_counter() - start))
+    start = time.perf_counter()
+    backtestSummary(backTestedData)
+    results.append(total("backtestSummary", stocks, time.perf_counter() - start))
+    return results
+
+
+def cacheBenchmarks(objectDictionary, stocks):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        filePath = os.path.join(directory, "stock_data.pkl")
+        start = time.perf_counter()
+        StockDataStore.save(objectDictionary, filePath)
+        results.append(total("Cache save", stocks, time.perf_counter() - start))
+        start = time.perf_counter()
+        store = StockDataStore(filePath)
+        store.toDict()
+        results.append(total("Cache load", stocks, time.perf_counter() - start))
+        results.append(measure("Cache get", stocks, store.get))
+        store.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for result in results:
+        expected = baseline.get(result["Benchmark"])
+        if expected is None or result["Stocks/s"] is None:
+            result["Baseline"] = ""
+            continue
+        change = (result["Stocks/s"] / expected - 1) * 100
+        result["Baseline"] = f"{change:+.1f}%"
+        if change < -tolerance:
+            regressions.append(result["Benchmark"])
+    return regressions
+
+
+def readBaselines(filePath):
+    try:
+        with open(filePath) as f:
+            return json.load(f)
+    except Exception as e:
+        default_logger().debug(e, exc_info=True)
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stocks", type=int, default=50, help="Number of stocks (50 to 3000)")
+    parser.add_argument("--interval", choices=ROWS.keys(), default="1d", help="Daily or 1 minute bars")
+    parser.add_argument("--only", default="", help="Only the benchmarks whose name starts with this, like X-6, B or Cache")
+    parser.add_argument("--backtest-days", type=int, default=30, help="Days to backtest each stock for")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="File with the baselines")
+    parser.add_argument("--save-baseline", action="store_true", help="Keep this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=10, help="Slowdown in percent that is a regression")
+    args = parser.parse_args(argv)
+
+    objectDictionary = syntheticData.universe(
+        args.stocks, rows=ROWS[args.interval], interval=args.interval
+    )
+    stocks = list(objectDictionary.keys())
+    host = hostRef(objectDictionary)
+    results = screeningBenchmarks(host, stocks, args.only)
+    if selected("B-0", args.only):
+        results += backtestBenchmarks(host, stocks, args.backtest_days)
+    if selected("Cache save", args.only):
+        results += cacheBenchmarks(objectDictionary, stocks)
+
+    key = f"{args.interval}-{args.stocks}"
+    baselines = readBaselines(args.baseline)
+    regressions = compare(results, baselines.get(key, {}), args.tolerance)
+    print(f"{args.stocks} stocks, {args.interval} bars")
+    print(tabulate(results, headers="keys", tablefmt="psql", floatfmt=".2f"))
+    if args.save_baseline:
+        baselines[key] = {
+            result["Benchmark"]: result["Stocks/s"]
+            for result in results
+            if result["Stocks/s"] is not None
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved the baseline for {key} in {args.baseline}")
+    elif len(regressions) > 0:
+        print(f"Slower than the baseline by more than {args.tolerance}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
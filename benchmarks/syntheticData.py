@@ -0,0 +1,97 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+# A made up universe of NSE-like stocks for the benchmarks, so that they
+# run without any network and give the same data for the same seed every
+# time. Prices follow a random walk with a drift of their own for each
+# stock and now and then a regime change, so that every kind of scanner
+# finds something in them.
+import numpy as np
+import pandas as pd
+
+# The last day of the data, so that the dates don't depend on when the
+# benchmarks are run
+LAST_DAY = "2023-12-29"
+MINUTES_PER_DAY = 375
+
+
+def symbols(stocksCount):
+    return [f"SYN{index:04d}" for index in range(stocksCount)]
+
+
+def dailyIndex(rows):
+    return pd.bdate_range(end=LAST_DAY, periods=rows)
+
+
+def minuteIndex(rows):
+    days = -(-rows // MINUTES_PER_DAY)
+    index = pd.DatetimeIndex(
+        [
+            timestamp
+            for day in pd.bdate_range(end=LAST_DAY, periods=days)
+            for timestamp in pd.date_range(
+                day + pd.Timedelta(hours=9, minutes=15),
+                periods=MINUTES_PER_DAY,
+                freq="min",
+            )
+        ]
+    )
+    return index[-rows:]
+
+
+def stockData(rng, index, volatility=0.02):
+    rows = len(index)
+    drift = rng.normal(0, volatility / 10)
+    regimes = np.cumsum(rng.random(rows) < 0.02)
+    regimeDrift = rng.normal(0, volatility / 5, regimes[-1] + 1)[regimes]
+    returns = rng.normal(drift, volatility, rows) + regimeDrift
+    close = rng.uniform(50, 3000) * np.exp(np.cumsum(returns))
+    open = close * (1 + rng.normal(0, volatility / 2, rows))
+    high = np.maximum(open, close) * (1 + np.abs(rng.normal(0, volatility / 2, rows)))
+    low = np.minimum(open, close) * (1 - np.abs(rng.normal(0, volatility / 2, rows)))
+    volume = rng.lognormal(11, 1, rows).round()
+    return pd.DataFrame(
+        {
+            "Open": open,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": volume,
+        },
+        index=index,
+    )
+
+
+# Returns a dict of symbol -> DataFrame.to_dict("split"), which is how the
+# stock data is cached and handed to the workers. interval is "1d" (rows
+# business days) or "1m" (rows one-minute bars of the trading sessions).
+def universe(stocksCount, rows=280, interval="1d", seed=42):
+    rng = np.random.default_rng(seed)
+    index = minuteIndex(rows) if interval == "1m" else dailyIndex(rows)
+    volatility = 0.002 if interval == "1m" else 0.02
+    return {
+        symbol: stockData(rng, index, volatility).to_dict("split")
+        for symbol in symbols(stocksCount)
+    }
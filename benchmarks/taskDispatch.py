@@ -0,0 +1,106 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+# Measures how long it takes to get tasks through the worker processes when
+# the tasks themselves take no time, which is all the overhead of putting
+# the tasks and their results through the queues. The tasks are sent one
+# stock at a time, as they used to be, and then in batches of stocks.
+#
+#   python benchmarks/taskDispatch.py [stocksCount] [workersCount]
+import logging
+import multiprocessing
+import sys
+import time
+
+from pkscreener.classes.PKMultiProcessorClient import PKMultiProcessorClient
+from pkscreener.classes.PKTaskBatch import STOCK_INDEX, PKTaskBatch, taskBatches
+
+
+# Does nothing, but returns a result the size of a screened stock
+def noOperation(*args):
+    stock = args[STOCK_INDEX]
+    return ({"Stock": stock, "LTP": 100.0}, {"Stock": stock, "LTP": 100.0}, None, stock, 0)
+
+
+def taskParameters():
+    return (1, None, None, None, 0, 100, None, 7, 2000, True, None, False,
+            False, 2.5, False, False, 0, 30, logging.NOTSET, False, True)
+
+
+def dispatch(items, expectedCount, workersCount):
+    tasks_queue = multiprocessing.JoinableQueue()
+    results_queue = multiprocessing.Queue()
+    keyboardInterruptEvent = multiprocessing.Event()
+    consumers = [
+        PKMultiProcessorClient(
+            noOperation,
+            tasks_queue,
+            results_queue,
+            multiprocessing.Value("i", 1),
+            multiprocessing.Value("i", 0),
+            {},
+            None,
+            keyboardInterruptEvent,
+            logging.getLogger("benchmark"),
+        )
+        for _ in range(workersCount)
+    ]
+    for consumer in consumers:
+        consumer.daemon = True
+        consumer.start()
+    start = time.perf_counter()
+    for item in items:
+        tasks_queue.put(item)
+    received = 0
+    while received < expectedCount:
+        result = results_queue.get()
+        received += len(result) if isinstance(result, list) else 1
+    elapsed = time.perf_counter() - start
+    for _ in consumers:
+        tasks_queue.put(None)
+    for consumer in consumers:
+        consumer.join(timeout=10)
+    return elapsed
+
+
+def main(stocksCount=2000, workersCount=None):
+    workersCount = workersCount or max(2, multiprocessing.cpu_count() - 1)
+    symbols = [f"STOCK{index}" for index in range(stocksCount)]
+    parameters = taskParameters()
+    single = [next(PKTaskBatch(parameters, [symbol]).tasks()) for symbol in symbols]
+    batches = taskBatches([parameters], symbols, workersCount)
+    timings = {
+        "one stock per task": dispatch(single, stocksCount, workersCount),
+        f"{len(batches[0])} stocks per task": dispatch(batches, stocksCount, workersCount),
+    }
+    print(f"{stocksCount} stocks, {workersCount} workers")
+    for name, elapsed in timings.items():
+        print(
+            f"{name:>22}: {elapsed:8.3f}s in all, {elapsed * 1e6 / stocksCount:8.1f}us per stock"
+        )
+    return timings
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -33,7 +33,6 @@
 
 import requests
 from dotenv import dotenv_values
-from telegram.constants import ParseMode
 
 import pkscreener.classes.ConfigManager as ConfigManager
 from pkscreener.classes.log import default_logger
@@ -113,7 +112,13 @@ def send_exception(ex, extra_mes=""):
         return
 
 
-def send_message(message, userID=None, parse_type=ParseMode.HTML, list_png=None, retrial=False):
+# telegram is only imported when something is sent, because importing it
+# slows down the start of the application
+def send_message(message, userID=None, parse_type=None, list_png=None, retrial=False):
+    from telegram.constants import ParseMode
+
+    if parse_type is None:
+        parse_type = ParseMode.HTML
     initTelegram()
     # botsUrl = f"https://api.telegram.org/bot{TOKEN}"  # + "/sendMessage?chat_id={}&text={}".format(chat_idLUISL, message_aler, parse_mode=ParseMode.HTML)
     # url = botsUrl + "/sendMessage?chat_id={}&text={}&parse_mode={parse_mode}".format(chat_idLUISL, message_aler,parse_mode=ParseMode.MARKDOWN_V2)
@@ -153,6 +158,8 @@ def send_message(message, userID=None, parse_type=ParseMode.HTML, list_png=None,
 
 
 def send_photo(photoFilePath, message="", message_id=None, userID=None, retrial=False):
+    from telegram.constants import ParseMode
+
     initTelegram()
     if not is_token_telegram_configured():
         return
@@ -194,6 +201,8 @@ def send_photo(photoFilePath, message="", message_id=None, userID=None, retrial=
 def send_document(
     documentFilePath, message="", message_id=None, retryCount=0, userID=None
 ):
+    from telegram.constants import ParseMode
+
     initTelegram()
     if not is_token_telegram_configured():
         return
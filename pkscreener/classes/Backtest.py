@@ -24,6 +24,8 @@
 """
 import warnings
 
+import numpy as np
+
 warnings.simplefilter("ignore", DeprecationWarning)
 warnings.simplefilter("ignore", FutureWarning)
 import pandas as pd
@@ -34,9 +36,42 @@ from pkscreener.classes.ConfigManager import parser, tools
 configManager = tools()
 configManager.getConfig(parser)
 
+BACKTEST_COLUMNS = [
+    "Stock",
+    "Base-Date",
+    "Volume",
+    "Trend",
+    "MA-Signal",
+    "1-Pd",
+    "2-Pd",
+    "3-Pd",
+    "4-Pd",
+    "5-Pd",
+    "10-Pd",
+    "15-Pd",
+    "22-Pd",
+    "30-Pd",
+    "SellSignal",
+]
+
 def backtest(
     stock, data, screenedDict=None, periods=30, sampleDays=configManager.backtestPeriod, backTestedData=None, sellSignal=False
 ):
+    backTestedStock = backtestRecord(stock, data, screenedDict, periods, sellSignal)
+    if backTestedStock is None:
+        return backTestedData
+    df = pd.DataFrame([backTestedStock], columns=BACKTEST_COLUMNS)
+    if backTestedData is None:
+        return df
+    try:
+        backTestedData = pd.concat([backTestedData, df])
+    except Exception:
+        pass
+    return backTestedData
+
+# The backtest result of a stock for one day as a record with the columns
+# in BACKTEST_COLUMNS
+def backtestRecord(stock, data, screenedDict=None, periods=30, sellSignal=False):
     if stock == "" or data is None:
         print(f"No data/stock{(stock)} received for backtesting!")
         return
@@ -44,7 +79,6 @@ def backtest(
         print(f"{(stock)}No backtesting strategy or screened dictionary received!")
         return
     calcPeriods = [1, 2, 3, 4, 5, 10, 15, 22, 30]
-    allStockBacktestData = []
     # Take the data based on which the result set for a strategy may have been arrived at
     # The results must have been arrived at with data based on configManager.backtestPeriod -sampleDays
     # but we also need the periods days to be able to calculate the next few days' returns
@@ -54,143 +88,181 @@ def backtest(
     # s1    d3  ^
     #   ....    |
     # s1    dn  |----------------We need to make calculations upto 30 day period from d2
-    previous_recent = data.head(
-        1
-    )  # This is the row which has the date for which the recommendation is valid
-    previous_recent.reset_index(inplace=True)
-    if len(previous_recent) <= 0:
-        return backTestedData
+    if len(data) <= 0:
+        return
     # Let's check the returns for the given strategy over a period ranging from 1 period to 30 periods.
-    if backTestedData is None:
-        backTestedData = pd.DataFrame(
-            columns=[
-                "Stock",
-                "Base-Date",
-                "Volume",
-                "Trend",
-                "MA-Signal",
-                "1-Pd",
-                "2-Pd",
-                "3-Pd",
-                "4-Pd",
-                "5-Pd",
-                "10-Pd",
-                "15-Pd",
-                "22-Pd",
-                "30-Pd",
-            ]
-        )
     backTestedStock = {
-        "Stock": "",
-        "Base-Date": "",
-        "Volume": "",
-        "Trend": "",
-        "MA-Signal": "",
-        "1-Pd": "",
-        "2-Pd": "",
-        "3-Pd": "",
-        "4-Pd": "",
-        "5-Pd": "",
-        "10-Pd": "",
-        "15-Pd": "",
-        "22-Pd": "",
-        "30-Pd": "",
+        "Stock": stock,
+        # This is the row which has the date for which the recommendation is valid
+        "Base-Date": str(data.index[0]).split(" ")[0],
+        "Volume": screenedDict["Volume"],
+        "Trend": screenedDict["Trend"],
+        "MA-Signal": screenedDict["MA-Signal"],
+        "1-Pd": np.nan,
+        "2-Pd": np.nan,
+        "3-Pd": np.nan,
+        "4-Pd": np.nan,
+        "5-Pd": np.nan,
+        "10-Pd": np.nan,
+        "15-Pd": np.nan,
+        "22-Pd": np.nan,
+        "30-Pd": np.nan,
+        "SellSignal": sellSignal,
     }
-    backTestedStock["Stock"] = stock
-    backTestedStock["Base-Date"] = str(previous_recent.iloc[:, 0][0]).split(" ")[
-        0
-    ]  # Date or index column
-    backTestedStock["Volume"] = screenedDict["Volume"]
-    backTestedStock["Trend"] = screenedDict["Trend"]
-    backTestedStock["MA-Signal"] = screenedDict["MA-Signal"]
+    # The returns are kept as numbers. They get their colours only when
+    # they are shown (see formattedBacktestResults).
+    close = data["Close"].to_numpy(dtype=float)
     for prd in calcPeriods:
-        if abs(prd) <= periods:
-            try:
-                rolling_pct = data["Close"].pct_change(periods=prd) * 100
-                pct_change = rolling_pct.iloc[prd]
-                if not sellSignal:
-                    colored_pct = colorText.GREEN if pct_change >= 0 else colorText.FAIL
-                else:
-                    colored_pct = colorText.FAIL if pct_change >= 0 else colorText.GREEN
-                backTestedStock[f"{abs(prd)}-Pd"] = (
-                    colored_pct
-                    + "%.2f%%" % pct_change
-                    + colorText.END
-                )
-            except Exception:
-                continue
-        # else:
-        #     del backTestedStock[f"{abs(prd)}-Pd"]
-        #     try:
-        #         backTestedData = backTestedData.drop(f"{abs(prd)}-Pd", axis=1)
-        #     except Exception:
-        #         continue
-    allStockBacktestData.append(backTestedStock)
-    df = pd.DataFrame(allStockBacktestData, columns=backTestedData.columns)
-    try:
-        backTestedData = pd.concat([backTestedData, df])
-    except Exception:
-        pass
-    return backTestedData
+        if abs(prd) <= periods and prd < len(close):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                backTestedStock[f"{abs(prd)}-Pd"] = (close[prd] / close[0] - 1) * 100
+    return backTestedStock
+
+# Collects the backtest results as records and makes a DataFrame out of
+# them only when it is asked for. Adding a result does not copy the results
+# collected so far, and the results added since the last dump as well as
+# the summary can be worked out from the new results alone.
+class BacktestResults:
+    def __init__(self):
+        self.records = []
+        self.dumpedCount = 0
+        self.summarizedCount = 0
+        self.counts = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, stock, data, screenedDict=None, periods=30, sellSignal=False):
+        backTestedStock = backtestRecord(stock, data, screenedDict, periods, sellSignal)
+        if backTestedStock is not None:
+            self.records.append(backTestedStock)
+
+    def dataFrame(self, start=0):
+        return pd.DataFrame(self.records[start:], columns=BACKTEST_COLUMNS)
+
+    # The results that have been added since this was called the last time
+    def newDataFrame(self):
+        df = self.dataFrame(self.dumpedCount)
+        self.dumpedCount = len(self.records)
+        return df
+
+    def summary(self):
+        if self.summarizedCount < len(self.records):
+            counts = backtestCounts(self.dataFrame(self.summarizedCount))
+            if self.counts is not None:
+                counts = {
+                    key: self.counts[key].add(value, fill_value=0)
+                    for key, value in counts.items()
+                }
+            self.counts = counts
+            self.summarizedCount = len(self.records)
+        if self.counts is None:
+            return
+        return summaryFromCounts(self.counts)
+
+# Whether each return is a win for the strategy. A rise is a win for a buy
+# signal and a fall is a win for a sell signal.
+def backtestWins(df, periodColumns):
+    returns = df[periodColumns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    if "SellSignal" in df.columns:
+        sellSignal = df["SellSignal"].fillna(False).to_numpy(dtype=bool)
+    else:
+        sellSignal = np.zeros(len(df), dtype=bool)
+    sellSignal = sellSignal[:, np.newaxis]
+    wins = np.where(sellSignal, returns < 0, returns >= 0)
+    return returns, wins, ~np.isnan(returns), np.where(sellSignal, -returns, returns)
+
+# Number of wins and trades and the sum of the returns of the strategy (a
+# fall counting as a gain for a sell signal) of each stock for each period
+def backtestCounts(df):
+    periodColumns = [col for col in df.keys() if str(col).endswith("-Pd")]
+    _, wins, trades, strategyReturns = backtestWins(df, periodColumns)
+    stocks = df["Stock"].to_numpy() if "Stock" in df.columns else df.index.get_level_values("Stock")
+
+    def grouped(values):
+        return pd.DataFrame(values, columns=periodColumns).groupby(stocks).sum()
+
+    return {
+        "Wins": grouped(wins & trades),
+        "Trades": grouped(trades),
+        "Returns": grouped(np.where(trades, strategyReturns, 0)),
+    }
+
+# Number of wins and trades, the win rate and the average return of the
+# strategy of each stock for each period. The columns are indexed by
+# (statistic, period).
+def backtestStatistics(df):
+    if df is None:
+        return
+    return statisticsFromCounts(backtestCounts(df))
+
+def statisticsFromCounts(counts):
+    wins = counts["Wins"].astype(int)
+    trades = counts["Trades"].astype(int)
+    statistics = pd.concat(
+        {
+            "Wins": wins,
+            "Trades": trades,
+            "WinRate": wins * 100 / trades.where(trades > 0),
+            "AverageReturn": counts["Returns"] / trades.where(trades > 0),
+        },
+        axis=1,
+    )
+    statistics.index.name = "Stock"
+    return statistics
 
 def backtestSummary(df):
-    summary = {}
-    overall = {}
-    summaryList = []
-    net_positives = 0
-    net_negatives = 0
     if df is None:
         return
-    df.drop_duplicates()
-    df_grouped = df.groupby('Stock')
-    for col in df.keys():
-        if str(col).endswith('-Pd'):
-            overall[col] = [0,0]
-    # iterate over each group of stock rows
-    for stock_name, df_group in df_grouped:
-        # for row_index, row in df_group.iterrows():
-        group_positives = 0
-        group_negatives = 0
-        summary['Stock'] = stock_name
-        for col in df_group.keys():
-            if str(col).endswith('-Pd'):
-                col_positives = df_group[col].astype(str).str.count(colorText.GREEN.replace('[','\[')).sum()
-                col_negatives = df_group[col].astype(str).str.count(colorText.FAIL.replace('[','\[')).sum()
-                group_positives += col_positives
-                group_negatives += col_negatives
-                overall[col] = [overall[col][0] + col_positives, overall[col][1] + col_negatives]
-                overAllPeriodPrediction = (col_positives*100/(col_positives+col_negatives))
-                if col_positives+col_negatives == 0:
-                    summary[col] = "-"
-                else:
-                    summary[col] = f'{formattedOutput(overAllPeriodPrediction)} of ({col_positives+col_negatives})'
-        overAllRowPrediction = (group_positives*100/(group_positives+group_negatives))
-        if group_positives+group_negatives == 0:
-            summary['Overall'] = "-"
-        else:
-            summary['Overall'] = f'{formattedOutput(overAllRowPrediction)} of ({group_positives+group_negatives})'
+    return summaryFromCounts(backtestCounts(df))
+
+def summaryFromCounts(counts):
+    statistics = statisticsFromCounts(counts)
+    periodColumns = list(statistics["Wins"].columns)
+    wins = statistics["Wins"]
+    trades = statistics["Trades"]
+    summaryList = []
+    for stock_name in statistics.index:
+        summary = {"Stock": stock_name}
+        for col in periodColumns:
+            summary[col] = summaryOutput(wins.at[stock_name, col], trades.at[stock_name, col])
+        summary["Overall"] = summaryOutput(wins.loc[stock_name].sum(), trades.loc[stock_name].sum())
         summaryList.append(summary)
-        summary = {}
-        net_positives += group_positives
-        net_negatives += group_negatives
-    
     # Now prepare overall summary
-    summary['Stock'] = 'SUMMARY'
-    for col in overall.keys():
-        col_positives = overall[col][0]
-        col_negatives = overall[col][1]
-        if col_positives+col_negatives == 0:
-            summary[col] = "-"
-        else:
-            summary[col] = f'{formattedOutput((col_positives*100/(col_positives+col_negatives)))} of ({col_positives+col_negatives})'
-    if net_positives+net_negatives == 0:
-        summary['Overall'] = "-"
-    else:
-        summary['Overall'] = f'{formattedOutput(net_positives*100/(net_positives+net_negatives))} of ({net_positives+net_negatives})'
+    summary = {"Stock": "SUMMARY"}
+    for col in periodColumns:
+        summary[col] = summaryOutput(wins[col].sum(), trades[col].sum())
+    summary["Overall"] = summaryOutput(wins.to_numpy().sum(), trades.to_numpy().sum())
     summaryList.append(summary)
     summary_df = pd.DataFrame(summaryList, columns=summary.keys())
     return summary_df
 
+def summaryOutput(wins, trades):
+    if trades == 0:
+        return "-"
+    return f"{formattedOutput(wins * 100 / trades)} of ({trades})"
+
+# The backtest results as they are shown, with each return coloured by
+# whether it is a win for the strategy.
+def formattedBacktestResults(df):
+    if df is None:
+        return
+    df = df.copy()
+    periodColumns = [col for col in df.keys() if str(col).endswith("-Pd")]
+    returns, wins, _, _ = backtestWins(df, periodColumns)
+    for i, col in enumerate(periodColumns):
+        df[col] = [
+            ""
+            if np.isnan(value)
+            else (colorText.GREEN if win else colorText.FAIL)
+            + "%.2f%%" % value
+            + colorText.END
+            for value, win in zip(returns[:, i], wins[:, i])
+        ]
+    if "SellSignal" in df.columns:
+        df.drop("SellSignal", axis=1, inplace=True)
+    return df
+
 def formattedOutput(outcome):
     if outcome >= 80:
         return f'{colorText.GREEN}{"%.2f%%" % outcome}{colorText.END}'
@@ -29,8 +29,138 @@
  *  Description         :   Class for analyzing candle-stick patterns
 """
 
+import numpy as np
+
 from pkscreener.classes.ColorText import colorText
 from pkscreener.classes.Pktalib import pktalib
+from pkscreener.classes.StageTimings import timed
+
+
+# findPattern looks at the last 4 candles of a stock
+CANDLES = 4
+
+
+# How each of the patterns that findPattern looks for is reported when it is
+# found, from the highest priority to the lowest: the color, the name shown
+# and the name saved when the pattern is bullish (TA-Lib returns > 0), and
+# the same when it is bearish (< 0).
+def sameEitherWay(color, name):
+    return (color, name, name), (color, name, name)
+
+
+PATTERNS = [
+    ("CDLDOJI", *sameEitherWay("", "Doji")),
+    ("CDLMORNINGSTAR", *sameEitherWay(colorText.GREEN, "Morning Star")),
+    ("CDLMORNINGDOJISTAR", *sameEitherWay(colorText.GREEN, "Morning Doji Star")),
+    ("CDLEVENINGSTAR", *sameEitherWay(colorText.FAIL, "Evening Star")),
+    ("CDLEVENINGDOJISTAR", *sameEitherWay(colorText.FAIL, "Evening Doji Star")),
+    (
+        "CDLLADDERBOTTOM",
+        (colorText.GREEN, "Ladder Bottom", "Bullish Ladder Bottom"),
+        (colorText.FAIL, "Ladder Bottom", "Bearish Ladder Bottom"),
+    ),
+    (
+        "CDL3LINESTRIKE",
+        (colorText.GREEN, "3 Line Strike", "3 Line Strike"),
+        (colorText.FAIL, "3 Line Strike", "3 Line Strike"),
+    ),
+    ("CDL3BLACKCROWS", *sameEitherWay(colorText.FAIL, "3 Black Crows")),
+    (
+        "CDL3INSIDE",
+        (colorText.GREEN, "3 Outside Up", "3 Inside Up"),
+        (colorText.FAIL, "3 Outside Down", "3 Inside Down"),
+    ),
+    (
+        "CDL3OUTSIDE",
+        (colorText.GREEN, "3 Outside Up", "3 Outside Up"),
+        (colorText.FAIL, "3 Outside Down", "3 Outside Down"),
+    ),
+    ("CDL3WHITESOLDIERS", *sameEitherWay(colorText.GREEN, "3 White Soldiers")),
+    (
+        "CDLHARAMI",
+        (colorText.GREEN, "Bullish Harami", "Bullish Harami"),
+        (colorText.FAIL, "Bearish Harami", "Bearish Harami"),
+    ),
+    (
+        "CDLHARAMICROSS",
+        (colorText.GREEN, "Bullish Harami Cross", "Bullish Harami Cross"),
+        (colorText.FAIL, "Bearish Harami Cross", "Bearish Harami Cross"),
+    ),
+    (
+        "CDLMARUBOZU",
+        (colorText.GREEN, "Bullish Marubozu", "Bullish Marubozu"),
+        (colorText.FAIL, "Bearish Marubozu", "Bearish Marubozu"),
+    ),
+    ("CDLHANGINGMAN", *sameEitherWay(colorText.FAIL, "Hanging Man")),
+    ("CDLHAMMER", *sameEitherWay(colorText.GREEN, "Hammer")),
+    ("CDLINVERTEDHAMMER", *sameEitherWay(colorText.GREEN, "Inverted Hammer")),
+    ("CDLSHOOTINGSTAR", *sameEitherWay(colorText.FAIL, "Shooting Star")),
+    ("CDLDRAGONFLYDOJI", *sameEitherWay(colorText.GREEN, "Dragonfly Doji")),
+    ("CDLGRAVESTONEDOJI", *sameEitherWay(colorText.FAIL, "Gravestone Doji")),
+    (
+        "CDLENGULFING",
+        (colorText.GREEN, "Bullish Engulfing", "Bullish Engulfing"),
+        (colorText.FAIL, "Bearish Engulfing", "Bearish Engulfing"),
+    ),
+]
+
+
+# TA-Lib's candle colors: 1 for white (close >= open) and -1 for black
+def candleColor(open, close, candle):
+    return np.where(close[:, candle] >= open[:, candle], 1, -1)
+
+
+# TA-Lib's CDL3OUTSIDE at the last candle: the middle candle engulfs the
+# first one and the last candle closes beyond it in the same direction.
+def threeOutside(open, high, low, close):
+    first = candleColor(open, close, -3)
+    second = candleColor(open, close, -2)
+    up = (
+        (second == 1)
+        & (first == -1)
+        & (close[:, -2] > open[:, -3])
+        & (open[:, -2] < close[:, -3])
+        & (close[:, -1] > close[:, -2])
+    )
+    down = (
+        (second == -1)
+        & (first == 1)
+        & (open[:, -2] > close[:, -3])
+        & (close[:, -2] < open[:, -3])
+        & (close[:, -1] < close[:, -2])
+    )
+    return np.where(up | down, second * 100, 0)
+
+
+# TA-Lib's CDLENGULFING at the last candle: its body engulfs the body of the
+# candle before, which has the other color. Only one end may be level.
+def engulfing(open, high, low, close):
+    previous = candleColor(open, close, -2)
+    last = candleColor(open, close, -1)
+    o, c = open[:, -1], close[:, -1]
+    po, pc = open[:, -2], close[:, -2]
+    white = (
+        (last == 1)
+        & (previous == -1)
+        & (((c >= po) & (o < pc)) | ((c > po) & (o <= pc)))
+    )
+    black = (
+        (last == -1)
+        & (previous == 1)
+        & (((o >= pc) & (c < po)) | ((o > pc) & (c <= po)))
+    )
+    return np.where(white | black, np.where((o != pc) & (c != po), 100, 80) * last, 0)
+
+
+# TA-Lib only gives a pattern for a candle that has a number of candles
+# (its lookback) before it, most of them to average the candle sizes over
+# the last 10 candles or so. In the last CANDLES candles, that leaves only
+# these patterns (with their lookback) that can ever be found. The test of
+# CandlePatterns checks that TA-Lib finds none of the others.
+KERNELS = {
+    "CDL3OUTSIDE": (3, threeOutside),
+    "CDLENGULFING": (2, engulfing),
+}
 
 
 class CandlePatterns:
@@ -60,282 +190,76 @@ class CandlePatterns:
     def __init__(self):
         pass
 
-    # Find candle-stick patterns
-    # Arrange if statements with max priority from top to bottom
-    def findPattern(self, data, dict, saveDict):
-        data = data.head(4)
-        data = data[::-1]
-        # Only 'doji' and 'inside' is internally implemented by pandas_ta.
-        # Otherwise, for the rest of the candle patterns, they also need
-        # TA-Lib.
-        check = pktalib.CDLDOJI(data["Open"], data["High"], data["Low"], data["Close"])
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = colorText.BOLD + "Doji" + colorText.END
-            saveDict["Pattern"] = "Doji"
-            return True
-
-        check = pktalib.CDLMORNINGSTAR(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.GREEN + "Morning Star" + colorText.END
-            )
-            saveDict["Pattern"] = "Morning Star"
-            return True
-
-        check = pktalib.CDLMORNINGDOJISTAR(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.GREEN + "Morning Doji Star" + colorText.END
-            )
-            saveDict["Pattern"] = "Morning Doji Star"
-            return True
-
-        check = pktalib.CDLEVENINGSTAR(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.FAIL + "Evening Star" + colorText.END
-            )
-            saveDict["Pattern"] = "Evening Star"
-            return True
-
-        check = pktalib.CDLEVENINGDOJISTAR(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.FAIL + "Evening Doji Star" + colorText.END
-            )
-            saveDict["Pattern"] = "Evening Doji Star"
-            return True
-
-        check = pktalib.CDLLADDERBOTTOM(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            if check.tail(1).item() > 0:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.GREEN + "Ladder Bottom" + colorText.END
-                )
-                saveDict["Pattern"] = "Bullish Ladder Bottom"
-            else:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.FAIL + "Ladder Bottom" + colorText.END
-                )
-                saveDict["Pattern"] = "Bearish Ladder Bottom"
-            return True
-
-        check = pktalib.CDL3LINESTRIKE(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            if check.tail(1).item() > 0:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.GREEN + "3 Line Strike" + colorText.END
-                )
-            else:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.FAIL + "3 Line Strike" + colorText.END
-                )
-            saveDict["Pattern"] = "3 Line Strike"
-            return True
-
-        check = pktalib.CDL3BLACKCROWS(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.FAIL + "3 Black Crows" + colorText.END
-            )
-            saveDict["Pattern"] = "3 Black Crows"
-            return True
-
-        check = pktalib.CDL3INSIDE(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            if check.tail(1).item() > 0:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.GREEN + "3 Outside Up" + colorText.END
-                )
-                saveDict["Pattern"] = "3 Inside Up"
-            else:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.FAIL + "3 Outside Down" + colorText.END
-                )
-                saveDict["Pattern"] = "3 Inside Down"
-            return True
-
-        check = pktalib.CDL3OUTSIDE(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            if check.tail(1).item() > 0:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.GREEN + "3 Outside Up" + colorText.END
-                )
-                saveDict["Pattern"] = "3 Outside Up"
-            else:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.FAIL + "3 Outside Down" + colorText.END
-                )
-                saveDict["Pattern"] = "3 Outside Down"
-            return True
-
-        check = pktalib.CDL3WHITESOLDIERS(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.GREEN + "3 White Soldiers" + colorText.END
+    # Finds the pattern of the latest candle of each row the way findPattern
+    # does with TA-Lib, but for all the rows in one go and without TA-Lib.
+    # The arrays are (stocks x candles) with the oldest candle first, and a
+    # row with fewer candles is padded with NaN on the older side, as in
+    # ScreeningEngine. Returns the index of the pattern of each row in
+    # PATTERNS (-1 for none) and whether it is bullish (> 0) or bearish (< 0).
+    @staticmethod
+    def findPatterns(open, high, low, close):
+        prices = [
+            np.atleast_2d(np.asarray(values, dtype=np.float64))[:, -CANDLES:]
+            for values in [open, high, low, close]
+        ]
+        rows, candles = prices[-1].shape
+        # Like TA-Lib, begin where none of the prices are missing any more
+        begin = np.zeros(rows, dtype=np.int64)
+        for values in prices:
+            hasData = ~np.isnan(values)
+            begin = np.maximum(
+                begin, np.where(hasData.any(axis=1), np.argmax(hasData, axis=1), candles)
             )
-            saveDict["Pattern"] = "3 White Soldiers"
-            return True
-
-        check = pktalib.CDLHARAMI(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            if check.tail(1).item() > 0:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.GREEN + "Bullish Harami" + colorText.END
-                )
-                saveDict["Pattern"] = "Bullish Harami"
-            else:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.FAIL + "Bearish Harami" + colorText.END
-                )
-                saveDict["Pattern"] = "Bearish Harami"
-            return True
+        patterns = np.full(rows, -1, dtype=np.int64)
+        signs = np.zeros(rows, dtype=np.int64)
+        for pattern, (function, _, _) in enumerate(PATTERNS):
+            if function not in KERNELS:
+                continue
+            lookback, kernel = KERNELS[function]
+            if candles <= lookback:
+                continue
+            with np.errstate(invalid="ignore"):
+                values = kernel(*prices)
+            found = (patterns < 0) & (values != 0) & (candles - 1 - begin >= lookback)
+            patterns[found] = pattern
+            signs[found] = np.sign(values[found])
+        return patterns, signs
 
-        check = pktalib.CDLHARAMICROSS(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            if check.tail(1).item() > 0:
-                dict["Pattern"] = (
-                    colorText.BOLD
-                    + colorText.GREEN
-                    + "Bullish Harami Cross"
-                    + colorText.END
-                )
-                saveDict["Pattern"] = "Bullish Harami Cross"
-            else:
-                dict["Pattern"] = (
-                    colorText.BOLD
-                    + colorText.FAIL
-                    + "Bearish Harami Cross"
-                    + colorText.END
-                )
-                saveDict["Pattern"] = "Bearish Harami Cross"
-            return True
+    @staticmethod
+    def describePattern(pattern, sign, dict, saveDict):
+        if pattern < 0:
+            dict["Pattern"] = ""
+            saveDict["Pattern"] = ""
+            return False
+        _, bullish, bearish = PATTERNS[pattern]
+        color, name, savedName = bullish if sign > 0 else bearish
+        dict["Pattern"] = colorText.BOLD + color + name + colorText.END
+        saveDict["Pattern"] = savedName
+        return True
 
-        check = pktalib.CDLMARUBOZU(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            if check.tail(1).item() > 0:
-                dict["Pattern"] = (
-                    colorText.BOLD
-                    + colorText.GREEN
-                    + "Bullish Marubozu"
-                    + colorText.END
-                )
-                saveDict["Pattern"] = "Bullish Marubozu"
-            else:
-                dict["Pattern"] = (
-                    colorText.BOLD + colorText.FAIL + "Bearish Marubozu" + colorText.END
-                )
-                saveDict["Pattern"] = "Bearish Marubozu"
-            return True
-
-        check = pktalib.CDLHANGINGMAN(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.FAIL + "Hanging Man" + colorText.END
-            )
-            saveDict["Pattern"] = "Hanging Man"
-            return True
-
-        check = pktalib.CDLHAMMER(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.GREEN + "Hammer" + colorText.END
-            )
-            saveDict["Pattern"] = "Hammer"
-            return True
-
-        check = pktalib.CDLINVERTEDHAMMER(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.GREEN + "Inverted Hammer" + colorText.END
-            )
-            saveDict["Pattern"] = "Inverted Hammer"
-            return True
-
-        check = pktalib.CDLSHOOTINGSTAR(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.FAIL + "Shooting Star" + colorText.END
-            )
-            saveDict["Pattern"] = "Shooting Star"
-            return True
-
-        check = pktalib.CDLDRAGONFLYDOJI(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.GREEN + "Dragonfly Doji" + colorText.END
+    # Find candle-stick patterns
+    # Arrange PATTERNS with max priority from top to bottom
+    @timed
+    def findPattern(self, data, dict, saveDict, useKernel=False):
+        data = data.head(CANDLES)
+        data = data[::-1]
+        if useKernel:
+            # Same as below, with findPatterns instead of TA-Lib
+            patterns, signs = self.findPatterns(
+                *[
+                    data[column].to_numpy(dtype=np.float64)
+                    for column in ["Open", "High", "Low", "Close"]
+                ]
             )
-            saveDict["Pattern"] = "Dragonfly Doji"
-            return True
-
-        check = pktalib.CDLGRAVESTONEDOJI(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            dict["Pattern"] = (
-                colorText.BOLD + colorText.FAIL + "Gravestone Doji" + colorText.END
+            return self.describePattern(patterns[0], signs[0], dict, saveDict)
+        # The candle patterns need TA-Lib. Without it, pktalib returns None
+        # for them.
+        for pattern, (function, _, _) in enumerate(PATTERNS):
+            check = getattr(pktalib, function)(
+                data["Open"], data["High"], data["Low"], data["Close"]
             )
-            saveDict["Pattern"] = "Gravestone Doji"
-            return True
-
-        check = pktalib.CDLENGULFING(
-            data["Open"], data["High"], data["Low"], data["Close"]
-        )
-        if check is not None and check.tail(1).item() != 0:
-            if check.tail(1).item() > 0:
-                dict["Pattern"] = (
-                    colorText.BOLD
-                    + colorText.GREEN
-                    + "Bullish Engulfing"
-                    + colorText.END
-                )
-                saveDict["Pattern"] = "Bullish Engulfing"
-            else:
-                dict["Pattern"] = (
-                    colorText.BOLD
-                    + colorText.FAIL
-                    + "Bearish Engulfing"
-                    + colorText.END
+            if check is not None and check.tail(1).item() != 0:
+                return self.describePattern(
+                    pattern, check.tail(1).item(), dict, saveDict
                 )
-                saveDict["Pattern"] = "Bearish Engulfing"
-            return True
-
-        dict["Pattern"] = ""
-        saveDict["Pattern"] = ""
-        return False
+        return self.describePattern(-1, 0, dict, saveDict)
@@ -34,8 +34,6 @@ import glob
 import os
 import sys
 
-import requests_cache
-
 from pkscreener.classes.ColorText import colorText
 from pkscreener.classes.log import default_logger
 
@@ -65,6 +63,8 @@ class tools:
         self.longTimeout = 4
         self.maxNetworkRetryCount = 10
         self.backtestPeriod = 30
+        self.downloadChunkSize = 100
+        self.vectorizedScreening = False
         self.logger = None
 
     @property
@@ -117,6 +117,10 @@ class tools:
             parser.set("config", "longTimeout", str(self.longTimeout))
             parser.set("config", "maxNetworkRetryCount", str(self.maxNetworkRetryCount))
             parser.set("config", "backtestPeriod", str(self.backtestPeriod))
+            parser.set("config", "downloadChunkSize", str(self.downloadChunkSize))
+            parser.set(
+                "config", "vectorizedScreening", "y" if self.vectorizedScreening else "n"
+            )
             try:
                 fp = open("pkscreener.ini", "w")
                 parser.write(fp)
@@ -208,6 +212,14 @@ class tools:
             self.backtestPeriod = input(
                 "[+] Number of days in the past for backtesting(in days)(Optimal = 30): "
             )
+            self.downloadChunkSize = input(
+                "[+] Number of stocks to download together in one request(0 to download one by one)(Optimal = 100): "
+            )
+            self.vectorizedScreeningPrompt = str(
+                input(
+                    "[+] Screen all the cached stocks together instead of one by one? (Faster, only for after-market scans of cached data)[Y/N]: "
+                )
+            ).lower()
             parser.set("config", "period", self.period + "d")
             parser.set("config", "daysToLookback", self.daysToLookback)
             parser.set("config", "duration", self.duration + "d")
@@ -226,6 +238,8 @@ class tools:
             parser.set("config", "longTimeout", self.longTimeout)
             parser.set("config", "maxNetworkRetryCount", self.maxNetworkRetryCount)
             parser.set("config", "backtestPeriod", self.backtestPeriod)
+            parser.set("config", "downloadChunkSize", self.downloadChunkSize)
+            parser.set("config", "vectorizedScreening", self.vectorizedScreeningPrompt)
             # delete stock data due to config change
             self.deleteFileWithPattern()
             print(
@@ -301,6 +315,12 @@ class tools:
                 self.longTimeout = float(parser.get("config", "longTimeout"))
                 self.maxNetworkRetryCount = int(parser.get("config", "maxNetworkRetryCount"))
                 self.backtestPeriod = int(parser.get("config", "backtestPeriod"))
+                self.downloadChunkSize = int(parser.get("config", "downloadChunkSize"))
+                self.vectorizedScreening = (
+                    False
+                    if "y" not in str(parser.get("config", "vectorizedScreening")).lower()
+                    else True
+                )
             except configparser.NoOptionError as e:
                 self.default_logger.debug(e, exc_info=True)
                 # input(colorText.BOLD + colorText.FAIL +
@@ -338,6 +358,8 @@ class tools:
 
     def restartRequestsCache(self):
         try:
+            import requests_cache
+
             if requests_cache.is_installed():
                 requests_cache.clear()
                 requests_cache.uninstall_cache()
@@ -0,0 +1,125 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import queue
+import threading
+
+from pkscreener.classes.log import default_logger
+from pkscreener.classes.PKTaskBatch import taskBatches
+
+# Number of threads on which the stocks of a chunk are downloaded
+FETCH_THREADS = 16
+# Number of downloaded chunks that may wait to be handed over to the workers
+MAXIMUM_PENDING_CHUNKS = 4
+
+
+# Downloads the stock data and screens it as a two stage pipeline, so that
+# the network and the cores are kept busy at the same time instead of one
+# after the other. The fetch stage downloads the stocks a chunk at a time on
+# a background thread, each chunk on FETCH_THREADS threads of its own, and
+# puts the chunks in a bounded queue. The feed stage takes them from there,
+# writes each chunk into a store of the SharedStockDict and puts the task
+# batches of its stocks, which point to that store, in the tasks queue of
+# the worker processes (one for each core). The workers screen the stocks
+# of the first chunks while the later ones are still being downloaded. The
+# stocks that could not be downloaded are still handed over, so that the
+# workers fetch them one at a time as before.
+class FetchPipeline:
+    def __init__(
+        self,
+        fetchChunk,
+        stockDict,
+        fetchThreads=FETCH_THREADS,
+        maximumPendingChunks=MAXIMUM_PENDING_CHUNKS,
+    ):
+        # fetchChunk(stockCodes, threads) returns a stock -> DataFrame dict
+        self.fetchChunk = fetchChunk
+        self.stockDict = stockDict
+        self.fetchThreads = fetchThreads
+        self.pendingChunks = queue.Queue(maxsize=max(1, maximumPendingChunks))
+        self.stopEvent = threading.Event()
+        self.fetchedCount = 0
+        self.fedCount = 0
+        self._threads = []
+
+    def start(
+        self, stockCodes, chunkSize, taskParameters, tasks_queue, workersCount, timed=False
+    ):
+        chunkSize = max(1, int(chunkSize))
+        chunks = [
+            stockCodes[start : start + chunkSize]
+            for start in range(0, len(stockCodes), chunkSize)
+        ]
+        self._threads = [
+            threading.Thread(target=self.fetch, args=(chunks,), daemon=True),
+            threading.Thread(
+                target=self.feed,
+                args=(len(chunks), taskParameters, tasks_queue, workersCount, timed),
+                daemon=True,
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def fetch(self, chunks):
+        for chunk in chunks:
+            stockDataDict = {}
+            if not self.stopEvent.is_set():
+                try:
+                    stockDataDict = self.fetchChunk(chunk, self.fetchThreads)
+                except Exception as e:
+                    default_logger().debug(e, exc_info=True)
+            self.fetchedCount += len(stockDataDict)
+            # Waits here while the feed stage is behind
+            self.pendingChunks.put((chunk, stockDataDict))
+
+    def feed(self, chunksCount, taskParameters, tasks_queue, workersCount, timed):
+        for _ in range(chunksCount):
+            chunk, stockDataDict = self.pendingChunks.get()
+            if self.stopEvent.is_set():
+                continue
+            storePath = None
+            if len(stockDataDict) > 0:
+                try:
+                    storePath = self.stockDict.addStore(
+                        {
+                            stock: data.to_dict("split")
+                            for stock, data in stockDataDict.items()
+                        }
+                    )
+                except Exception as e:
+                    default_logger().debug(e, exc_info=True)
+            for batch in taskBatches(
+                taskParameters, chunk, workersCount, timed=timed, storePath=storePath
+            ):
+                tasks_queue.put(batch)
+            self.fedCount += len(chunk)
+
+    def stop(self):
+        self.stopEvent.set()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
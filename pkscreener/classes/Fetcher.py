@@ -33,6 +33,7 @@ import csv
 import os
 import random
 import sys
+import threading
 import urllib
 import warnings
 from datetime import timedelta
@@ -42,22 +43,36 @@ warnings.simplefilter("ignore", DeprecationWarning)
 warnings.simplefilter("ignore", FutureWarning)
 import pandas as pd
 import requests
-import requests_cache
 import yfinance as yf
 from requests.exceptions import ConnectTimeout, ReadTimeout
-from requests_cache import CachedSession
 from urllib3.exceptions import ReadTimeoutError
 
 from pkscreener.classes.ColorText import colorText
 from pkscreener.classes.log import default_logger
+from pkscreener.classes.StageTimings import timed
 from pkscreener.classes.SuppressOutput import SuppressOutput
 
 requests.packages.urllib3.util.connection.HAS_IPV6 = False
-session = CachedSession(
-    "pkscreener_cache",
-    expire_after=timedelta(hours=6),
-    stale_if_error=True,
-)
+session = None
+# yf.download keeps what it has downloaded in module globals, so two of them
+# must not run at the same time in one process.
+downloadLock = threading.Lock()
+
+
+# The requests cache is only set up when the first request goes out, so that
+# starting the application does not have to import requests_cache or open
+# its database.
+def cachedSession():
+    global session
+    if session is None:
+        from requests_cache import CachedSession
+
+        session = CachedSession(
+            "pkscreener_cache",
+            expire_after=timedelta(hours=6),
+            stale_if_error=True,
+        )
+    return session
 
 # Exception class if yfinance stock delisted
 
@@ -91,9 +106,11 @@ class tools:
         return proxy
 
     def postURL(self, url, data=None, headers={}, trial=1):
+        import requests_cache
+
         try:
             response = None
-            requestor = session
+            requestor = cachedSession()
             # We should try to switch to requests lib if cached_session 
             # begin to give some problem after we've tried for
             # 50% of the configured retrials.
@@ -132,9 +149,11 @@ class tools:
         return response
 
     def fetchURL(self, url, stream=False, trial=1):
+        import requests_cache
+
         try:
             response = None
-            requestor = session
+            requestor = cachedSession()
             # We should try to switch to requests lib if cached_session 
             # begin to give some problem after we've tried for
             # 50% of the configured retrials.
@@ -282,6 +301,7 @@ class tools:
         return listStockCodes
 
     # Fetch stock price data from Yahoo finance
+    @timed
     def fetchStockData(
         self,
         stockCode,
@@ -344,6 +364,98 @@ class tools:
             )
         return data
 
+    # Fetch stock price data for many stocks from Yahoo finance in chunks
+    # so that a full market scan needs one round trip per chunk instead of
+    # one per stock. Returns a dict of stockCode -> OHLCV dataframe. Stocks
+    # for which no data could be fetched are left out of the dict.
+    def fetchStockDataInChunks(
+        self,
+        stockCodes,
+        period,
+        duration,
+        proxyServer,
+        chunkSize=None,
+        printCounter=False,
+        start=None,
+        threads=True,
+    ):
+        stockDataDict = {}
+        if stockCodes is None or len(stockCodes) == 0:
+            return stockDataDict
+        # Only the bars since start (inclusive), if it is given
+        dateRange = {"period": period} if start is None else {"start": start}
+        chunkSize = int(chunkSize or self.configManager.downloadChunkSize)
+        if chunkSize <= 0:
+            chunkSize = len(stockCodes)
+        totalSymbols = len(stockCodes)
+        for chunkStart in range(0, totalSymbols, chunkSize):
+            chunk = stockCodes[chunkStart : chunkStart + chunkSize]
+            if printCounter:
+                sys.stdout.write("\r\033[K")
+                print(
+                    colorText.BOLD
+                    + colorText.GREEN
+                    + (
+                        "[%d%%] Downloading data for %d of %d stocks..."
+                        % (
+                            int((chunkStart / totalSymbols) * 100),
+                            min(chunkStart + chunkSize, totalSymbols),
+                            totalSymbols,
+                        )
+                    )
+                    + colorText.END,
+                    end="\r",
+                    flush=True,
+                )
+            try:
+                # The stocks of a chunk are downloaded on as many threads as
+                # yfinance picks (threads=True) or as are given. The errors
+                # are not printed, since this may run on a background thread.
+                with downloadLock, SuppressOutput(
+                    suppress_stdout=True, suppress_stderr=True
+                ):
+                    data = yf.download(
+                        tickers=[f"{stockCode}.NS" for stockCode in chunk],
+                        **dateRange,
+                        interval=duration,
+                        proxy=proxyServer,
+                        progress=False,
+                        group_by="ticker",
+                        threads=threads,
+                        show_errors=False,
+                        timeout=self.configManager.longTimeout,
+                    )
+            except Exception as e:
+                default_logger().debug(e, exc_info=True)
+                continue
+            stockDataDict.update(self.splitChunkedStockData(data, chunk))
+        return stockDataDict
+
+    # Split the dataframe returned by a multi-ticker download into
+    # individual OHLCV dataframes, one for each stock.
+    def splitChunkedStockData(self, data, stockCodes):
+        stockDataDict = {}
+        if data is None or len(data) == 0:
+            return stockDataDict
+        for stockCode in stockCodes:
+            try:
+                if isinstance(data.columns, pd.MultiIndex):
+                    ticker = f"{stockCode}.NS"
+                    if ticker not in data.columns.get_level_values(0):
+                        continue
+                    stockData = data[ticker]
+                elif len(stockCodes) == 1:
+                    # Single ticker downloads are not grouped by ticker
+                    stockData = data
+                else:
+                    continue
+                stockData = stockData.dropna(how="all")
+                if len(stockData) > 0:
+                    stockDataDict[stockCode] = stockData
+            except Exception as e:
+                default_logger().debug(e, exc_info=True)
+        return stockDataDict
+
     # Get Daily Nifty 50 Index:
     def fetchLatestNiftyDaily(self, proxyServer=None):
         data = yf.download(
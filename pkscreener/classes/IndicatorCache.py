@@ -0,0 +1,157 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import warnings
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+
+from pkscreener.classes.Pktalib import pktalib
+
+# How each indicator is computed from the stock data (oldest date first)
+INDICATORS = {
+    "EMA": lambda data, timeperiod: pktalib.EMA(data["Close"], timeperiod),
+    "SMA": lambda data, timeperiod: pktalib.SMA(data["Close"], timeperiod),
+    "MA": lambda data, timeperiod: pktalib.MA(data["Close"], timeperiod),
+    "VolumeSMA": lambda data, timeperiod: pktalib.SMA(data["Volume"], timeperiod),
+    "RollingMean": lambda data, column, window: data[column]
+    .rolling(window=window)
+    .mean(),
+    "RSI": lambda data, timeperiod: pktalib.RSI(data["Close"], timeperiod),
+    "CCI": lambda data, timeperiod: pktalib.CCI(
+        data["High"], data["Low"], data["Close"], timeperiod
+    ),
+    "MACD": lambda data, fast, slow, signal: pktalib.MACD(
+        data["Close"], fast, slow, signal
+    ),
+    "STOCHRSI": lambda data, timeperiod, fastk_period, fastd_period, fastd_matype: pktalib.STOCHRSI(
+        data["Close"], timeperiod, fastk_period, fastd_period, fastd_matype
+    ),
+    "AROON": lambda data, timeperiod: pktalib.Aroon(
+        data["High"], data["Low"], timeperiod
+    ),
+}
+
+
+# Indicators that Screener.tools.preprocessData computes for every scan
+def commonIndicators(useEMA=False):
+    if useEMA:
+        movingAverages = [("EMA", (50,)), ("EMA", (200,)), ("EMA", (9,))]
+    else:
+        movingAverages = [
+            ("RollingMean", ("Close", 50)),
+            ("RollingMean", ("Close", 200)),
+            ("RollingMean", ("Close", 9)),
+        ]
+    return movingAverages + [
+        ("RollingMean", ("Volume", 20)),
+        ("RSI", (14,)),
+        ("CCI", (14,)),
+        ("STOCHRSI", (14, 5, 3, 0)),
+    ]
+
+
+# Indicators that the checks of a scanner need on top of the common ones
+def requiredIndicators(executeOption, reversalOption=None, useEMA=False):
+    indicators = commonIndicators(useEMA=useEMA)
+    if executeOption == 6 and reversalOption == 4:
+        indicators += [
+            ("EMA" if useEMA else "MA", (maLength,)) for maLength in [10, 20, 50, 200]
+        ]
+    indicators += {
+        12: [("SMA", (20,)), ("VolumeSMA", (20,))],
+        13: [("RSI", (12,)), ("EMA", (10,)), ("EMA", (200,)), ("MACD", (10, 18, 9))],
+        14: [("SMA", (10,)), ("SMA", (50,)), ("SMA", (200,))],
+        18: [("AROON", (14,))],
+        19: [("MACD", (12, 26, 9))],
+        20: [("MACD", (12, 26, 9))],
+    }.get(executeOption, [])
+    return indicators
+
+
+def headOf(values, rows):
+    if isinstance(values, tuple):
+        return tuple(headOf(value, rows) for value in values)
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return values.iloc[:rows]
+    return values[:rows]
+
+
+# Computes each indicator of a stock at most once and hands out the same
+# result to every check that asks for it. The checks work on the data
+# after fillna(0) and replace([np.inf, -np.inf], 0) while preprocessData
+# uses the data as is, so both variants are kept apart unless the data has
+# no missing values, in which case they are the same.
+class IndicatorCache:
+    def __init__(self, data, parent=None):
+        # data must have the oldest date first
+        self.data = data
+        self.parent = parent
+        self.indicators = {}
+        self._filledData = None
+        columns = [
+            column
+            for column in ["Open", "High", "Low", "Close", "Volume"]
+            if column in data.columns
+        ]
+        self.columns = columns
+        self.hasMissingValues = not np.isfinite(
+            data[columns].to_numpy(dtype=np.float64)
+        ).all()
+
+    @property
+    def filledData(self):
+        if not self.hasMissingValues:
+            return self.data
+        if self._filledData is None:
+            self._filledData = (
+                self.data[self.columns].fillna(0).replace([np.inf, -np.inf], 0)
+            )
+        return self._filledData
+
+    def get(self, indicator, *params, filled=True):
+        key = (indicator, params)
+        if not filled and self.hasMissingValues:
+            key = (indicator, params, "unfilled")
+        if key not in self.indicators:
+            if self.parent is not None:
+                self.indicators[key] = headOf(
+                    self.parent.get(indicator, *params, filled=filled), len(self.data)
+                )
+            else:
+                data = self.filledData if filled else self.data
+                self.indicators[key] = INDICATORS[indicator](data, *params)
+        return self.indicators[key]
+
+    # The indicators only look back in time, so those of the first rows of
+    # the data are the same as the ones of the whole data cut to those rows.
+    # This lets a backtest compute them once for the whole history.
+    def head(self, rows):
+        return IndicatorCache(self.data.head(rows), parent=self)
+
+    def keys(self):
+        return [(key[0], key[1]) for key in self.indicators.keys()]
@@ -0,0 +1,248 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# NumPy versions of the TA-Lib indicators that pktalib needs, so that they
+# can be computed without TA-Lib and for many stocks at once. Each of them
+# takes 1-D arrays or 2-D (stocks x days) arrays with the oldest day first,
+# works along the last axis and returns arrays of the same shape. A row that
+# begins with missing values (for example, the padding of ScreeningEngine)
+# is computed from its first day with all the values, as TA-Lib does, and
+# the days before an indicator has enough data are NaN. The arithmetic
+# follows TA-Lib's step by step, so that the values come out the same.
+
+
+def asRows(values):
+    return np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+
+def asShapeOf(values, rows):
+    return rows[0] if np.ndim(values) == 1 else rows
+
+
+# The first day of each row from which none of the given arrays is missing
+def firstDays(*arrays):
+    begin = np.zeros(arrays[0].shape[0], dtype=np.int64)
+    for values in arrays:
+        hasData = ~np.isnan(values)
+        begin = np.maximum(
+            begin, np.where(hasData.any(axis=1), np.argmax(hasData, axis=1), values.shape[1])
+        )
+    return begin
+
+
+def isZero(values):
+    return (values > -0.00000001) & (values < 0.00000001)
+
+
+def smaRows(values, timeperiod, begin):
+    rows, days = values.shape
+    result = np.full((rows, days), np.nan)
+    total = np.zeros(rows)
+    for day in range(days):
+        position = day - begin
+        total = np.where(position >= 0, total + values[:, day], total)
+        ready = position >= timeperiod - 1
+        result[:, day] = np.where(ready, total / timeperiod, np.nan)
+        if day - timeperiod + 1 >= 0:
+            total = np.where(ready, total - values[:, day - timeperiod + 1], total)
+    return result
+
+
+# Seeded with the average of the first timeperiod values, as TA-Lib does
+def emaRows(values, timeperiod, begin, k=None):
+    rows, days = values.shape
+    k = 2.0 / (timeperiod + 1) if k is None else k
+    result = np.full((rows, days), np.nan)
+    total = np.zeros(rows)
+    ema = np.zeros(rows)
+    for day in range(days):
+        position = day - begin
+        value = values[:, day]
+        total = np.where((position >= 0) & (position < timeperiod), total + value, total)
+        ema = np.where(position == timeperiod - 1, total / timeperiod, ema)
+        ema = np.where(position >= timeperiod, ((value - ema) * k) + ema, ema)
+        result[:, day] = np.where(position >= timeperiod - 1, ema, np.nan)
+    return result
+
+
+# Wilder's smoothing seeded with the average of the first timeperiod changes
+def rsiRows(values, timeperiod, begin):
+    rows, days = values.shape
+    result = np.full((rows, days), np.nan)
+    prevValue = np.zeros(rows)
+    prevGain = np.zeros(rows)
+    prevLoss = np.zeros(rows)
+    for day in range(days):
+        position = day - begin
+        value = values[:, day]
+        change = value - prevValue
+        seeding = (position >= 1) & (position <= timeperiod)
+        smoothing = position > timeperiod
+        prevGain = np.where(smoothing, prevGain * (timeperiod - 1), prevGain)
+        prevLoss = np.where(smoothing, prevLoss * (timeperiod - 1), prevLoss)
+        counted = seeding | smoothing
+        prevGain = prevGain + np.where(counted & ~(change < 0), change, 0.0)
+        prevLoss = prevLoss - np.where(counted & (change < 0), change, 0.0)
+        averaged = (position == timeperiod) | smoothing
+        prevGain = np.where(averaged, prevGain / timeperiod, prevGain)
+        prevLoss = np.where(averaged, prevLoss / timeperiod, prevLoss)
+        prevValue = np.where(position >= 0, value, prevValue)
+        total = prevGain + prevLoss
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(isZero(total), 0.0, 100.0 * (prevGain / total))
+        result[:, day] = np.where(averaged, rsi, np.nan)
+    return result
+
+
+def sma(values, timeperiod):
+    rows = asRows(values)
+    return asShapeOf(values, smaRows(rows, timeperiod, firstDays(rows)))
+
+
+def ema(values, timeperiod):
+    rows = asRows(values)
+    return asShapeOf(values, emaRows(rows, timeperiod, firstDays(rows)))
+
+
+def rsi(values, timeperiod):
+    rows = asRows(values)
+    return asShapeOf(values, rsiRows(rows, timeperiod, firstDays(rows)))
+
+
+def cci(high, low, close, timeperiod):
+    highs, lows, closes = asRows(high), asRows(low), asRows(close)
+    rows, days = closes.shape
+    result = np.full((rows, days), np.nan)
+    if days >= timeperiod:
+        begin = firstDays(highs, lows, closes)
+        typicalPrice = (highs + lows + closes) / 3
+        today = np.arange(timeperiod - 1, days)
+        # TA-Lib keeps the window in a circular buffer and adds it up in the
+        # order of the buffer, in which the day d is at (d - begin) % timeperiod.
+        window = [
+            np.take_along_axis(
+                typicalPrice,
+                today[None, :] - ((today[None, :] - begin[:, None] - slot) % timeperiod),
+                axis=1,
+            )
+            for slot in range(timeperiod)
+        ]
+        average = np.zeros((rows, len(today)))
+        for values in window:
+            average = average + values
+        average = average / timeperiod
+        deviation = np.zeros((rows, len(today)))
+        for values in window:
+            deviation = deviation + np.abs(values - average)
+        latest = typicalPrice[:, timeperiod - 1 :] - average
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(
+                (latest != 0.0) & (deviation != 0.0),
+                latest / (0.015 * (deviation / timeperiod)),
+                0.0,
+            )
+        ready = today[None, :] - begin[:, None] >= timeperiod - 1
+        result[:, timeperiod - 1 :] = np.where(ready, values, np.nan)
+    return asShapeOf(close, result)
+
+
+# The fast EMA is seeded with the average of the fastperiod values up to the
+# first day of the slow EMA, as TA-Lib does. Returns the MACD, the signal
+# and the histogram.
+def macd(close, fastperiod, slowperiod, signalperiod):
+    rows = asRows(close)
+    if slowperiod < fastperiod:
+        fastperiod, slowperiod = slowperiod, fastperiod
+    begin = firstDays(rows)
+    slowEMA = emaRows(rows, slowperiod, begin)
+    fastEMA = emaRows(rows, fastperiod, begin + slowperiod - fastperiod)
+    macdLine = fastEMA - slowEMA
+    signal = emaRows(macdLine, signalperiod, begin + slowperiod - 1)
+    # Every output begins on the first day of the signal
+    ready = (
+        np.arange(rows.shape[1])[None, :] - begin[:, None]
+        >= slowperiod - 1 + signalperiod - 1
+    )
+    macdLine = np.where(ready, macdLine, np.nan)
+    signal = np.where(ready, signal, np.nan)
+    return tuple(
+        asShapeOf(close, values) for values in (macdLine, signal, macdLine - signal)
+    )
+
+
+# Days since the highest high and the lowest low of the last timeperiod + 1
+# days (the latest one if there are several). Returns the Aroon down and up.
+def aroon(high, low, timeperiod):
+    highs, lows = asRows(high), asRows(low)
+    rows, days = highs.shape
+    aroonDown = np.full((rows, days), np.nan)
+    aroonUp = np.full((rows, days), np.nan)
+    if days > timeperiod:
+        begin = firstDays(highs, lows)
+        factor = 100.0 / timeperiod
+        highWindows = sliding_window_view(highs, timeperiod + 1, axis=1)[:, :, ::-1]
+        lowWindows = sliding_window_view(lows, timeperiod + 1, axis=1)[:, :, ::-1]
+        # Windows with a missing value have no Aroon
+        ready = (
+            np.arange(timeperiod, days)[None, :] - begin[:, None] >= timeperiod
+        ) & ~(np.isnan(highWindows).any(axis=2) | np.isnan(lowWindows).any(axis=2))
+        sinceHighest = np.argmax(highWindows, axis=2)
+        sinceLowest = np.argmin(lowWindows, axis=2)
+        aroonUp[:, timeperiod:] = np.where(
+            ready, factor * (timeperiod - sinceHighest), np.nan
+        )
+        aroonDown[:, timeperiod:] = np.where(
+            ready, factor * (timeperiod - sinceLowest), np.nan
+        )
+    return asShapeOf(high, aroonDown), asShapeOf(high, aroonUp)
+
+
+# The stochastic oscillator of the RSI. Returns the fast %K and %D, which
+# both begin on the first day of %D, as in TA-Lib. Only the simple moving
+# average (fastd_matype 0) is supported for %D.
+def stochrsi(close, timeperiod, fastk_period, fastd_period, fastd_matype=0):
+    if fastd_matype != 0:
+        raise ValueError(f"Unsupported fastd_matype: {fastd_matype}")
+    rows = asRows(close)
+    count, days = rows.shape
+    begin = firstDays(rows) + timeperiod
+    rsiValues = rsiRows(rows, timeperiod, firstDays(rows))
+    fastK = np.full((count, days), np.nan)
+    if days >= fastk_period:
+        windows = sliding_window_view(rsiValues, fastk_period, axis=1)
+        lowest = windows.min(axis=2)
+        difference = (windows.max(axis=2) - lowest) / 100.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fastK[:, fastk_period - 1 :] = np.where(
+                difference != 0.0,
+                (rsiValues[:, fastk_period - 1 :] - lowest) / difference,
+                0.0,
+            )
+        fastK[np.arange(days)[None, :] - begin[:, None] < fastk_period - 1] = np.nan
+    fastD = smaRows(fastK, fastd_period, begin + fastk_period - 1)
+    fastK = np.where(np.isnan(fastD), np.nan, fastK)
+    return asShapeOf(close, fastK), asShapeOf(close, fastD)
@@ -36,6 +36,7 @@ import pkscreener.classes.Utility as Utility
 from pkscreener.classes.ColorText import colorText
 from pkscreener.classes.log import default_logger
 from pkscreener.classes.PKMultiProcessorClient import PKMultiProcessorClient
+from pkscreener.classes.StockDataStore import SharedStockDict
 from pkscreener.classes.TaskHandler import taskHandler
 
 configManagerLocal = ConfigManager.tools()
@@ -164,7 +165,7 @@ class intradayMonitor:
 
     def monitor(self):
         self.listStockCodes = fetcherLocal.fetchStockCodes(12, stockCode=None)
-        self.stockDict = multiprocessing.Manager().dict()
+        self.stockDict = SharedStockDict(multiprocessing.Manager().dict())
         Utility.tools.loadStockData(
                         self.stockDict,
                         self.configManager,
@@ -0,0 +1,197 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import json
+import os
+import sys
+import warnings
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+
+from pkscreener.classes.log import default_logger
+
+MODEL_FILE_NAME = "nifty_model_v2.npz"
+# The model that comes with the package
+MODEL_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml", MODEL_FILE_NAME
+)
+# The columns that the model looks at as the change in percent since the
+# day before (the v2 preprocessing)
+PERCENT_CHANGE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+ACTIVATIONS = {
+    "linear": lambda values: values,
+    "relu": lambda values: np.maximum(values, 0),
+    "sigmoid": lambda values: 1 / (1 + np.exp(-values)),
+    "tanh": np.tanh,
+}
+
+# filePath -> (modification time, NiftyModel)
+_models = {}
+
+
+# Scales the features like the StandardScaler that the model was trained
+# with
+class NiftyScaler:
+    def __init__(self, mean, scale):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+    def transform(self, rows):
+        return (np.asarray(rows, dtype=np.float64) - self.mean) / self.scale
+
+
+# The dense network behind the Nifty AI prediction, run with NumPy. It is
+# exported from the keras model and its scaler (see fromKeras) into a small
+# .npz file, so that neither keras nor tensorflow is needed for a forward
+# pass that takes a fraction of a millisecond.
+class NiftyModel:
+    def __init__(self, kernels, biases, activations, columns, scaler):
+        self.kernels = [np.asarray(kernel, dtype=np.float64) for kernel in kernels]
+        self.biases = [np.asarray(bias, dtype=np.float64) for bias in biases]
+        self.activations = list(activations)
+        self.columns = list(columns)
+        self.scaler = scaler
+
+    # rows are the scaled features, one row for each prediction. Returns
+    # the probability of a bearish day for each of them, like keras does.
+    def predict(self, rows):
+        values = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+            values = ACTIVATIONS[activation](values @ kernel + bias)
+        return values
+
+    # The features of each day of the data, which must have the oldest date
+    # first
+    def features(self, data):
+        features = data[self.columns].astype(float)
+        changed = [column for column in self.columns if column in PERCENT_CHANGE_COLUMNS]
+        features[changed] = features[changed].pct_change() * 100
+        return features
+
+    # The prediction for the day after each day of the data, all at once.
+    # Days for which there are no features (the first one) get NaN.
+    def predictHistory(self, data):
+        features = self.features(data).to_numpy()
+        predictions = np.full(len(features), np.nan)
+        valid = np.isfinite(features).all(axis=1)
+        if valid.any():
+            predictions[valid] = self.predict(self.scaler.transform(features[valid]))[:, 0]
+        return pd.Series(predictions, index=data.index)
+
+    def save(self, filePath):
+        weights = {}
+        for layer, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            weights[f"kernel{layer}"] = kernel.astype(np.float32)
+            weights[f"bias{layer}"] = bias.astype(np.float32)
+        np.savez_compressed(
+            filePath,
+            activations=np.array(self.activations, dtype=str),
+            columns=np.array(self.columns, dtype=str),
+            scalerMean=self.scaler.mean,
+            scalerScale=self.scaler.scale,
+            **weights,
+        )
+
+    def load(filePath):
+        with np.load(filePath, allow_pickle=False) as f:
+            activations = [str(activation) for activation in f["activations"]]
+            return NiftyModel(
+                [f[f"kernel{layer}"] for layer in range(len(activations))],
+                [f[f"bias{layer}"] for layer in range(len(activations))],
+                activations,
+                [str(column) for column in f["columns"]],
+                NiftyScaler(f["scalerMean"], f["scalerScale"]),
+            )
+
+    # Reads the weights of a keras (2.x) Sequential model of Dense layers
+    # from its .h5 file and the scaler and columns from the .pkl file that
+    # goes with it. Only the conversion needs h5py and joblib.
+    def fromKeras(modelFilePath, pklFilePath):
+        import h5py
+        import joblib
+
+        pkl = joblib.load(pklFilePath)
+        kernels, biases, activations = [], [], []
+        with h5py.File(modelFilePath, "r") as f:
+            config = json.loads(f.attrs["model_config"])
+            weights = f["model_weights"] if "model_weights" in f else f
+            for layer in config["config"]["layers"]:
+                if layer["class_name"] == "InputLayer":
+                    continue
+                if layer["class_name"] != "Dense":
+                    raise ValueError(f"Layers of type {layer['class_name']} are not supported")
+                name = layer["config"]["name"]
+                group = weights[name]
+                values = {
+                    str(weightName).split("/")[-1].split(":")[0]: np.array(group[weightName])
+                    for weightName in [
+                        n.decode() if isinstance(n, bytes) else n
+                        for n in group.attrs["weight_names"]
+                    ]
+                }
+                kernels.append(values["kernel"])
+                biases.append(
+                    values.get("bias", np.zeros(values["kernel"].shape[1]))
+                )
+                activations.append(layer["config"].get("activation", "linear"))
+        scaler = pkl["scaler"]
+        return NiftyModel(
+            kernels,
+            biases,
+            activations,
+            pkl["columns"],
+            NiftyScaler(scaler.mean_, scaler.scale_),
+        )
+
+
+# The exported model, from the package or else from the current directory,
+# loaded once for each process. None if there isn't one.
+def loadModel(filePaths=None):
+    filePaths = [MODEL_FILE, MODEL_FILE_NAME] if filePaths is None else filePaths
+    for filePath in filePaths:
+        try:
+            if not os.path.isfile(filePath):
+                continue
+            modifiedTime = os.path.getmtime(filePath)
+            cached = _models.get(filePath)
+            if cached is None or cached[0] != modifiedTime:
+                cached = (modifiedTime, NiftyModel.load(filePath))
+                _models[filePath] = cached
+            return cached[1]
+        except Exception as e:
+            default_logger().debug(e, exc_info=True)
+    return None
+
+
+# python -m pkscreener.classes.NiftyModel nifty_model_v2.h5 nifty_model_v2.pkl [nifty_model_v2.npz]
+if __name__ == "__main__":
+    modelFilePath, pklFilePath = sys.argv[1:3]
+    outputFilePath = sys.argv[3] if len(sys.argv) > 3 else MODEL_FILE_NAME
+    NiftyModel.fromKeras(modelFilePath, pklFilePath).save(outputFilePath)
+    print(f"[+] Saved the model in {outputFilePath}")
@@ -32,9 +32,6 @@
 import platform
 import subprocess
 import sys
-from datetime import timedelta
-
-from requests_cache import CachedSession
 
 import pkscreener.classes.ConfigManager as ConfigManager
 import pkscreener.classes.Fetcher as Fetcher
@@ -42,12 +39,6 @@ from pkscreener.classes import VERSION
 from pkscreener.classes.ColorText import colorText
 from pkscreener.classes.log import default_logger
 
-session = CachedSession(
-    "pkscreener_cache",
-    expire_after=timedelta(days=1),
-    stale_if_error=True,
-)
-
 
 class OTAUpdater:
     developmentVersion = "d"
@@ -0,0 +1,69 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+from pkscreener.classes.log import default_logger
+
+
+# Stands in for a shared multiprocessing.Value counter inside a worker
+# process. The worker counts on its own without taking the lock of the
+# shared counter, and the count is only added to the shared one when
+# publish is called, which PKMultiProcessorClient does after each task.
+# value is what the shared counter had when it was last published plus
+# whatever the worker has counted since.
+class PKLocalCounter:
+    def __init__(self, sharedCounter=None):
+        self.sharedCounter = sharedCounter
+        self.sharedValue = self.readShared()
+        self.pending = 0
+
+    def readShared(self):
+        if self.sharedCounter is None:
+            return 0
+        try:
+            return int(self.sharedCounter.value)
+        except Exception as e:
+            default_logger().debug(e, exc_info=True)
+            return 0
+
+    @property
+    def value(self):
+        return self.sharedValue + self.pending
+
+    @value.setter
+    def value(self, newValue):
+        self.pending = newValue - self.sharedValue
+
+    def publish(self):
+        if self.sharedCounter is None:
+            self.sharedValue += self.pending
+            self.pending = 0
+            return
+        try:
+            with self.sharedCounter.get_lock():
+                self.sharedCounter.value += self.pending
+                self.sharedValue = self.sharedCounter.value
+        except Exception as e:
+            default_logger().debug(e, exc_info=True)
+            self.sharedValue = self.readShared()
+        self.pending = 0
@@ -26,6 +26,7 @@
 import logging
 import multiprocessing
 import os
+import pickle
 import sys
 from queue import Empty
 
@@ -46,8 +47,11 @@ except ImportError:
 import pkscreener.classes.ConfigManager as ConfigManager
 import pkscreener.classes.Fetcher as Fetcher
 import pkscreener.classes.Screener as Screener
+import pkscreener.classes.StageTimings as StageTimings
 from pkscreener.classes.CandlePatterns import CandlePatterns
 from pkscreener.classes.log import default_logger
+from pkscreener.classes.PKLocalCounter import PKLocalCounter
+from pkscreener.classes.PKTaskBatch import PKBatchResults, PKTaskBatch
 
 candlePatterns = CandlePatterns()
 configManager = ConfigManager.tools()
@@ -69,6 +73,8 @@ class PKMultiProcessorClient(multiprocessing.Process):
         stockList=None,
         dataCallbackHandler=None,
         progressCallbackHandler=None,
+        jobContext=None,
+        jobVersion=None,
     ):
         multiprocessing.Process.__init__(self)
         self.multiprocessingForWindows()
@@ -83,9 +89,11 @@ class PKMultiProcessorClient(multiprocessing.Process):
         # processingCounter and processingResultsCounter
         # are sunchronized counters that can be used within
         # processorMethod via hostRef.processingCounter
-        # or hostRef.processingResultsCounter
-        self.processingCounter = processingCounter
-        self.processingResultsCounter = processingResultsCounter
+        # or hostRef.processingResultsCounter. The worker counts
+        # on its own and adds its counts to them after each task,
+        # so that the workers don't wait for each other's locks.
+        self.processingCounter = PKLocalCounter(processingCounter)
+        self.processingResultsCounter = PKLocalCounter(processingResultsCounter)
         # A helper object dictionary that can contain anything
         # and can be accessed using hostRef.objectDictionary
         # within processorMethod
@@ -112,6 +120,33 @@ class PKMultiProcessorClient(multiprocessing.Process):
         self.configManager = configManager
         self.candlePatterns = candlePatterns
         self.screener = screener
+        # A worker that lives on from one job to the next (see PKWorkerPool)
+        # finds whatever has changed for the next job (the processorMethod,
+        # objectDictionary etc.) in jobContext. jobVersion is bumped each
+        # time a new job is published. The first job is taken up from
+        # jobContext too, so that its config gets applied.
+        self.jobContext = jobContext
+        self.jobVersion = jobVersion
+        self.currentJobVersion = None
+
+    def refreshJob(self):
+        if self.jobVersion is None or self.jobVersion.value == self.currentJobVersion:
+            return
+        jobContext = self.jobContext.copy()
+        self.currentJobVersion = jobContext.pop("jobVersion", self.jobVersion.value)
+        configState = jobContext.pop("configState", None)
+        if configState is not None:
+            # The fetcher and the screener share this configManager, so they
+            # also get the config of the new job.
+            vars(self.configManager).update(configState)
+        for key, value in jobContext.items():
+            setattr(self, key, value)
+        # The counters have been reset for the new job
+        self.publishCounters()
+
+    def publishCounters(self):
+        self.processingCounter.publish()
+        self.processingResultsCounter.publish()
 
     def run(self):
         try:
@@ -121,10 +156,6 @@ class PKMultiProcessorClient(multiprocessing.Process):
                     answer = None
                     if self.task_queue is not None:
                         next_task = self.task_queue.get()
-                        if next_task is not None:
-                            # Inject a reference to this instance of the client
-                            # so that the task can still get access back to it.
-                            next_task = (*(next_task), self)
                 except Empty as e:
                     self.default_logger.debug(e, exc_info=True)
                     continue
@@ -133,17 +164,41 @@ class PKMultiProcessorClient(multiprocessing.Process):
                     if self.task_queue is not None:
                         self.task_queue.task_done()
                     break
+                self.refreshJob()
                 if self.processorMethod is not None:
-                    answer = self.processorMethod(*(next_task))
+                    if isinstance(next_task, PKTaskBatch):
+                        answer = self.processBatch(next_task)
+                    else:
+                        # Inject a reference to this instance of the client
+                        # so that the task can still get access back to it.
+                        answer = self.processorMethod(*(next_task), self)
+                    self.publishCounters()
                 if self.task_queue is not None:
                     self.task_queue.task_done()
-                self.default_logger.info(f"Task done. Result:{answer}")
+                self.default_logger.info("Task done. Result:%s", answer)
                 if self.result_queue is not None:
                     self.result_queue.put(answer)
         except Exception as e:
             self.default_logger.debug(e, exc_info=True)
             sys.exit(0)
 
+    def processBatch(self, batch):
+        StageTimings.enable(batch.timed)
+        if batch.storePath is not None:
+            self.objectDictionary.ensureAttached(batch.storePath)
+        answers = PKBatchResults()
+        for task in batch.tasks():
+            if self.keyboardInterruptEvent.is_set():
+                break
+            answers.append(self.processorMethod(*task, self))
+        if batch.timed:
+            # The results get pickled again on their way to the parent, but
+            # this is the only place where that can be timed.
+            with StageTimings.span("resultTransfer"):
+                pickle.dumps(answers)
+            answers.timings = StageTimings.drain()
+        return answers
+
     def multiprocessingForWindows(self):
         if sys.platform.startswith("win"):
             # First define a modified version of Popen.
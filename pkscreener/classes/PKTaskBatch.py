@@ -0,0 +1,93 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import math
+
+# Index of the stock in the task tuples that globals.main puts in the queue
+STOCK_INDEX = 10
+# Every worker gets about this many batches, so that a worker that is done
+# early can still take over some of the stocks of the slower ones.
+BATCHES_PER_WORKER = 4
+MAXIMUM_BATCH_SIZE = 50
+
+
+# A batch of tasks that only differ in the stock. The parameters that the
+# tasks share are pickled once for the whole batch instead of once for each
+# stock, and a worker goes through all of them after a single get from the
+# tasks queue, putting back one list with a result for each stock. If the
+# batch is timed, the worker also times the stages of its tasks (see
+# StageTimings) and sends the timings back along with the results. The
+# data of the stocks may come in a store that was added to the
+# SharedStockDict after the workers got it (see FetchPipeline), in which
+# case the worker attaches storePath before it goes through the batch.
+class PKTaskBatch:
+    def __init__(
+        self, parameters, symbols, symbolIndex=STOCK_INDEX, timed=False, storePath=None
+    ):
+        self.parameters = tuple(parameters)
+        self.symbols = list(symbols)
+        self.symbolIndex = symbolIndex
+        self.timed = timed
+        self.storePath = storePath
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def tasks(self):
+        before = self.parameters[: self.symbolIndex]
+        after = self.parameters[self.symbolIndex + 1 :]
+        for symbol in self.symbols:
+            yield (*before, symbol, *after)
+
+
+# The results of the tasks of a batch, one for each stock, in the order of
+# the stocks, and the StageTimings of the tasks if the batch was timed.
+class PKBatchResults(list):
+    timings = None
+
+
+def batchSize(itemsCount, workersCount, maximumSize=MAXIMUM_BATCH_SIZE):
+    workersCount = max(1, workersCount)
+    size = math.ceil(itemsCount / (workersCount * BATCHES_PER_WORKER))
+    return max(1, min(maximumSize, size))
+
+
+# Splits the stocks into batches for each of the parameter tuples. The stock
+# in the parameters is ignored.
+def taskBatches(
+    parametersList,
+    symbols,
+    workersCount,
+    maximumSize=MAXIMUM_BATCH_SIZE,
+    timed=False,
+    storePath=None,
+):
+    size = batchSize(len(parametersList) * len(symbols), workersCount, maximumSize)
+    return [
+        PKTaskBatch(
+            parameters, symbols[start : start + size], timed=timed, storePath=storePath
+        )
+        for parameters in parametersList
+        for start in range(0, len(symbols), size)
+    ]
@@ -0,0 +1,131 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import multiprocessing
+from queue import Empty
+
+from pkscreener.classes.PKMultiProcessorClient import PKMultiProcessorClient
+
+
+# Worker processes that stay alive from one scan to the next, so that a
+# scan that runs again (for example, every few minutes with -c) does not
+# have to start new processes and import everything in them all over again.
+# Each scan is a job. The processor method and the stock data for the job
+# are published to the workers, which pick them up along with the first
+# task of the job that they get. The pool must only be handed a new job
+# once all the results of the previous one have been taken off
+# results_queue.
+class PKWorkerPool:
+    def __init__(
+        self,
+        tasks_queue,
+        results_queue,
+        totalConsumers,
+        processingCounter,
+        processingResultsCounter,
+        proxyServer,
+        keyboardInterruptEvent,
+        defaultLogger,
+    ):
+        self.tasks_queue = tasks_queue
+        self.results_queue = results_queue
+        self.totalConsumers = totalConsumers
+        self.processingCounter = processingCounter
+        self.processingResultsCounter = processingResultsCounter
+        self.proxyServer = proxyServer
+        self.keyboardInterruptEvent = keyboardInterruptEvent
+        self.default_logger = defaultLogger
+        self.manager = multiprocessing.Manager()
+        self.jobContext = self.manager.dict()
+        self.jobVersion = multiprocessing.Value("i", 0)
+        self.consumers = []
+
+    def isAlive(self):
+        return len(self.consumers) > 0 and all(
+            consumer.is_alive() for consumer in self.consumers
+        )
+
+    # Publishes a new job to the workers. Its tasks can be put in tasks_queue
+    # after this returns, but without any None after them because a worker
+    # stops when it gets one. Returns the workers that the pool had to create
+    # for the job, which the caller must start. The workers read the config
+    # only once, when they start, so the config of the job is published with
+    # it in case the user has changed it since then.
+    def submitJob(self, processorMethod, objectDictionary, configManager=None):
+        jobVersion = self.jobVersion.value + 1
+        job = {
+            "processorMethod": processorMethod,
+            "objectDictionary": objectDictionary,
+            "jobVersion": jobVersion,
+        }
+        if configManager is not None:
+            job["configState"] = {
+                key: value
+                for key, value in vars(configManager).items()
+                if key != "logger"
+            }
+        self.jobContext.update(job)
+        with self.jobVersion.get_lock():
+            self.jobVersion.value = jobVersion
+        if len(self.consumers) > 0:
+            return []
+        self.consumers = [
+            PKMultiProcessorClient(
+                processorMethod,
+                self.tasks_queue,
+                self.results_queue,
+                self.processingCounter,
+                self.processingResultsCounter,
+                objectDictionary,
+                self.proxyServer,
+                self.keyboardInterruptEvent,
+                self.default_logger,
+                jobContext=self.jobContext,
+                jobVersion=self.jobVersion,
+            )
+            for _ in range(self.totalConsumers)
+        ]
+        return self.consumers
+
+    def terminate(self):
+        for consumer in self.consumers:
+            try:
+                consumer.terminate()
+            except Exception as e:
+                self.default_logger.debug(e, exc_info=True)
+        self.consumers = []
+        # Flush the queues so that nothing from this pool is left behind
+        for queue in [self.tasks_queue, self.results_queue]:
+            while True:
+                try:
+                    _ = queue.get(False)
+                except Empty:
+                    break
+                except Exception as e:
+                    self.default_logger.debug(e, exc_info=True)
+                    break
+        try:
+            self.manager.shutdown()
+        except Exception as e:
+            self.default_logger.debug(e, exc_info=True)
@@ -30,28 +30,33 @@
 """
 
 import logging
+import multiprocessing
 import sys
 import warnings
 
-import numpy as np
-
 warnings.simplefilter("ignore", DeprecationWarning)
 warnings.simplefilter("ignore", FutureWarning)
 import pandas as pd
 
 import pkscreener.classes.Fetcher as Fetcher
 import pkscreener.classes.Screener as Screener
+import pkscreener.classes.StageTimings as StageTimings
 import pkscreener.classes.Utility as Utility
-from pkscreener import Imports
 from pkscreener.classes.CandlePatterns import CandlePatterns
 from pkscreener.classes.ColorText import colorText
+from pkscreener.classes.IndicatorCache import IndicatorCache
 from pkscreener.classes.log import tracelog
+from pkscreener.classes.ScanPlan import ScanPlan
 from pkscreener.classes.SuppressOutput import SuppressOutput
 
 
 class StockConsumer:
     def __init__(self):
         self.isTradingTime = Utility.tools.isTradingTime()
+        # The log level that the loggers have been set up for
+        self.loggersLevel = None
+        # The scan plans of the scans so far, by their options
+        self.scanPlans = {}
 
     @tracelog
     def screenStocks(
@@ -76,7 +81,11 @@ class StockConsumer:
         backtestPeriodToLookback=30,
         logLevel=logging.NOTSET,
         monitoring=False,
+        dataPrefetched=False,
         hostRef=None,
+        stockData=None,
+        indicatorCache=None,
+        backtestWindow=False,
     ):
         assert (
             hostRef is not None
@@ -89,7 +98,9 @@ class StockConsumer:
         screener = hostRef.screener
         candlePatterns = hostRef.candlePatterns
         try:
-            self.setupLoggers(hostRef, screener, logLevel, stock)
+            self.setupLoggers(
+                hostRef, screener, logLevel, stock, quiet=not (testbuild or printCounter)
+            )
             period = configManager.period
             if volumeRatio <= 0:
                 volumeRatio = configManager.volumeRatio
@@ -99,14 +110,32 @@ class StockConsumer:
                     period = "250d"
                 else:
                     period = configManager.period
+            # Read the cached payload once; it may come over IPC from the manager.
+            cachedData = None
+            if stockData is None:
+                with StageTimings.span("cacheRead"):
+                    cachedData = hostRef.objectDictionary.get(stock)
             hostRef.default_logger.info(
-                f"For stock:{stock}, stock exists in objectDictionary:{hostRef.objectDictionary.get(stock)}, cacheEnabled:{configManager.cacheEnabled}, isTradingTime:{self.isTradingTime}, downloadOnly:{downloadOnly}"
+                "For stock:%s, stock exists in objectDictionary:%s, cacheEnabled:%s, isTradingTime:%s, downloadOnly:%s",
+                stock,
+                cachedData is not None,
+                configManager.cacheEnabled,
+                self.isTradingTime,
+                downloadOnly,
+            )
+            # When the data has been downloaded in chunks by the parent process
+            # right before the screening began, it is as fresh as it can get.
+            isPrefetched = (
+                dataPrefetched and cachedData is not None
             )
-            if (
+            if stockData is not None:
+                data = stockData
+            elif (
                 (not shouldCache
                 or downloadOnly
                 or self.isTradingTime
-                or hostRef.objectDictionary.get(stock) is None)
+                or cachedData is None)
+                and not isPrefetched
             ):
                 data = fetcher.fetchStockData(
                     stock,
@@ -117,17 +146,15 @@ class StockConsumer:
                     hostRef.processingCounter,
                     totalSymbols,
                 )
-                hostRef.default_logger.info(f"Fetcher fetched stock data:\n{data}")
+                hostRef.default_logger.info("Fetcher fetched stock data:\n%s", data)
                 if (
                     (shouldCache
                     and not self.isTradingTime
-                    and (hostRef.objectDictionary.get(stock) is None))
+                    and cachedData is None)
                     or downloadOnly
                 ):
                     hostRef.objectDictionary[stock] = data.to_dict("split")
-                    hostRef.default_logger.info(
-                        f"Stock data saved:\n{hostRef.objectDictionary[stock]}"
-                    )
+                    hostRef.default_logger.info("Stock data saved:%s", stock)
                     if downloadOnly:
                         raise Screener.DownloadDataOnly
             else:
@@ -163,16 +190,25 @@ class StockConsumer:
                         hostRef.default_logger.debug(e, exc_info=True)
                         pass
                     sys.stdout.write("\r\033[K")
-                data = hostRef.objectDictionary.get(stock)
-                data = pd.DataFrame(
-                    data["data"], columns=data["columns"], index=data["index"]
-                )
+                if downloadOnly:
+                    raise Screener.DownloadDataOnly
+                with StageTimings.span("cacheRead"):
+                    data = pd.DataFrame(
+                        cachedData["data"],
+                        columns=cachedData["columns"],
+                        index=cachedData["index"],
+                    )
             if len(data) == 0 or len(data) <= backtestDuration:
                 return None
-            hostRef.default_logger.info(f"Will pre-process data:\n{data.tail(10)}")
+            hostRef.default_logger.info("Will pre-process data:\n%s", data.tail(10))
             if backtestDuration == 0:
+                indicators = (
+                    IndicatorCache(data) if indicatorCache is None else indicatorCache
+                )
                 fullData, processedData = screener.preprocessData(
-                    data, daysToLookback=configManager.daysToLookback
+                    data,
+                    daysToLookback=configManager.daysToLookback,
+                    indicators=indicators,
                 )
             else:
                 if data is None or fullData is None or processedData is None:
@@ -181,21 +217,29 @@ class StockConsumer:
                     # This will have all the rows in future from the date under consideration 
                     # at the bottom of fullData (or at the top of inputData)
                     data = data.tail(backtestDuration).head(backtestPeriodToLookback+1)
+                    indicators = (
+                        IndicatorCache(inputData)
+                        if indicatorCache is None
+                        else indicatorCache.head(len(inputData))
+                    )
                     fullData, processedData = screener.preprocessData(
-                        inputData, daysToLookback=configManager.daysToLookback
+                        inputData,
+                        daysToLookback=configManager.daysToLookback,
+                        indicators=indicators,
                     )
             hostRef.default_logger.info(
-                f"Finished pre-processing. processedData:\n{data}\nfullData:{fullData}\n"
+                "Finished pre-processing. processedData:\n%s\nfullData:%s\n",
+                data,
+                fullData,
             )
             if newlyListedOnly:
                 if not screener.validateNewlyListed(fullData, period):
                     raise Screener.NotNewlyListed
 
-            with hostRef.processingCounter.get_lock():
-                hostRef.processingCounter.value += 1
-                hostRef.default_logger.info(
-                    f"Processing {stock} in {hostRef.processingCounter.value}th counter"
-                )
+            hostRef.processingCounter.value += 1
+            hostRef.default_logger.info(
+                "Processing %s in %sth counter", stock, hostRef.processingCounter.value
+            )
             if not processedData.empty:
                 screeningDictionary["Stock"] = (
                     colorText.BOLD
@@ -204,82 +248,167 @@ class StockConsumer:
                     + colorText.END
                 )
                 saveDictionary["Stock"] = stock
-                isLtpValid, verifyStageTwo = screener.validateLTP(
-                    fullData,
-                    screeningDictionary,
-                    saveDictionary,
-                    minLTP=configManager.minLTP,
-                    maxLTP=configManager.maxLTP,
+                # Rule out the stocks that cannot make it to the results with
+                # only the checks of the selected scanner, cheapest first,
+                # before working out all the columns for the display.
+                scanPlan = self.scanPlan(
+                    configManager,
+                    executeOption,
+                    reversalOption,
+                    respChartPattern,
+                    newlyListedOnly,
+                    maLength,
+                    daysForLowestVolume,
+                    minRSI,
+                    maxRSI,
+                    volumeRatio,
+                    insideBarToLookback,
                 )
-                consolidationValue = screener.validateConsolidation(
+                scanContext = scanPlan.passes(
+                    stock,
+                    screener,
+                    fullData,
                     processedData,
-                    screeningDictionary,
-                    saveDictionary,
-                    percentage=configManager.consolidationPercentage,
+                    indicators=indicators,
+                    screenDict=screeningDictionary,
+                    saveDict=saveDictionary,
+                )
+                if scanContext is None:
+                    return None
+
+                # The checks that the plan already ran are not run again
+                def reuse(predicate, check):
+                    return scanPlan.reuse(
+                        scanContext, predicate, screeningDictionary, saveDictionary, check
+                    )
+
+                isLtpValid, verifyStageTwo = reuse(
+                    "ltp",
+                    lambda: screener.validateLTP(
+                        fullData,
+                        screeningDictionary,
+                        saveDictionary,
+                        minLTP=configManager.minLTP,
+                        maxLTP=configManager.maxLTP,
+                    ),
+                )
+                consolidationValue = reuse(
+                    "consolidation",
+                    lambda: screener.validateConsolidation(
+                        processedData,
+                        screeningDictionary,
+                        saveDictionary,
+                        percentage=configManager.consolidationPercentage,
+                    ),
                 )
                 isMaReversal = screener.validateMovingAverages(
                     processedData, screeningDictionary, saveDictionary, maRange=1.25
                 )
                 if executeOption == 11:
-                    isShortTermBullish = screener.validateShortTermBullish(
-                        fullData, screeningDictionary, saveDictionary
+                    isShortTermBullish = reuse(
+                        "shortTermBullish",
+                        lambda: screener.validateShortTermBullish(
+                            fullData, screeningDictionary, saveDictionary
+                        ),
                     )
                 if executeOption == 12:
-                    is15MinutePriceVolumeBreakout = (
-                        screener.validate15MinutePriceVolumeBreakout(fullData)
+                    is15MinutePriceVolumeBreakout = reuse(
+                        "15MinutePriceVolumeBreakout",
+                        lambda: screener.validate15MinutePriceVolumeBreakout(
+                            fullData, indicators=indicators
+                        ),
                     )
                 if executeOption == 13:
-                    isBullishIntradayRSIMACD = screener.findBullishIntradayRSIMACD(
-                        fullData
+                    isBullishIntradayRSIMACD = reuse(
+                        "bullishIntradayRSIMACD",
+                        lambda: screener.findBullishIntradayRSIMACD(
+                            fullData, indicators=indicators
+                        ),
                     )
                 if executeOption == 14:
-                    isNR4Day = screener.findNR4Day(fullData)
+                    isNR4Day = reuse(
+                        "NR4Day",
+                        lambda: screener.findNR4Day(fullData, indicators=indicators),
+                    )
                 if executeOption == 15:
-                    is52WeekLowBreakout = screener.find52WeekLowBreakout(fullData)
+                    is52WeekLowBreakout = reuse(
+                        "52WeekLowBreakout",
+                        lambda: screener.find52WeekLowBreakout(fullData),
+                    )
                 if executeOption == 16:
-                    is10DaysLowBreakout = screener.find10DaysLowBreakout(fullData)
+                    is10DaysLowBreakout = reuse(
+                        "10DaysLowBreakout",
+                        lambda: screener.find10DaysLowBreakout(fullData),
+                    )
                 if executeOption == 17:
-                    is52WeekHighBreakout = screener.find52WeekHighBreakout(fullData)
+                    is52WeekHighBreakout = reuse(
+                        "52WeekHighBreakout",
+                        lambda: screener.find52WeekHighBreakout(fullData),
+                    )
                 if executeOption == 18:
-                    isAroonCrossover = screener.findAroonBullishCrossover(fullData)
+                    isAroonCrossover = reuse(
+                        "aroonBullishCrossover",
+                        lambda: screener.findAroonBullishCrossover(
+                            fullData, indicators=indicators
+                        ),
+                    )
                 if executeOption == 19:
-                    macdHistBelow0 = screener.validateMACDHistogramBelow0(fullData)
+                    macdHistBelow0 = reuse(
+                        "MACDHistogramBelow0",
+                        lambda: screener.validateMACDHistogramBelow0(
+                            fullData, indicators=indicators
+                        ),
+                    )
                 if executeOption == 20:
-                    bullishForTomorrow = screener.validateBullishForTomorrow(fullData)
-                isVolumeHigh = screener.validateVolume(
-                    processedData,
-                    screeningDictionary,
-                    saveDictionary,
-                    volumeRatio=volumeRatio,
+                    bullishForTomorrow = reuse(
+                        "bullishForTomorrow",
+                        lambda: screener.validateBullishForTomorrow(
+                            fullData, indicators=indicators
+                        ),
+                    )
+                isVolumeHigh = reuse(
+                    "volume",
+                    lambda: screener.validateVolume(
+                        processedData,
+                        screeningDictionary,
+                        saveDictionary,
+                        volumeRatio=volumeRatio,
+                    ),
                 )
-                isBreaking = screener.findBreakout(
-                    processedData,
-                    screeningDictionary,
-                    saveDictionary,
-                    daysToLookback=configManager.daysToLookback,
+                isBreaking = reuse(
+                    "breakout",
+                    lambda: screener.findBreakout(
+                        processedData,
+                        screeningDictionary,
+                        saveDictionary,
+                        daysToLookback=configManager.daysToLookback,
+                    ),
                 )
                 if executeOption == 4:
-                    isLowestVolume = screener.validateLowestVolume(
-                        processedData, daysForLowestVolume
+                    isLowestVolume = reuse(
+                        "lowestVolume",
+                        lambda: screener.validateLowestVolume(
+                            processedData, daysForLowestVolume
+                        ),
                     )
                 else:
                     isLowestVolume = False
-                isValidRsi = screener.validateRSI(
-                    processedData, screeningDictionary, saveDictionary, minRSI, maxRSI
+                isValidRsi = reuse(
+                    "rsi",
+                    lambda: screener.validateRSI(
+                        processedData, screeningDictionary, saveDictionary, minRSI, maxRSI
+                    ),
+                )
+                currentTrend = reuse(
+                    "trendUp",
+                    lambda: screener.findTrend(
+                        processedData,
+                        screeningDictionary,
+                        saveDictionary,
+                        daysToLookback=configManager.daysToLookback,
+                        stockName=stock,
+                    ),
                 )
-                try:
-                    with SuppressOutput(suppress_stderr=True, suppress_stdout=True):
-                        currentTrend = screener.findTrend(
-                            processedData,
-                            screeningDictionary,
-                            saveDictionary,
-                            daysToLookback=configManager.daysToLookback,
-                            stockName=stock,
-                        )
-                except np.RankWarning as e:
-                    hostRef.default_logger.debug(e, exc_info=True)
-                    screeningDictionary["Trend"] = "Unknown"
-                    saveDictionary["Trend"] = "Unknown"
                 isValidCci = screener.validateCCI(
                     processedData, screeningDictionary, saveDictionary, minRSI, maxRSI
                 )
@@ -291,7 +420,10 @@ class StockConsumer:
                     # We can live with no-patterns if user has not installed ta-lib
                     # yet. If ta-lib is available, PKTalib will load it automatically.
                     isCandlePattern = candlePatterns.findPattern(
-                        processedData, screeningDictionary, saveDictionary
+                        processedData,
+                        screeningDictionary,
+                        saveDictionary,
+                        useKernel=True,
                     )
                 except Exception as e:
                     hostRef.default_logger.debug(e, exc_info=True)
@@ -301,24 +433,33 @@ class StockConsumer:
                 isInsideBar = False
                 isIpoBase = False
                 if newlyListedOnly:
-                    isIpoBase = screener.validateIpoBase(
-                        stock, fullData, screeningDictionary, saveDictionary
+                    isIpoBase = reuse(
+                        "ipoBase",
+                        lambda: screener.validateIpoBase(
+                            stock, fullData, screeningDictionary, saveDictionary
+                        ),
                     )
                 if respChartPattern == 3 and executeOption == 7:
-                    isConfluence = screener.validateConfluence(
-                        stock,
-                        processedData,
-                        screeningDictionary,
-                        saveDictionary,
-                        percentage=insideBarToLookback,
+                    isConfluence = reuse(
+                        "confluence",
+                        lambda: screener.validateConfluence(
+                            stock,
+                            processedData,
+                            screeningDictionary,
+                            saveDictionary,
+                            percentage=insideBarToLookback,
+                        ),
                     )
                 else:
-                    isInsideBar = screener.validateInsideBar(
-                        processedData,
-                        screeningDictionary,
-                        saveDictionary,
-                        chartPattern=respChartPattern,
-                        daysToLookback=insideBarToLookback,
+                    isInsideBar = reuse(
+                        "insideBar",
+                        lambda: screener.validateInsideBar(
+                            processedData,
+                            screeningDictionary,
+                            saveDictionary,
+                            chartPattern=respChartPattern,
+                            daysToLookback=insideBarToLookback,
+                        ),
                     )
 
                 with SuppressOutput(suppress_stderr=True, suppress_stdout=True):
@@ -327,165 +468,148 @@ class StockConsumer:
                         and executeOption == 6
                         and reversalOption == 6
                     ):
-                        isNR = screener.validateNarrowRange(
-                            processedData,
-                            screeningDictionary,
-                            saveDictionary,
-                            nr=maLength,
+                        isNR = reuse(
+                            "narrowRange",
+                            lambda: screener.validateNarrowRange(
+                                processedData,
+                                screeningDictionary,
+                                saveDictionary,
+                                nr=maLength,
+                            ),
                         )
                     else:
                         isNR = screener.validateNarrowRange(
                             processedData, screeningDictionary, saveDictionary
                         )
 
-                isMomentum = screener.validateMomentum(
-                    processedData, screeningDictionary, saveDictionary
+                isMomentum = reuse(
+                    "momentum",
+                    lambda: screener.validateMomentum(
+                        processedData, screeningDictionary, saveDictionary
+                    ),
                 )
                 if executeOption == 10:
-                    isPriceRisingByAtLeast2Percent = (
-                        screener.validatePriceRisingByAtLeast2Percent(
+                    isPriceRisingByAtLeast2Percent = reuse(
+                        "priceRisingByAtLeast2Percent",
+                        lambda: screener.validatePriceRisingByAtLeast2Percent(
                             processedData, screeningDictionary, saveDictionary
-                        )
+                        ),
                     )
 
                 isVSA = False
                 if not (executeOption == 7 and respChartPattern < 3):
-                    isVSA = screener.validateVolumeSpreadAnalysis(
-                        processedData, screeningDictionary, saveDictionary
+                    isVSA = reuse(
+                        "volumeSpreadAnalysis",
+                        lambda: screener.validateVolumeSpreadAnalysis(
+                            processedData, screeningDictionary, saveDictionary
+                        ),
                     )
                 if maLength is not None and executeOption == 6 and reversalOption == 4:
-                    isMaSupport = screener.findReversalMA(
-                        fullData, screeningDictionary, saveDictionary, maLength
+                    isMaSupport = reuse(
+                        "reversalMA",
+                        lambda: screener.findReversalMA(
+                            fullData,
+                            screeningDictionary,
+                            saveDictionary,
+                            maLength,
+                            indicators=indicators,
+                        ),
                     )
 
                 isVCP = False
                 if respChartPattern == 4:
-                    with SuppressOutput(suppress_stderr=True, suppress_stdout=True):
-                        isVCP = screener.validateVCP(
+                    isVCP = reuse(
+                        "VCP",
+                        lambda: screener.validateVCP(
                             fullData, screeningDictionary, saveDictionary
-                        )
+                        ),
+                    )
 
                 isBuyingTrendline = False
                 if executeOption == 7 and respChartPattern == 5:
-                    with SuppressOutput(suppress_stderr=True, suppress_stdout=True):
-                        if Imports["scipy"]:
-                            isBuyingTrendline = screener.findTrendlines(
-                                fullData, screeningDictionary, saveDictionary
-                            )
+                    isBuyingTrendline = reuse(
+                        "trendlineSupport",
+                        lambda: screener.findTrendlines(
+                            fullData, screeningDictionary, saveDictionary
+                        ),
+                    )
 
-                with hostRef.processingResultsCounter.get_lock():
-                    hostRef.default_logger.info(
-                        f"Processing results for {stock} in {hostRef.processingResultsCounter.value}th results counter"
+                # The prices only go back with the result for a backtest, and
+                # then only the closes of the days that backtestRecord needs
+                # to work out the returns after the screened day.
+                data = (
+                    data[["Close"]].head(backtestPeriodToLookback + 1)
+                    if backtestWindow
+                    else None
+                )
+                hostRef.default_logger.info(
+                    "Processing results for %s in %sth results counter",
+                    stock,
+                    hostRef.processingResultsCounter.value,
+                )
+                if executeOption == 0:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
                     )
-                    if executeOption == 0:
-                        hostRef.processingResultsCounter.value += 1
-                        return (
-                            screeningDictionary,
-                            saveDictionary,
-                            data,
-                            stock,
-                            backtestDuration,
-                        )
-                    if (
-                        (executeOption == 1 or executeOption == 2)
-                        and isBreaking
-                        and isVolumeHigh
-                        and isLtpValid
-                    ):
-                        hostRef.processingResultsCounter.value += 1
-                        return (
-                            screeningDictionary,
-                            saveDictionary,
-                            data,
-                            stock,
-                            backtestDuration,
-                        )
-                    if (
-                        (executeOption == 1 or executeOption == 3)
-                        and (
-                            consolidationValue <= configManager.consolidationPercentage
-                            and consolidationValue != 0
-                        )
-                        and isLtpValid
-                    ):
-                        hostRef.processingResultsCounter.value += 1
-                        return (
-                            screeningDictionary,
-                            saveDictionary,
-                            data,
-                            stock,
-                            backtestDuration,
-                        )
-                    if executeOption == 4 and isLtpValid and isLowestVolume:
-                        hostRef.processingResultsCounter.value += 1
-                        return (
-                            screeningDictionary,
-                            saveDictionary,
-                            data,
-                            stock,
-                            backtestDuration,
-                        )
-                    if executeOption == 5 and isLtpValid and isValidRsi:
-                        hostRef.processingResultsCounter.value += 1
-                        return (
-                            screeningDictionary,
-                            saveDictionary,
-                            data,
-                            stock,
-                            backtestDuration,
-                        )
-                    if executeOption == 6 and isLtpValid:
-                        if reversalOption == 1:
-                            if (
-                                saveDictionary["Pattern"]
-                                in CandlePatterns.reversalPatternsBullish
-                                or isMaReversal > 0
-                            ):
-                                hostRef.processingResultsCounter.value += 1
-                                return (
-                                    screeningDictionary,
-                                    saveDictionary,
-                                    data,
-                                    stock,
-                                    backtestDuration,
-                                )
-                        elif reversalOption == 2:
-                            if (
-                                saveDictionary["Pattern"]
-                                in CandlePatterns.reversalPatternsBearish
-                                or isMaReversal < 0
-                            ):
-                                hostRef.processingResultsCounter.value += 1
-                                return (
-                                    screeningDictionary,
-                                    saveDictionary,
-                                    data,
-                                    stock,
-                                    backtestDuration,
-                                )
-                        elif reversalOption == 3 and isMomentum:
-                            hostRef.processingResultsCounter.value += 1
-                            return (
-                                screeningDictionary,
-                                saveDictionary,
-                                data,
-                                stock,
-                                backtestDuration,
-                            )
-                        elif reversalOption == 4 and isMaSupport:
-                            hostRef.processingResultsCounter.value += 1
-                            return (
-                                screeningDictionary,
-                                saveDictionary,
-                                data,
-                                stock,
-                                backtestDuration,
-                            )
-                        elif (
-                            reversalOption == 5
-                            and isVSA
-                            and saveDictionary["Pattern"]
+                if (
+                    (executeOption == 1 or executeOption == 2)
+                    and isBreaking
+                    and isVolumeHigh
+                    and isLtpValid
+                ):
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if (
+                    (executeOption == 1 or executeOption == 3)
+                    and (
+                        consolidationValue <= configManager.consolidationPercentage
+                        and consolidationValue != 0
+                    )
+                    and isLtpValid
+                ):
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 4 and isLtpValid and isLowestVolume:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 5 and isLtpValid and isValidRsi:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 6 and isLtpValid:
+                    if reversalOption == 1:
+                        if (
+                            saveDictionary["Pattern"]
                             in CandlePatterns.reversalPatternsBullish
+                            or isMaReversal > 0
                         ):
                             hostRef.processingResultsCounter.value += 1
                             return (
@@ -495,53 +619,12 @@ class StockConsumer:
                                 stock,
                                 backtestDuration,
                             )
-                        elif reversalOption == 6 and isNR:
-                            hostRef.processingResultsCounter.value += 1
-                            return (
-                                screeningDictionary,
-                                saveDictionary,
-                                data,
-                                stock,
-                                backtestDuration,
-                            )
-                    if executeOption == 7 and isLtpValid:
-                        if respChartPattern < 3 and isInsideBar:
-                            hostRef.processingResultsCounter.value += 1
-                            return (
-                                screeningDictionary,
-                                saveDictionary,
-                                data,
-                                stock,
-                                backtestDuration,
-                            )
-                        if isConfluence:
-                            hostRef.processingResultsCounter.value += 1
-                            return (
-                                screeningDictionary,
-                                saveDictionary,
-                                data,
-                                stock,
-                                backtestDuration,
-                            )
-                        if isIpoBase and newlyListedOnly and not respChartPattern < 3:
-                            hostRef.processingResultsCounter.value += 1
-                            return (
-                                screeningDictionary,
-                                saveDictionary,
-                                data,
-                                stock,
-                                backtestDuration,
-                            )
-                        if isVCP:
-                            hostRef.processingResultsCounter.value += 1
-                            return (
-                                screeningDictionary,
-                                saveDictionary,
-                                data,
-                                stock,
-                                backtestDuration,
-                            )
-                        if isBuyingTrendline:
+                    elif reversalOption == 2:
+                        if (
+                            saveDictionary["Pattern"]
+                            in CandlePatterns.reversalPatternsBearish
+                            or isMaReversal < 0
+                        ):
                             hostRef.processingResultsCounter.value += 1
                             return (
                                 screeningDictionary,
@@ -550,7 +633,7 @@ class StockConsumer:
                                 stock,
                                 backtestDuration,
                             )
-                    if executeOption == 8 and isLtpValid and isValidCci:
+                    elif reversalOption == 3 and isMomentum:
                         hostRef.processingResultsCounter.value += 1
                         return (
                             screeningDictionary,
@@ -559,7 +642,7 @@ class StockConsumer:
                             stock,
                             backtestDuration,
                         )
-                    if executeOption == 9 and isVolumeHigh:
+                    elif reversalOption == 4 and isMaSupport:
                         hostRef.processingResultsCounter.value += 1
                         return (
                             screeningDictionary,
@@ -568,7 +651,12 @@ class StockConsumer:
                             stock,
                             backtestDuration,
                         )
-                    if executeOption == 10 and isPriceRisingByAtLeast2Percent:
+                    elif (
+                        reversalOption == 5
+                        and isVSA
+                        and saveDictionary["Pattern"]
+                        in CandlePatterns.reversalPatternsBullish
+                    ):
                         hostRef.processingResultsCounter.value += 1
                         return (
                             screeningDictionary,
@@ -577,7 +665,7 @@ class StockConsumer:
                             stock,
                             backtestDuration,
                         )
-                    if executeOption == 11 and isShortTermBullish:
+                    elif reversalOption == 6 and isNR:
                         hostRef.processingResultsCounter.value += 1
                         return (
                             screeningDictionary,
@@ -586,7 +674,8 @@ class StockConsumer:
                             stock,
                             backtestDuration,
                         )
-                    if executeOption == 12 and is15MinutePriceVolumeBreakout:
+                if executeOption == 7 and isLtpValid:
+                    if respChartPattern < 3 and isInsideBar:
                         hostRef.processingResultsCounter.value += 1
                         return (
                             screeningDictionary,
@@ -595,7 +684,7 @@ class StockConsumer:
                             stock,
                             backtestDuration,
                         )
-                    if executeOption == 13 and isBullishIntradayRSIMACD:
+                    if isConfluence:
                         hostRef.processingResultsCounter.value += 1
                         return (
                             screeningDictionary,
@@ -604,7 +693,7 @@ class StockConsumer:
                             stock,
                             backtestDuration,
                         )
-                    if executeOption == 14 and isNR4Day:
+                    if isIpoBase and newlyListedOnly and not respChartPattern < 3:
                         hostRef.processingResultsCounter.value += 1
                         return (
                             screeningDictionary,
@@ -613,14 +702,16 @@ class StockConsumer:
                             stock,
                             backtestDuration,
                         )
-                    if (
-                        (executeOption == 15 and is52WeekLowBreakout) or 
-                        (executeOption == 16 and is10DaysLowBreakout) or 
-                        (executeOption == 17 and is52WeekHighBreakout) or 
-                        (executeOption == 18 and isLtpValid and isAroonCrossover) or
-                        (executeOption == 19 and macdHistBelow0) or
-                        (executeOption == 20 and bullishForTomorrow)
-                    ):
+                    if isVCP:
+                        hostRef.processingResultsCounter.value += 1
+                        return (
+                            screeningDictionary,
+                            saveDictionary,
+                            data,
+                            stock,
+                            backtestDuration,
+                        )
+                    if isBuyingTrendline:
                         hostRef.processingResultsCounter.value += 1
                         return (
                             screeningDictionary,
@@ -629,6 +720,85 @@ class StockConsumer:
                             stock,
                             backtestDuration,
                         )
+                if executeOption == 8 and isLtpValid and isValidCci:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 9 and isVolumeHigh:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 10 and isPriceRisingByAtLeast2Percent:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 11 and isShortTermBullish:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 12 and is15MinutePriceVolumeBreakout:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 13 and isBullishIntradayRSIMACD:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if executeOption == 14 and isNR4Day:
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
+                if (
+                    (executeOption == 15 and is52WeekLowBreakout) or 
+                    (executeOption == 16 and is10DaysLowBreakout) or 
+                    (executeOption == 17 and is52WeekHighBreakout) or 
+                    (executeOption == 18 and isLtpValid and isAroonCrossover) or
+                    (executeOption == 19 and macdHistBelow0) or
+                    (executeOption == 20 and bullishForTomorrow)
+                ):
+                    hostRef.processingResultsCounter.value += 1
+                    return (
+                        screeningDictionary,
+                        saveDictionary,
+                        data,
+                        stock,
+                        backtestDuration,
+                    )
 
         except KeyboardInterrupt:
             # Capturing Ctr+C Here isn't a great idea
@@ -659,20 +829,150 @@ class StockConsumer:
                 )
         return None
 
-    def setupLoggers(self, hostRef, screener, logLevel, stock):
+    # Backtests a stock for every day from backtestDuration days ago till
+    # today in one go. The stock data is loaded and its indicators are
+    # computed once for the whole history, and then each day is screened
+    # with the rows up to that day, just like screenStocks would have done
+    # for that day on its own. Returns the results of all the days on which
+    # the stock made it through the scan.
+    @tracelog
+    def backtestStocks(
+        self,
+        executeOption,
+        reversalOption,
+        maLength,
+        daysForLowestVolume,
+        minRSI,
+        maxRSI,
+        respChartPattern,
+        insideBarToLookback,
+        totalSymbols,
+        shouldCache,
+        stock,
+        newlyListedOnly,
+        downloadOnly,
+        volumeRatio,
+        testbuild=False,
+        printCounter=False,
+        backtestDuration=0,
+        backtestPeriodToLookback=30,
+        logLevel=logging.NOTSET,
+        monitoring=False,
+        dataPrefetched=False,
+        hostRef=None,
+    ):
+        assert (
+            hostRef is not None
+        ), "hostRef argument must not be None. It should b an instance of PKMultiProcessorClient"
+        stockData = None
+        indicatorCache = None
+        try:
+            data = hostRef.objectDictionary.get(stock)
+            # Otherwise screenStocks fetches the data for each day as before
+            if data is not None and (
+                dataPrefetched
+                or (shouldCache and not downloadOnly and not self.isTradingTime)
+            ):
+                with StageTimings.span("cacheRead"):
+                    stockData = pd.DataFrame(
+                        data["data"], columns=data["columns"], index=data["index"]
+                    )
+                indicatorCache = IndicatorCache(stockData)
+        except Exception as e:
+            hostRef.default_logger.debug(e, exc_info=True)
+        results = []
+        # Today (backtestDuration = 0) goes last because preprocessData adds
+        # the indicator columns to the whole stockData in that case.
+        for sampleDays in range(backtestDuration, -1, -1):
+            result = self.screenStocks(
+                executeOption,
+                reversalOption,
+                maLength,
+                daysForLowestVolume,
+                minRSI,
+                maxRSI,
+                respChartPattern,
+                insideBarToLookback,
+                totalSymbols,
+                shouldCache,
+                stock,
+                newlyListedOnly,
+                downloadOnly,
+                volumeRatio,
+                testbuild=testbuild,
+                printCounter=printCounter,
+                backtestDuration=sampleDays,
+                backtestPeriodToLookback=backtestPeriodToLookback,
+                logLevel=logLevel,
+                monitoring=monitoring,
+                dataPrefetched=dataPrefetched,
+                hostRef=hostRef,
+                stockData=stockData,
+                indicatorCache=indicatorCache,
+                backtestWindow=True,
+            )
+            if result is not None:
+                results.append(result)
+        return results
+
+    def setupLoggers(self, hostRef, screener, logLevel, stock, quiet=False):
         # Set the loglevels for both the caller and screener
         # Also add handlers that are specific to this sub-process which
         # will co ntinue with the screening. Each sub-process would have
         # its own logger but going into the same file/console > to that
-        # of the parent logger.
-        hostRef.default_logger.level = logLevel
-        screener.default_logger.level = logLevel
-        hostRef.default_logger.addHandlers(log_file_path=None, levelname=logLevel)
-        screener.default_logger.addHandlers(log_file_path=None, levelname=logLevel)
+        # of the parent logger. This only needs to be done once and not
+        # for each stock.
+        if self.loggersLevel != logLevel:
+            hostRef.default_logger.level = logLevel
+            screener.default_logger.level = logLevel
+            hostRef.default_logger.addHandlers(log_file_path=None, levelname=logLevel)
+            screener.default_logger.addHandlers(log_file_path=None, levelname=logLevel)
+            self.loggersLevel = logLevel
+            # A worker process that has nothing to log or print can have its
+            # output done away with for the rest of the job. Each job has its
+            # own StockConsumer, so this is done again for the next job that
+            # the same worker process gets.
+            if multiprocessing.current_process() is hostRef:
+                if quiet and logLevel != logging.DEBUG:
+                    SuppressOutput.enableQuietMode()
+                else:
+                    SuppressOutput.disableQuietMode()
         hostRef.default_logger.info(
-            f"Beginning the stock screening for stock:{stock}"
+            "Beginning the stock screening for stock:%s", stock
         )
 
+    # The scan plan only depends on the options of the scan, so it is made
+    # once and used for all the stocks and backtest days of the scan
+    def scanPlan(self, configManager, *options):
+        key = (configManager.volumeRatio, configManager.useEMA) + options
+        if key not in self.scanPlans:
+            (
+                executeOption,
+                reversalOption,
+                respChartPattern,
+                newlyListedOnly,
+                maLength,
+                daysForLowestVolume,
+                minRSI,
+                maxRSI,
+                volumeRatio,
+                insideBarToLookback,
+            ) = options
+            self.scanPlans[key] = ScanPlan(
+                configManager,
+                executeOption,
+                reversalOption=reversalOption,
+                respChartPattern=respChartPattern,
+                newlyListedOnly=newlyListedOnly,
+                maLength=maLength,
+                daysForLowestVolume=daysForLowestVolume,
+                minRSI=minRSI,
+                maxRSI=maxRSI,
+                volumeRatio=volumeRatio,
+                insideBarToLookback=insideBarToLookback,
+            )
+        return self.scanPlans[key]
+
     def initResultDictionaries(self):
         screenResults = pd.DataFrame(
             columns=[
@@ -31,113 +31,158 @@ warnings.simplefilter("ignore", DeprecationWarning)
 warnings.simplefilter("ignore", FutureWarning)
 import pandas as pd
 
-from pkscreener import Imports
+import pkscreener.classes.IndicatorKernels as IndicatorKernels
 from pkscreener.classes.ColorText import colorText
 from pkscreener.classes.log import default_logger
 
-if Imports["talib"]:
+try:
     import talib
-else:
-    try:
-        import pandas_ta as talib
-
-        print(
-            colorText.BOLD
-            + colorText.FAIL
-            + "[+] TA-Lib is not installed. Falling back on pandas_ta.\n[+] For full coverage(candle patterns), you may wish to follow instructions from\n[+] https://github.com/ta-lib/ta-lib-python"
-            + colorText.END
-        )
-        sleep(3)
-    except Exception as e:
-        default_logger().debug(e, exc_info=True)
-        import talib
+except Exception as e:
+    default_logger().debug(e, exc_info=True)
+    talib = None
+
+# The backends that are available, found once when this module is imported
+BACKENDS = {"talib": talib is not None, "numpy": True}
+
+if not BACKENDS["talib"]:
+    print(
+        colorText.BOLD
+        + colorText.FAIL
+        + "[+] TA-Lib is not installed. Falling back on the built-in indicators.\n[+] For full coverage(candle patterns), you may wish to follow instructions from\n[+] https://github.com/ta-lib/ta-lib-python"
+        + colorText.END
+    )
+    sleep(3)
+
+CANDLE_PATTERNS = [
+    "CDLMORNINGSTAR",
+    "CDLMORNINGDOJISTAR",
+    "CDLEVENINGSTAR",
+    "CDLEVENINGDOJISTAR",
+    "CDLLADDERBOTTOM",
+    "CDL3LINESTRIKE",
+    "CDL3BLACKCROWS",
+    "CDL3INSIDE",
+    "CDL3OUTSIDE",
+    "CDL3WHITESOLDIERS",
+    "CDLHARAMI",
+    "CDLHARAMICROSS",
+    "CDLMARUBOZU",
+    "CDLHANGINGMAN",
+    "CDLHAMMER",
+    "CDLINVERTEDHAMMER",
+    "CDLSHOOTINGSTAR",
+    "CDLDRAGONFLYDOJI",
+    "CDLGRAVESTONEDOJI",
+    "CDLDOJI",
+    "CDLENGULFING",
+]
+
+
+def talibFunction(name):
+    return lambda *args: getattr(talib, name)(*args)
+
+
+# The implementations of each indicator by backend, the fastest one first.
+# TA-Lib only has the candle patterns.
+REGISTRY = {
+    "EMA": [("talib", talibFunction("EMA")), ("numpy", IndicatorKernels.ema)],
+    "SMA": [("talib", talibFunction("SMA")), ("numpy", IndicatorKernels.sma)],
+    "MA": [("talib", talibFunction("MA")), ("numpy", IndicatorKernels.sma)],
+    "MACD": [("talib", talibFunction("MACD")), ("numpy", IndicatorKernels.macd)],
+    "RSI": [("talib", talibFunction("RSI")), ("numpy", IndicatorKernels.rsi)],
+    "CCI": [("talib", talibFunction("CCI")), ("numpy", IndicatorKernels.cci)],
+    "AROON": [("talib", talibFunction("AROON")), ("numpy", IndicatorKernels.aroon)],
+    "STOCHRSI": [
+        ("talib", talibFunction("STOCHRSI")),
+        ("numpy", IndicatorKernels.stochrsi),
+    ],
+}
+REGISTRY.update(
+    {pattern: [("talib", talibFunction(pattern))] for pattern in CANDLE_PATTERNS}
+)
+
+
+# Picks the first implementation of each indicator whose backend is available
+def selectImplementations(registry, backends):
+    selected = {}
+    for indicator, implementations in registry.items():
+        for backend, implementation in implementations:
+            if backends.get(backend, False):
+                selected[indicator] = (backend, implementation)
+                break
+    return selected
+
+
+IMPLEMENTATIONS = selectImplementations(REGISTRY, BACKENDS)
+
+
+# Runs the selected implementation of the indicator. 2-D (stocks x days)
+# arrays always go to the NumPy one, since TA-Lib only takes 1-D arrays.
+# The arrays that NumPy returns for a Series get the index of the Series,
+# as they do from TA-Lib. Returns None if no backend has the indicator.
+def compute(indicator, *args):
+    inputs = [arg for arg in args if isinstance(arg, (pd.Series, np.ndarray))]
+    if any(np.ndim(values) == 2 for values in inputs):
+        return dict(REGISTRY[indicator])["numpy"](*args)
+    backend, implementation = IMPLEMENTATIONS.get(indicator, (None, None))
+    if implementation is None:
+        return None
+    result = implementation(*args)
+    if backend == "numpy" and isinstance(inputs[0], pd.Series):
+        index = inputs[0].index
+        if isinstance(result, tuple):
+            return tuple(pd.Series(values, index=index) for values in result)
+        return pd.Series(result, index=index)
+    return result
 
 
 class pktalib:
     @classmethod
     def EMA(self, close, timeperiod):
-        try:
-            return talib.ema(close, timeperiod)
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.EMA(close, timeperiod)
+        return compute("EMA", close, timeperiod)
 
     @classmethod
     def SMA(self, close, timeperiod):
-        try:
-            return talib.sma(close, timeperiod)
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.SMA(close, timeperiod)
+        return compute("SMA", close, timeperiod)
 
     @classmethod
     def MA(self, close, timeperiod):
-        try:
-            return talib.ma(close, timeperiod)
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.MA(close, timeperiod)
+        return compute("MA", close, timeperiod)
 
     @classmethod
     def MACD(self, close, fast, slow, signal):
-        try:
-            return talib.macd(close, fast, slow, signal,talib=Imports["talib"])
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.MACD(close, fast, slow, signal)
+        return compute("MACD", close, fast, slow, signal)
 
     @classmethod
     def RSI(self, close, timeperiod):
-        try:
-            return talib.rsi(close, timeperiod)
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.RSI(close, timeperiod)
+        return compute("RSI", close, timeperiod)
 
     @classmethod
     def CCI(self, high, low, close, timeperiod):
-        try:
-            return talib.cci(high, low, close, timeperiod)
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CCI(high, low, close, timeperiod)
+        return compute("CCI", high, low, close, timeperiod)
 
+    # A DataFrame with the Aroon down and up of a Series, or the arrays of
+    # both for 2-D arrays
     @classmethod
     def Aroon(self, high, low, timeperiod):
-        try:
-            return talib.aroon(high, low, timeperiod)
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            aroon_down, aroon_up = talib.AROON(high, low, timeperiod)
-            aroon_up.name = f"AROONU_{timeperiod}"
-            aroon_down.name = f"AROOND_{timeperiod}"
-            data = {
-                aroon_down.name: aroon_down,
-                aroon_up.name: aroon_up,
-            }
-            return pd.DataFrame(data)
-        
+        aroon_down, aroon_up = compute("AROON", high, low, timeperiod)
+        if np.ndim(high) == 2:
+            return aroon_down, aroon_up
+        aroon_up.name = f"AROONU_{timeperiod}"
+        aroon_down.name = f"AROOND_{timeperiod}"
+        data = {
+            aroon_down.name: aroon_down,
+            aroon_up.name: aroon_up,
+        }
+        return pd.DataFrame(data)
+
     @classmethod
     def STOCHRSI(self, close, timeperiod, fastk_period, fastd_period, fastd_matype):
-        try:
-            _name = "STOCHRSI"
-            _props = f"_{timeperiod}_{timeperiod}_{fastk_period}_{fastd_period}"
-            stochrsi_kname = f"{_name}k{_props}"
-            stochrsi_dname = f"{_name}d{_props}"
-            df = talib.stochrsi(
-                close,
-                length=timeperiod,
-                rsi_length=timeperiod,
-                k=fastk_period,
-                d=fastd_period,
-                mamode=fastd_matype,
-            )
-            return df[stochrsi_kname], df[stochrsi_dname]
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.STOCHRSI(
-                close.values, timeperiod, fastk_period, fastd_period, fastd_matype
-            )
+        if isinstance(close, pd.Series):
+            close = close.values
+        return compute(
+            "STOCHRSI", close, timeperiod, fastk_period, fastd_period, fastd_matype
+        )
 
     @classmethod
     def ichimoku(
@@ -152,171 +197,87 @@ class pktalib:
 
     @classmethod
     def CDLMORNINGSTAR(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "morningstar")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLMORNINGSTAR(open, high, low, close)
+        return compute("CDLMORNINGSTAR", open, high, low, close)
 
     @classmethod
     def CDLMORNINGDOJISTAR(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "morningdojistar")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLMORNINGDOJISTAR(open, high, low, close)
+        return compute("CDLMORNINGDOJISTAR", open, high, low, close)
 
     @classmethod
     def CDLEVENINGSTAR(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "eveningstar")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLEVENINGSTAR(open, high, low, close)
+        return compute("CDLEVENINGSTAR", open, high, low, close)
 
     @classmethod
     def CDLEVENINGDOJISTAR(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "eveningdojistar")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLEVENINGDOJISTAR(open, high, low, close)
+        return compute("CDLEVENINGDOJISTAR", open, high, low, close)
 
     @classmethod
     def CDLLADDERBOTTOM(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "ladderbottom")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLLADDERBOTTOM(open, high, low, close)
+        return compute("CDLLADDERBOTTOM", open, high, low, close)
 
     @classmethod
     def CDL3LINESTRIKE(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "3linestrike")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDL3LINESTRIKE(open, high, low, close)
+        return compute("CDL3LINESTRIKE", open, high, low, close)
 
     @classmethod
     def CDL3BLACKCROWS(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "3blackcrows")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDL3BLACKCROWS(open, high, low, close)
+        return compute("CDL3BLACKCROWS", open, high, low, close)
 
     @classmethod
     def CDL3INSIDE(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "3inside")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDL3INSIDE(open, high, low, close)
+        return compute("CDL3INSIDE", open, high, low, close)
 
     @classmethod
     def CDL3OUTSIDE(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "3outside")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDL3OUTSIDE(open, high, low, close)
+        return compute("CDL3OUTSIDE", open, high, low, close)
 
     @classmethod
     def CDL3WHITESOLDIERS(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "3whitesoldiers")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDL3WHITESOLDIERS(open, high, low, close)
+        return compute("CDL3WHITESOLDIERS", open, high, low, close)
 
     @classmethod
     def CDLHARAMI(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "harami")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLHARAMI(open, high, low, close)
+        return compute("CDLHARAMI", open, high, low, close)
 
     @classmethod
     def CDLHARAMICROSS(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "haramicross")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLHARAMICROSS(open, high, low, close)
+        return compute("CDLHARAMICROSS", open, high, low, close)
 
     @classmethod
     def CDLMARUBOZU(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "marubozu")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLMARUBOZU(open, high, low, close)
+        return compute("CDLMARUBOZU", open, high, low, close)
 
     @classmethod
     def CDLHANGINGMAN(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "hangingman")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLHANGINGMAN(open, high, low, close)
+        return compute("CDLHANGINGMAN", open, high, low, close)
 
     @classmethod
     def CDLHAMMER(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "hammer")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLHAMMER(open, high, low, close)
+        return compute("CDLHAMMER", open, high, low, close)
 
     @classmethod
     def CDLINVERTEDHAMMER(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "invertedhammer")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLINVERTEDHAMMER(open, high, low, close)
+        return compute("CDLINVERTEDHAMMER", open, high, low, close)
 
     @classmethod
     def CDLSHOOTINGSTAR(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "shootingstar")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLSHOOTINGSTAR(open, high, low, close)
+        return compute("CDLSHOOTINGSTAR", open, high, low, close)
 
     @classmethod
     def CDLDRAGONFLYDOJI(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "dragonflydoji")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLDRAGONFLYDOJI(open, high, low, close)
+        return compute("CDLDRAGONFLYDOJI", open, high, low, close)
 
     @classmethod
     def CDLGRAVESTONEDOJI(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "gravestonedoji")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLGRAVESTONEDOJI(open, high, low, close)
+        return compute("CDLGRAVESTONEDOJI", open, high, low, close)
 
     @classmethod
     def CDLDOJI(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "doji")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLDOJI(open, high, low, close)
+        return compute("CDLDOJI", open, high, low, close)
 
     @classmethod
     def CDLENGULFING(self, open, high, low, close):
-        try:
-            return talib.cdl_pattern(open, high, low, close, "engulfing")
-        except Exception as e:
-            default_logger().debug(e, exc_info=True)
-            return talib.CDLENGULFING(open, high, low, close)
+        return compute("CDLENGULFING", open, high, low, close)
 
     @classmethod
     def argrelextrema(self, data, comparator, axis=0, order=1, mode="clip"):
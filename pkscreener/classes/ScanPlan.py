@@ -0,0 +1,421 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import numpy as np
+
+from pkscreener.classes.IndicatorCache import requiredIndicators
+from pkscreener.classes.SuppressOutput import SuppressOutput
+
+# Predicates roughly in the order of how expensive they are to find out.
+# The predicates of a plan are always run in this order.
+PREDICATES = [
+    "ltp",
+    "volume",
+    "consolidation",
+    "lowestVolume",
+    "rsi",
+    "cciInRange",
+    "priceRisingByAtLeast2Percent",
+    "momentum",
+    "volumeSpreadAnalysis",
+    "breakout",
+    "narrowRange",
+    "52WeekHighBreakout",
+    "52WeekLowBreakout",
+    "10DaysLowBreakout",
+    "NR4Day",
+    "15MinutePriceVolumeBreakout",
+    "MACDHistogramBelow0",
+    "bullishForTomorrow",
+    "bullishIntradayRSIMACD",
+    "aroonBullishCrossover",
+    "reversalMA",
+    "confluence",
+    "trendUp",
+    "insideBar",
+    "ipoBase",
+    "shortTermBullish",
+    "VCP",
+    "trendlineSupport",
+]
+
+
+# A dictionary that keeps the order in which its keys were set, so that the
+# writes of each check can be told apart
+class RecordingDict(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.written = []
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.written.append(key)
+
+
+# A scan plan lists what a stock must satisfy for the selected scanner
+# (executeOption, reversalOption and respChartPattern) to show up in the
+# results. Each plan is a list of alternatives and a stock passes when all
+# the predicates of any one alternative are true. The plan only rejects
+# stocks that StockConsumer.screenStocks would reject anyway, so that the
+# full set of checks for the display columns runs only for the stocks that
+# pass it. An alternative with no predicates lets every stock through.
+class ScanPlan:
+    def __init__(
+        self,
+        configManager,
+        executeOption,
+        reversalOption=None,
+        respChartPattern=None,
+        newlyListedOnly=False,
+        maLength=None,
+        daysForLowestVolume=None,
+        minRSI=0,
+        maxRSI=100,
+        volumeRatio=None,
+        insideBarToLookback=7,
+    ):
+        self.configManager = configManager
+        self.executeOption = executeOption
+        self.reversalOption = reversalOption
+        self.respChartPattern = respChartPattern
+        self.newlyListedOnly = newlyListedOnly
+        self.maLength = maLength
+        self.daysForLowestVolume = daysForLowestVolume
+        self.minRSI = minRSI
+        self.maxRSI = maxRSI
+        self.volumeRatio = (
+            configManager.volumeRatio
+            if volumeRatio is None or volumeRatio <= 0
+            else volumeRatio
+        )
+        self.insideBarToLookback = insideBarToLookback
+        self.alternatives = [
+            sorted(alternative, key=PREDICATES.index)
+            for alternative in self.planAlternatives()
+        ]
+        self.indicators = requiredIndicators(
+            executeOption, reversalOption=reversalOption, useEMA=configManager.useEMA
+        )
+
+    def planAlternatives(self):
+        executeOption = self.executeOption
+        breakoutWithVolume = ["ltp", "volume", "breakout"]
+        consolidation = ["ltp", "consolidation"]
+        if executeOption == 1:
+            return [consolidation, breakoutWithVolume]
+        if executeOption == 2:
+            return [breakoutWithVolume]
+        if executeOption == 3:
+            return [consolidation]
+        if executeOption == 4:
+            return [["ltp", "lowestVolume"]]
+        if executeOption == 5:
+            return [["ltp", "rsi"]]
+        if executeOption == 6:
+            return {
+                # Candle patterns are decided only after all the checks ran
+                1: [["ltp"]],
+                2: [["ltp"]],
+                3: [["ltp", "momentum"]],
+                4: [["ltp", "reversalMA"]],
+                5: [["ltp", "volumeSpreadAnalysis"]],
+                6: [["ltp", "narrowRange"]],
+            }.get(self.reversalOption, [])
+        if executeOption == 7:
+            ipoBase = [["ltp", "ipoBase"]] if self.newlyListedOnly else []
+            if self.respChartPattern < 3:
+                return [["ltp", "insideBar"]]
+            return {
+                3: [["ltp", "confluence"]],
+                4: [["ltp", "VCP"]],
+                5: [["ltp", "trendlineSupport"]],
+            }.get(self.respChartPattern, []) + ipoBase
+        if executeOption == 8:
+            return [["ltp", "cciInRange", "trendUp"]]
+        return {
+            9: [["volume"]],
+            10: [["priceRisingByAtLeast2Percent"]],
+            11: [["shortTermBullish"]],
+            12: [["15MinutePriceVolumeBreakout"]],
+            13: [["bullishIntradayRSIMACD"]],
+            14: [["NR4Day"]],
+            15: [["52WeekLowBreakout"]],
+            16: [["10DaysLowBreakout"]],
+            17: [["52WeekHighBreakout"]],
+            18: [["ltp", "aroonBullishCrossover"]],
+            19: [["MACDHistogramBelow0"]],
+            20: [["bullishForTomorrow"]],
+        }.get(executeOption, [[]])
+
+    # The checks write into copies of the result dictionaries so that the
+    # display columns are filled in the usual order for the stocks that pass.
+    # Returns None for the stocks that do not pass, and otherwise the context
+    # with what each check returned and wrote, for reuse() to take over.
+    def passes(
+        self,
+        stock,
+        screener,
+        fullData,
+        processedData,
+        indicators=None,
+        screenDict=None,
+        saveDict=None,
+    ):
+        context = {
+            "stock": stock,
+            "screener": screener,
+            "fullData": fullData,
+            "processedData": processedData,
+            "indicators": indicators,
+            "screenDict": RecordingDict(screenDict or {"Stock": stock}),
+            "saveDict": RecordingDict(saveDict or {"Stock": stock}),
+            "results": {},
+            "values": {},
+            "written": {},
+        }
+        for alternative in self.alternatives:
+            if all(self.check(predicate, context) for predicate in alternative):
+                return context
+        return None
+
+    def check(self, predicate, context):
+        results = context["results"]
+        if predicate not in results:
+            screenDict, saveDict = context["screenDict"], context["saveDict"]
+            screenWrites, saveWrites = len(screenDict.written), len(saveDict.written)
+            value = getattr(self, f"check_{predicate}")(context)
+            context["values"][predicate] = value
+            context["written"][predicate] = (
+                {key: screenDict[key] for key in screenDict.written[screenWrites:]},
+                {key: saveDict[key] for key in saveDict.written[saveWrites:]},
+            )
+            isTrue = getattr(self, f"isTrue_{predicate}", bool)
+            results[predicate] = bool(isTrue(value))
+        return results[predicate]
+
+    # What the check of the predicate returned, when passes() already ran it,
+    # after writing what it wrote into the result dictionaries again. The
+    # check is run otherwise.
+    def reuse(self, context, predicate, screenDict, saveDict, check):
+        if context is None or predicate not in context["values"]:
+            return check()
+        screenWritten, saveWritten = context["written"][predicate]
+        screenDict.update(screenWritten)
+        saveDict.update(saveWritten)
+        return context["values"][predicate]
+
+    def check_ltp(self, context):
+        return context["screener"].validateLTP(
+            context["fullData"],
+            context["screenDict"],
+            context["saveDict"],
+            minLTP=self.configManager.minLTP,
+            maxLTP=self.configManager.maxLTP,
+        )
+
+    # validateLTP also tells whether the stock is in stage two
+    def isTrue_ltp(self, value):
+        return value[0]
+
+    def check_volume(self, context):
+        return context["screener"].validateVolume(
+            context["processedData"],
+            context["screenDict"],
+            context["saveDict"],
+            volumeRatio=self.volumeRatio,
+        )
+
+    def check_consolidation(self, context):
+        return context["screener"].validateConsolidation(
+            context["processedData"],
+            context["screenDict"],
+            context["saveDict"],
+            percentage=self.configManager.consolidationPercentage,
+        )
+
+    def isTrue_consolidation(self, value):
+        return value <= self.configManager.consolidationPercentage and value != 0
+
+    def check_lowestVolume(self, context):
+        return context["screener"].validateLowestVolume(
+            context["processedData"], self.daysForLowestVolume
+        )
+
+    def check_rsi(self, context):
+        return context["screener"].validateRSI(
+            context["processedData"],
+            context["screenDict"],
+            context["saveDict"],
+            self.minRSI,
+            self.maxRSI,
+        )
+
+    # The range part of validateCCI. The trend part is trendUp.
+    def check_cciInRange(self, context):
+        cci = context["processedData"]["CCI"].iloc[0]
+        cci = int(cci) if np.isfinite(cci) else 0
+        return cci <= self.minRSI or cci >= self.maxRSI
+
+    def check_priceRisingByAtLeast2Percent(self, context):
+        return context["screener"].validatePriceRisingByAtLeast2Percent(
+            context["processedData"], context["screenDict"], context["saveDict"]
+        )
+
+    def check_momentum(self, context):
+        return context["screener"].validateMomentum(
+            context["processedData"], context["screenDict"], context["saveDict"]
+        )
+
+    def check_volumeSpreadAnalysis(self, context):
+        return context["screener"].validateVolumeSpreadAnalysis(
+            context["processedData"], context["screenDict"], context["saveDict"]
+        )
+
+    def check_breakout(self, context):
+        return context["screener"].findBreakout(
+            context["processedData"],
+            context["screenDict"],
+            context["saveDict"],
+            daysToLookback=self.configManager.daysToLookback,
+        )
+
+    def check_narrowRange(self, context):
+        with SuppressOutput(suppress_stderr=True, suppress_stdout=True):
+            return context["screener"].validateNarrowRange(
+                context["processedData"],
+                context["screenDict"],
+                context["saveDict"],
+                nr=4 if self.maLength is None else self.maLength,
+            )
+
+    def check_52WeekHighBreakout(self, context):
+        return context["screener"].find52WeekHighBreakout(context["fullData"])
+
+    def check_52WeekLowBreakout(self, context):
+        return context["screener"].find52WeekLowBreakout(context["fullData"])
+
+    def check_10DaysLowBreakout(self, context):
+        return context["screener"].find10DaysLowBreakout(context["fullData"])
+
+    def check_NR4Day(self, context):
+        return context["screener"].findNR4Day(
+            context["fullData"], indicators=context["indicators"]
+        )
+
+    def check_15MinutePriceVolumeBreakout(self, context):
+        return context["screener"].validate15MinutePriceVolumeBreakout(
+            context["fullData"], indicators=context["indicators"]
+        )
+
+    def check_MACDHistogramBelow0(self, context):
+        return context["screener"].validateMACDHistogramBelow0(
+            context["fullData"], indicators=context["indicators"]
+        )
+
+    def check_bullishForTomorrow(self, context):
+        return context["screener"].validateBullishForTomorrow(
+            context["fullData"], indicators=context["indicators"]
+        )
+
+    def check_bullishIntradayRSIMACD(self, context):
+        return context["screener"].findBullishIntradayRSIMACD(
+            context["fullData"], indicators=context["indicators"]
+        )
+
+    def check_aroonBullishCrossover(self, context):
+        return context["screener"].findAroonBullishCrossover(
+            context["fullData"], indicators=context["indicators"]
+        )
+
+    def check_reversalMA(self, context):
+        if self.maLength is None:
+            return False
+        return context["screener"].findReversalMA(
+            context["fullData"],
+            context["screenDict"],
+            context["saveDict"],
+            self.maLength,
+            indicators=context["indicators"],
+        )
+
+    def check_confluence(self, context):
+        return context["screener"].validateConfluence(
+            context["stock"],
+            context["processedData"],
+            context["screenDict"],
+            context["saveDict"],
+            percentage=self.insideBarToLookback,
+        )
+
+    def check_trendUp(self, context):
+        return context["screener"].findTrend(
+            context["processedData"],
+            context["screenDict"],
+            context["saveDict"],
+            daysToLookback=self.configManager.daysToLookback,
+            stockName=context["stock"],
+        )
+
+    def isTrue_trendUp(self, value):
+        return "Up" in value
+
+    # validateInsideBar looks at the trend and the moving average signal
+    def check_insideBar(self, context):
+        context["screener"].validateMovingAverages(
+            context["processedData"],
+            context["screenDict"],
+            context["saveDict"],
+            maRange=1.25,
+        )
+        self.check("trendUp", context)
+        return context["screener"].validateInsideBar(
+            context["processedData"],
+            context["screenDict"],
+            context["saveDict"],
+            chartPattern=self.respChartPattern,
+            daysToLookback=self.insideBarToLookback,
+        )
+
+    def check_ipoBase(self, context):
+        return self.newlyListedOnly and context["screener"].validateIpoBase(
+            context["stock"],
+            context["fullData"],
+            context["screenDict"],
+            context["saveDict"],
+        )
+
+    def check_shortTermBullish(self, context):
+        return context["screener"].validateShortTermBullish(
+            context["fullData"], context["screenDict"], context["saveDict"]
+        )
+
+    def check_VCP(self, context):
+        return context["screener"].validateVCP(
+            context["fullData"], context["screenDict"], context["saveDict"]
+        )
+
+    def check_trendlineSupport(self, context):
+        return context["screener"].findTrendlines(
+            context["fullData"], context["screenDict"], context["saveDict"]
+        )
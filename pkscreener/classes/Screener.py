@@ -38,14 +38,14 @@ warnings.simplefilter("ignore", DeprecationWarning)
 warnings.simplefilter("ignore", FutureWarning)
 import pandas as pd
 
+import pkscreener.classes.SwingPoints as SwingPoints
+import pkscreener.classes.Trendlines as Trendlines
 import pkscreener.classes.Utility as Utility
-from pkscreener import Imports
+from pkscreener.classes.IndicatorCache import IndicatorCache
 from pkscreener.classes.Pktalib import pktalib
+from pkscreener.classes.StageTimings import timed
 
 # from sklearn.preprocessing import StandardScaler
-if Imports["scipy"]:
-    from scipy.stats import linregress
-
 from pkscreener.classes.ColorText import colorText
 from pkscreener.classes.SuppressOutput import SuppressOutput
 
@@ -72,6 +72,7 @@ class tools:
         self.default_logger = default_logger
  
     # Find stocks that have broken through 52 week low.
+    @timed
     def find52WeekHighBreakout(self, data):
         # https://chartink.com/screener/52-week-low-breakout
         data = data.fillna(0)
@@ -89,6 +90,7 @@ class tools:
     
 
     # Find stocks that have broken through 52 week low.
+    @timed
     def find52WeekLowBreakout(self, data):
         # https://chartink.com/screener/52-week-low-breakout
         data = data.fillna(0)
@@ -105,6 +107,7 @@ class tools:
         return (recent <= full52WeekLow) or (last1WeekLow <= min(full52WeekLow,last1WeekLow)) or (last1WeekLow <= previousWeekLow <= min(full52WeekLow,previousWeekLow))
     
         # Find stocks that have broken through 52 week low.
+    @timed
     def find10DaysLowBreakout(self, data):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
@@ -118,25 +121,28 @@ class tools:
         return (recent <= min(previousWeekLow,last1WeekLow)) and (last1WeekLow <= previousWeekLow)
     
         # Find stocks that have broken through 52 week low.
-    def findAroonBullishCrossover(self, data):
+    @timed
+    def findAroonBullishCrossover(self, data, indicators=None):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
         period = 14
         data = data[::-1]  # Reverse the dataframe so that its the oldest date first
-        aroondf = pktalib.Aroon(data['High'],data['Low'], period)
+        indicators = IndicatorCache(data) if indicators is None else indicators
+        aroondf = indicators.get("AROON", period)
         recent = aroondf.tail(1)
         up = recent[f"AROONU_{period}"].iloc[0]
         down = recent[f"AROOND_{period}"].iloc[0]
         return up > down
     
     # Find accurate breakout value
+    @timed
     def findBreakout(self, data, screenDict, saveDict, daysToLookback):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
         recent = data.head(1)
         data = data[1:]
-        hs = round(data.describe()["High"]["max"], 2)
-        hc = round(data.describe()["Close"]["max"], 2)
+        hs = round(data["High"].max(), 2)
+        hc = round(data["Close"].max(), 2)
         rc = round(recent["Close"].iloc[0], 2)
         if np.isnan(hc) or np.isnan(hs):
             saveDict["Breakout"] = "BO: Unknown"
@@ -246,31 +252,35 @@ class tools:
             return False
 
     # Find stocks that are bullish intraday: RSI crosses 55, Macd Histogram positive, price above EMA 10
-    def findBullishIntradayRSIMACD(self, data):
+    @timed
+    def findBullishIntradayRSIMACD(self, data, indicators=None):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
         data = data[::-1]  # Reverse the dataframe so that its the oldest date first
-        data["RSI12"] = pktalib.RSI(data["Close"], 12)
-        data["EMA10"] = pktalib.EMA(data["Close"], 10)
-        data["EMA200"] = pktalib.EMA(data["Close"], 200)
-        macd = pktalib.MACD(data["Close"], 10, 18, 9)[2].tail(1)
+        indicators = IndicatorCache(data) if indicators is None else indicators
+        data["RSI12"] = indicators.get("RSI", 12)
+        data["EMA10"] = indicators.get("EMA", 10)
+        data["EMA200"] = indicators.get("EMA", 200)
+        macd = indicators.get("MACD", 10, 18, 9)[2].tail(1)
         recent = data.tail(1)
         cond1 = recent["RSI12"].iloc[0] > 55
-        cond2 = cond1 and (macd.iloc[:1][0] > 0)
+        cond2 = cond1 and (macd.iloc[0] > 0)
         cond3 = cond2 and (recent["Close"].iloc[0] > recent["EMA10"].iloc[0])
         cond4 = cond3 and (recent["Close"].iloc[0] > recent["EMA200"].iloc[0])
         return cond4
 
-    def findNR4Day(self, data):
+    @timed
+    def findNR4Day(self, data, indicators=None):
         # https://chartink.com/screener/nr4-daily-today
         if data.tail(1)["Volume"].iloc[0] <= 50000:
             return False
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
         data = data[::-1]  # Reverse the dataframe so that its the oldest date first
-        data["SMA10"] = pktalib.SMA(data["Close"], 10)
-        data["SMA50"] = pktalib.SMA(data["Close"], 50)
-        data["SMA200"] = pktalib.SMA(data["Close"], 200)
+        indicators = IndicatorCache(data) if indicators is None else indicators
+        data["SMA10"] = indicators.get("SMA", 10)
+        data["SMA50"] = indicators.get("SMA", 50)
+        data["SMA200"] = indicators.get("SMA", 200)
         recent = data.tail(5)
         recent = recent[::-1]
         cond1 = (recent["High"].iloc[0] - recent["Low"].iloc[0]) < (
@@ -290,17 +300,21 @@ class tools:
         return cond6
 
     # Find stock reversing at given MA
-    def findReversalMA(self, data, screenDict, saveDict, maLength, percentage=0.02):
+    @timed
+    def findReversalMA(
+        self, data, screenDict, saveDict, maLength, percentage=0.02, indicators=None
+    ):
         maRange = [10,20,50,200]
         results = []
         hasReversals = False
         data = data[::-1]
+        indicators = IndicatorCache(data) if indicators is None else indicators
         for maLength in maRange:
             dataCopy = data
             if self.configManager.useEMA:
-                maRev = pktalib.EMA(dataCopy["Close"], timeperiod=maLength)
+                maRev = indicators.get("EMA", maLength, filled=False)
             else:
-                maRev = pktalib.MA(dataCopy["Close"], timeperiod=maLength)
+                maRev = indicators.get("MA", maLength, filled=False)
             try:
                 dataCopy.drop('maRev', axis=1, inplace=True, errors='ignore')
             except Exception:
@@ -329,138 +343,93 @@ class tools:
         return hasReversals
 
     # Find out trend for days to lookback
+    @timed
     def findTrend(self, data, screenDict, saveDict, daysToLookback=None, stockName=""):
         if daysToLookback is None:
             daysToLookback = self.configManager.daysToLookback
         data = data.head(daysToLookback)
         data = data[::-1]
-        data = data.set_index(np.arange(len(data)))
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
-        try:
-            with SuppressOutput(suppress_stdout=True, suppress_stderr=True):
-                data["tops"] = data["Close"].iloc[
-                    list(
-                        pktalib.argrelextrema(
-                            np.array(data["Close"]), np.greater_equal, order=1
-                        )[0]
-                    )
-                ]
-            data = data.fillna(0)
-            data = data.replace([np.inf, -np.inf], 0)
-
-            try:
-                if len(data) < daysToLookback:
-                    raise StockDataNotAdequate
-                slope, c = np.polyfit(
-                    data.index[data.tops > 0], data["tops"][data.tops > 0], 1
-                )
-            except Exception as e:
-                self.default_logger.debug(e, exc_info=True)
-                slope, _ = 0, 0
-            angle = np.rad2deg(np.arctan(slope))
-            if angle == 0:
-                screenDict["Trend"] = (
-                    colorText.BOLD + colorText.WARN + "Unknown" + colorText.END
-                )
-                saveDict["Trend"] = "Unknown"
-            elif angle <= 30 and angle >= -30:
-                screenDict["Trend"] = (
-                    colorText.BOLD + colorText.WARN + "Sideways" + colorText.END
-                )
-                saveDict["Trend"] = "Sideways"
-            elif angle >= 30 and angle < 61:
-                screenDict["Trend"] = (
-                    colorText.BOLD + colorText.GREEN + "Weak Up" + colorText.END
-                )
-                saveDict["Trend"] = "Weak Up"
-            elif angle >= 60:
-                screenDict["Trend"] = (
-                    colorText.BOLD + colorText.GREEN + "Strong Up" + colorText.END
-                )
-                saveDict["Trend"] = "Strong Up"
-            elif angle <= -30 and angle > -61:
-                screenDict["Trend"] = (
-                    colorText.BOLD + colorText.FAIL + "Weak Down" + colorText.END
-                )
-                saveDict["Trend"] = "Weak Down"
-            elif angle <= -60:
-                screenDict["Trend"] = (
-                    colorText.BOLD + colorText.FAIL + "Strong Down" + colorText.END
-                )
-                saveDict["Trend"] = "Strong Down"
-        except np.linalg.LinAlgError as e:
-            self.default_logger.debug(e, exc_info=True)
-            screenDict["Trend"] = (
-                colorText.BOLD + colorText.WARN + "Unknown" + colorText.END
-            )
-            saveDict["Trend"] = "Unknown"
-        return saveDict["Trend"]
+        # Stocks with fewer days than daysToLookback are padded with NaN and
+        # their trend is Unknown
+        closes = np.full(daysToLookback, np.nan)
+        if len(data) > 0:
+            closes[-len(data) :] = data["Close"].to_numpy(dtype=np.float64)
+        slope = self.findTrendSlopes(closes)[0]
+        return self.describeTrend(slope, screenDict, saveDict)
+
+    # The slope of the least-squares line through the local tops of the
+    # closes of every row (stocks x days, oldest day first), the same as
+    # np.polyfit(days, tops, 1) for each of them. The tops are the swing
+    # highs of order 1 of the closes above 0. Rows with missing (NaN) days
+    # or with no line through the tops get NaN.
+    @staticmethod
+    def findTrendSlopes(closes):
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        rows, days = closes.shape
+        if days == 0:
+            return np.full(rows, np.nan)
+        with np.errstate(invalid="ignore"):
+            isTop = SwingPoints.swingHighs(closes, 1) & (closes > 0)
+        x = np.ma.masked_array(
+            np.broadcast_to(np.arange(days, dtype=np.float64), closes.shape),
+            mask=~isTop,
+        )
+        y = np.ma.masked_array(closes, mask=~isTop)
+        tops = isTop.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dx = x - x.mean(axis=1)[:, None]
+            dy = y - y.mean(axis=1)[:, None]
+            fitted = ((dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)).filled(np.nan)
+            # polyfit scales its system before solving it, so for a single
+            # top it finds the minimum-norm line, whose slope is y / 2x. It
+            # cannot fit a single top on the first day.
+            single = (y.sum(axis=1) / (2 * x.sum(axis=1))).filled(np.nan)
+        slopes = np.where(tops >= 2, fitted, np.nan)
+        slopes = np.where((tops == 1) & (x.sum(axis=1).filled(0) > 0), single, slopes)
+        slopes[np.isnan(closes).any(axis=1)] = np.nan
+        return slopes
+
+    # Labels the trend by the angle of the slope from findTrendSlopes. As with
+    # the old polyfit, a slope of exactly 0 is taken as no trend at all.
+    @staticmethod
+    def describeTrend(slope, screenDict, saveDict):
+        angle = np.rad2deg(np.arctan(slope))
+        if np.isnan(angle) or angle == 0:
+            trend, color = "Unknown", colorText.WARN
+        elif angle <= 30 and angle >= -30:
+            trend, color = "Sideways", colorText.WARN
+        elif angle >= 30 and angle < 61:
+            trend, color = "Weak Up", colorText.GREEN
+        elif angle >= 60:
+            trend, color = "Strong Up", colorText.GREEN
+        elif angle <= -30 and angle > -61:
+            trend, color = "Weak Down", colorText.FAIL
+        else:
+            trend, color = "Strong Down", colorText.FAIL
+        screenDict["Trend"] = colorText.BOLD + color + trend + colorText.END
+        saveDict["Trend"] = trend
+        return trend
 
     # Find stocks approching to long term trendlines
+    @timed
     def findTrendlines(self, data, screenDict, saveDict, percentage=0.05):
         period = int("".join(c for c in self.configManager.period if c.isdigit()))
         if len(data) < period:
             return False
 
         data = data[::-1]
-        data["Number"] = np.arange(len(data)) + 1
-        data_low = data.copy()
-        points = 30
-
-        """ Ignoring the Resitance for long-term purpose
-        while len(data_high) > points:
-            slope, intercept, r_value, p_value, std_err = linregress(x=data_high['Number'], y=data_high['High'])
-            data_high = data_high.loc[data_high['High'] > slope * data_high['Number'] + intercept]
-        slope, intercept, r_value, p_value, std_err = linregress(x=data_high['Number'], y=data_high['Close'])
-        data['Resistance'] = slope * data['Number'] + intercept
-        """
-
-        while len(data_low) > points:
-            try:
-                slope, intercept, r_value, p_value, std_err = linregress(
-                    x=data_low["Number"], y=data_low["Low"]
-                )
-            except Exception as e:
-                self.default_logger.debug(e, exc_info=True)
-                continue
-            data_low = data_low.loc[
-                data_low["Low"] < slope * data_low["Number"] + intercept
-            ]
-
-        slope, intercept, r_value, p_value, std_err = linregress(
-            x=data_low["Number"], y=data_low["Close"]
-        )
-        data["Support"] = slope * data["Number"] + intercept
-        now = data.tail(1)
-
-        limit_upper = now["Support"].iloc[0] + (now["Support"].iloc[0] * percentage)
-        limit_lower = now["Support"].iloc[0] - (now["Support"].iloc[0] * percentage)
-
-        if limit_lower < now["Close"].iloc[0] < limit_upper and slope > 0.15:
+        if Trendlines.isNearSupport(
+            data["Low"].to_numpy(dtype=np.float64),
+            data["Close"].to_numpy(dtype=np.float64),
+            percentage=percentage,
+        )[0]:
             screenDict["Pattern"] = (
                 colorText.BOLD + colorText.GREEN + "Trendline-Support" + colorText.END
             )
             saveDict["Pattern"] = "Trendline-Support"
             return True
-
-        """ Plots for debugging
-        import matplotlib.pyplot as plt
-        fig, ax1 = plt.subplots(figsize=(15,10))
-        color = 'tab:green'
-        xdate = [x.date() for x in data.index]
-        ax1.set_xlabel('Date', color=color)
-        ax1.plot(xdate, data.Close, label="close", color=color)
-        ax1.tick_params(axis='x', labelcolor=color)
-
-        ax2 = ax1.twiny() # ax2 and ax1 will have common y axis and different x axis, twiny
-        ax2.plot(data.Number, data.Resistance, label="Res")
-        ax2.plot(data.Number, data.Support, label="Sup")
-
-        plt.legend()
-        plt.grid()
-        plt.show()
-        """
         return False
 
     # Private method to find candle type
@@ -473,7 +442,8 @@ class tools:
 
         warnings.filterwarnings("ignore")
         model, pkl = Utility.tools.getNiftyModel()
-        if model is None or pkl is None:
+        # The change since the day before needs at least two days of data
+        if model is None or pkl is None or data is None or len(data) < 2:
             return 0, "Unknown", "Unknown"
         with SuppressOutput(suppress_stderr=True, suppress_stdout=True):
             data = data[pkl["columns"]]
@@ -658,34 +628,33 @@ class tools:
         return result_df[::-1]
 
     # Preprocess the acquired data
-    def preprocessData(self, data, daysToLookback=None):
-        self.default_logger.info(f"Preprocessing data:\n{data.head(1)}\n")
+    # indicators is the IndicatorCache of data, if the caller wants to share
+    # the indicators computed here with the checks that run later.
+    @timed
+    def preprocessData(self, data, daysToLookback=None, indicators=None):
+        self.default_logger.info("Preprocessing data:\n%s\n", data.head(1))
         if daysToLookback is None:
             daysToLookback = self.configManager.daysToLookback
+        indicators = IndicatorCache(data) if indicators is None else indicators
         if self.configManager.useEMA:
-            sma = pktalib.EMA(data["Close"], timeperiod=50)
-            lma = pktalib.EMA(data["Close"], timeperiod=200)
-            ssma = pktalib.EMA(data["Close"], timeperiod=9)
-            data.insert(6, "SMA", sma)
-            data.insert(7, "LMA", lma)
-            data.insert(8, "SSMA", ssma)
+            sma = indicators.get("EMA", 50, filled=False)
+            lma = indicators.get("EMA", 200, filled=False)
+            ssma = indicators.get("EMA", 9, filled=False)
         else:
-            sma = data.rolling(window=50).mean()
-            lma = data.rolling(window=200).mean()
-            ssma = data.rolling(window=9).mean()
-            data.insert(6, "SMA", sma["Close"])
-            data.insert(7, "LMA", lma["Close"])
-            data.insert(8, "SSMA", ssma["Close"])
-        vol = data.rolling(window=20).mean()
-        rsi = pktalib.RSI(data["Close"], timeperiod=14)
-        data.insert(9, "VolMA", vol["Volume"])
+            sma = indicators.get("RollingMean", "Close", 50, filled=False)
+            lma = indicators.get("RollingMean", "Close", 200, filled=False)
+            ssma = indicators.get("RollingMean", "Close", 9, filled=False)
+        data.insert(6, "SMA", sma)
+        data.insert(7, "LMA", lma)
+        data.insert(8, "SSMA", ssma)
+        vol = indicators.get("RollingMean", "Volume", 20, filled=False)
+        rsi = indicators.get("RSI", 14, filled=False)
+        data.insert(9, "VolMA", vol)
         data.insert(10, "RSI", rsi)
-        cci = pktalib.CCI(data["High"], data["Low"], data["Close"], timeperiod=14)
+        cci = indicators.get("CCI", 14, filled=False)
         data.insert(11, "CCI", cci)
         # len(data["Close"])
-        fastk, fastd = pktalib.STOCHRSI(
-            data["Close"], timeperiod=14, fastk_period=5, fastd_period=3, fastd_matype=0
-        )
+        fastk, fastd = indicators.get("STOCHRSI", 14, 5, 3, 0, filled=False)
         data.insert(12, "FASTK", fastk)
         data.insert(13, "FASTD", fastd)
         data = data[::-1]  # Reverse the dataframe
@@ -696,13 +665,15 @@ class tools:
         return (fullData, trimmedData)
 
     # Validate if the stock is bullish in the short term
-    def validate15MinutePriceVolumeBreakout(self, data):
+    @timed
+    def validate15MinutePriceVolumeBreakout(self, data, indicators=None):
         # https://chartink.com/screener/15-min-price-volume-breakout
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
         data = data[::-1]  # Reverse the dataframe so that its the oldest date first
-        data["SMA20"] = pktalib.SMA(data["Close"], 20)
-        data["SMA20V"] = pktalib.SMA(data["Volume"], 20)
+        indicators = IndicatorCache(data) if indicators is None else indicators
+        data["SMA20"] = indicators.get("SMA", 20)
+        data["SMA20V"] = indicators.get("VolumeSMA", 20)
         data = data[
             ::-1
         ]  # Reverse the dataframe so that it's the most recent date first
@@ -714,14 +685,17 @@ class tools:
         cond5 = cond4 and (recent["Volume"].iloc[1] > recent["SMA20V"].iloc[0])
         return cond5
 
-    def validateBullishForTomorrow(self, data):
+    @timed
+    def validateBullishForTomorrow(self, data, indicators=None):
         # https://chartink.com/screener/bullish-for-tomorrow
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
         data = data[::-1]  # Reverse the dataframe so that its the oldest date first
-        macdLine = pktalib.MACD(data["Close"], 12, 26, 9)[0].tail(3)
-        macdSignal = pktalib.MACD(data["Close"], 12, 26, 9)[1].tail(3)
-        macdHist = pktalib.MACD(data["Close"], 12, 26, 9)[2].tail(3)
+        indicators = IndicatorCache(data) if indicators is None else indicators
+        macd = indicators.get("MACD", 12, 26, 9)
+        macdLine = macd[0].tail(3)
+        macdSignal = macd[1].tail(3)
+        macdHist = macd[2].tail(3)
         
         return (
                 (macdHist.iloc[:1].iloc[0] < macdHist.iloc[:2].iloc[1]) and
@@ -733,6 +707,7 @@ class tools:
                 )
     
     # validate if CCI is within given range
+    @timed
     def validateCCI(self, data, screenDict, saveDict, minCCI, maxCCI):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
@@ -752,6 +727,7 @@ class tools:
         return False
 
     # Find Conflucence
+    @timed
     def validateConfluence(self, stock, data, screenDict, saveDict, percentage=0.1):
         recent = data.head(1)
         if abs(recent["SMA"].iloc[0] - recent["LMA"].iloc[0]) <= (recent["SMA"].iloc[0] * percentage):
@@ -778,11 +754,12 @@ class tools:
         return False
 
     # Validate if share prices are consolidating
+    @timed
     def validateConsolidation(self, data, screenDict, saveDict, percentage=10):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
-        hc = data.describe()["Close"]["max"]
-        lc = data.describe()["Close"]["min"]
+        hc = data["Close"].max()
+        lc = data["Close"].min()
         if (hc - lc) <= (hc * percentage / 100) and (hc - lc != 0):
             screenDict["Consol."] = (
                 colorText.BOLD
@@ -805,6 +782,7 @@ class tools:
         return round((abs((hc - lc) / hc) * 100), 1)
 
     # Validate 'Inside Bar' structure for recent days
+    @timed
     def validateInsideBar(
         self, data, screenDict, saveDict, chartPattern=1, daysToLookback=5
     ):
@@ -860,10 +838,11 @@ class tools:
         return 0
 
     # Find IPO base
+    @timed
     def validateIpoBase(self, stock, data, screenDict, saveDict, percentage=0.3):
         listingPrice = data[::-1].head(1)["Open"].iloc[0]
         currentPrice = data.head(1)["Close"].iloc[0]
-        ATH = data.describe()["High"]["max"]
+        ATH = data["High"].max()
         if ATH > (listingPrice + (listingPrice * percentage)):
             return False
         away = round(((currentPrice - listingPrice) / listingPrice) * 100, 1)
@@ -893,6 +872,7 @@ class tools:
         return False
 
     # Validate if recent volume is lowest of last 'N' Days
+    @timed
     def validateLowestVolume(self, data, daysForLowestVolume):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
@@ -900,13 +880,14 @@ class tools:
             daysForLowestVolume = 30
         data = data.head(daysForLowestVolume)
         recent = data.head(1)
-        if (recent["Volume"].iloc[0] <= data.describe()["Volume"]["min"]) and recent[
+        if (recent["Volume"].iloc[0] <= data["Volume"].min()) and recent[
             "Volume"
         ][0] != np.nan:
             return True
         return False
 
     # Validate LTP within limits
+    @timed
     def validateLTP(self, data, screenDict, saveDict, minLTP=None, maxLTP=None):
         if minLTP is None:
             minLTP = self.configManager.minLTP
@@ -942,14 +923,17 @@ class tools:
         return False, verifyStageTwo
 
     # Find stocks that are bearish intraday: Macd Histogram negative
-    def validateMACDHistogramBelow0(self, data):
+    @timed
+    def validateMACDHistogramBelow0(self, data, indicators=None):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
         data = data[::-1]  # Reverse the dataframe so that its the oldest date first
-        macd = pktalib.MACD(data["Close"], 12, 26, 9)[2].tail(1)
-        return macd.iloc[:1][0] < 0
+        indicators = IndicatorCache(data) if indicators is None else indicators
+        macd = indicators.get("MACD", 12, 26, 9)[2].tail(1)
+        return macd.iloc[0] < 0
     
     # Find if stock gaining bullish momentum
+    @timed
     def validateMomentum(self, data, screenDict, saveDict):
         try:
             data = data.head(3)
@@ -1002,6 +986,7 @@ class tools:
             return False
 
     # Validate Moving averages and look for buy/sell signals
+    @timed
     def validateMovingAverages(self, data, screenDict, saveDict, maRange=2.5):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
@@ -1104,13 +1089,14 @@ class tools:
         return maReversal
 
     # Find NRx range for Reversal
+    @timed
     def validateNarrowRange(self, data, screenDict, saveDict, nr=4):
         if Utility.tools.isTradingTime():
             rangeData = data.head(nr + 1)[1:]
             now_candle = data.head(1)
             rangeData["Range"] = abs(rangeData["Close"] - rangeData["Open"])
             recent = rangeData.head(1)
-            if recent["Range"].iloc[0] == rangeData.describe()["Range"]["min"]:
+            if recent["Range"].iloc[0] == rangeData["Range"].min():
                 if (
                     self.getCandleType(recent)
                     and now_candle["Close"].iloc[0] >= recent["Close"].iloc[0]
@@ -1134,7 +1120,7 @@ class tools:
             rangeData = data.head(nr)
             rangeData["Range"] = abs(rangeData["Close"] - rangeData["Open"])
             recent = rangeData.head(1)
-            if recent["Range"].iloc[0] == rangeData.describe()["Range"]["min"]:
+            if recent["Range"].iloc[0] == rangeData["Range"].min():
                 screenDict["Pattern"] = (
                     colorText.BOLD + colorText.GREEN + f"NR{nr}" + colorText.END
                 )
@@ -1143,6 +1129,7 @@ class tools:
             return False
 
     # Find if stock is newly listed
+    @timed
     def validateNewlyListed(self, data, daysToLookback):
         daysToLookback = int(daysToLookback[:-1])
         recent = data.head(1)
@@ -1153,6 +1140,7 @@ class tools:
         return False
 
     # Validate if the stock prices are at least rising by 2% for the last 3 sessions
+    @timed
     def validatePriceRisingByAtLeast2Percent(self, data, screenDict, saveDict):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
@@ -1180,6 +1168,7 @@ class tools:
         return False
 
     # validate if RSI is within given range
+    @timed
     def validateRSI(self, data, screenDict, saveDict, minRSI, maxRSI):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
@@ -1195,6 +1184,7 @@ class tools:
         return False
 
     # Validate if the stock is bullish in the short term
+    @timed
     def validateShortTermBullish(self, data, screenDict, saveDict):
         # https://chartink.com/screener/short-term-bullish
         data = data.fillna(0)
@@ -1261,80 +1251,36 @@ class tools:
         return False
 
     # Validate VPC
+    @timed
     def validateVCP(
         self, data, screenDict, saveDict, stockName=None, window=3, percentageFromTop=3
     ):
         try:
-            percentageFromTop /= 100
-            data.reset_index(inplace=True)
-            data.rename(columns={"index": "Date"}, inplace=True)
-            data["tops"] = (
-                data["High"]
-                .iloc[
-                    list(
-                        pktalib.argrelextrema(
-                            np.array(data["High"]), np.greater_equal, order=window
-                        )[0]
-                    )
-                ]
-                .head(4)
-            )
-            data["bots"] = (
-                data["Low"]
-                .iloc[
-                    list(
-                        pktalib.argrelextrema(
-                            np.array(data["Low"]), np.less_equal, order=window
-                        )[0]
-                    )
-                ]
-                .head(4)
+            data = data[::-1]
+            isVCP, highestTop = SwingPoints.findVCP(
+                *[
+                    data[column].to_numpy(dtype=np.float64)
+                    for column in ["High", "Low", "Close"]
+                ],
+                window=window,
+                percentageFromTop=percentageFromTop,
             )
-            data = data.fillna(0)
-            data = data.replace([np.inf, -np.inf], 0)
-            tops = data[data.tops > 0]
-            # bots = data[data.bots > 0]
-            highestTop = round(tops.describe()["High"]["max"], 1)
-            filteredTops = tops[
-                tops.tops > (highestTop - (highestTop * percentageFromTop))
-            ]
-            # print(tops)
-            # print(filteredTops)
-            # print(tops.sort_values(by=['tops'], ascending=False))
-            # print(tops.describe())
-            # print(f"Till {highestTop-(highestTop*percentageFromTop)}")
-            if filteredTops.equals(tops):  # Tops are in the range
-                lowPoints = []
-                for i in range(len(tops) - 1):
-                    endDate = tops.iloc[i]["Date"]
-                    startDate = tops.iloc[i + 1]["Date"]
-                    lowPoints.append(
-                        data[
-                            (data.Date >= startDate) & (data.Date <= endDate)
-                        ].describe()["Low"]["min"]
-                    )
-                lowPointsOrg = lowPoints
-                lowPoints.sort(reverse=True)
-                lowPointsSorted = lowPoints
-                ltp = data.head(1)["Close"].iloc[0]
-                if (
-                    lowPointsOrg == lowPointsSorted
-                    and ltp < highestTop
-                    and ltp > lowPoints[0]
-                ):
-                    screenDict["Pattern"] = (
-                        colorText.BOLD
-                        + colorText.GREEN
-                        + f"VCP (BO: {highestTop})"
-                        + colorText.END
-                    )
-                    saveDict["Pattern"] = f"VCP (BO: {highestTop})"
-                    return True
+            if isVCP[0]:
+                highestTop = highestTop[0]
+                screenDict["Pattern"] = (
+                    colorText.BOLD
+                    + colorText.GREEN
+                    + f"VCP (BO: {highestTop})"
+                    + colorText.END
+                )
+                saveDict["Pattern"] = f"VCP (BO: {highestTop})"
+                return True
         except Exception as e:
             self.default_logger.debug(e, exc_info=True)
         return False
 
     # Validate if volume of last day is higher than avg
+    @timed
     def validateVolume(self, data, screenDict, saveDict, volumeRatio=2.5):
         data = data.fillna(0)
         data = data.replace([np.inf, -np.inf], 0)
@@ -1363,6 +1309,7 @@ class tools:
         return False
 
     # Find if stock is validating volume spread analysis
+    @timed
     def validateVolumeSpreadAnalysis(self, data, screenDict, saveDict):
         try:
             data = data.head(2)
@@ -1416,50 +1363,3 @@ class tools:
             self.default_logger.debug(e, exc_info=True)
             return False
 
-    """
-    # Find out trend for days to lookback
-    def validateVCP(data, screenDict, saveDict, daysToLookback=ConfigManager.daysToLookback, stockName=None):
-        // De-index date
-        data.reset_index(inplace=True)
-        data.rename(columns={'index':'Date'}, inplace=True)
-        data = data.head(daysToLookback)
-        data = data[::-1]
-        data = data.set_index(np.arange(len(data)))
-        data = data.fillna(0)
-        data = data.replace([np.inf, -np.inf], 0)
-        data['tops'] = data['Close'].iloc[list(pktalib.argrelextrema(np.array(data['Close']), np.greater_equal, order=3)[0])]
-        data['bots'] = data['Close'].iloc[list(pktalib.argrelextrema(np.array(data['Close']), np.less_equal, order=3)[0])]
-        try:
-            try:
-                top_slope,top_c = np.polyfit(data.index[data.tops > 0], data['tops'][data.tops > 0], 1)
-                bot_slope,bot_c = np.polyfit(data.index[data.bots > 0], data['bots'][data.bots > 0], 1)
-                topAngle = math.degrees(math.atan(top_slope))
-                vcpAngle = math.degrees(math.atan(bot_slope) - math.atan(top_slope))
-
-                # print(math.degrees(math.atan(top_slope)))
-                # print(math.degrees(math.atan(bot_slope)))
-                # print(vcpAngle)
-                # print(topAngle)
-                # print(data.max()['bots'])
-                # print(data.max()['tops'])
-                if (vcpAngle > 20 and vcpAngle < 70) and (topAngle > -10 and topAngle < 10) and (data['bots'].max() <= data['tops'].max()) and (len(data['bots'][data.bots > 0]) > 1):
-                    print("---> GOOD VCP %s at %sRs" % (stockName, top_c))
-                    import os
-                    os.system("echo %s >> vcp_plots\VCP.txt" % stockName)
-
-                    import matplotlib.pyplot as plt                
-                    plt.scatter(data.index[data.tops > 0], data['tops'][data.tops > 0], c='g')
-                    plt.scatter(data.index[data.bots > 0], data['bots'][data.bots > 0], c='r')
-                    plt.plot(data.index, data['Close'])
-                    plt.plot(data.index, top_slope*data.index+top_c,'g--')
-                    plt.plot(data.index, bot_slope*data.index+bot_c,'r--')
-                    if stockName != None:
-                        plt.title(stockName)
-                    # plt.show()
-                    plt.savefig('vcp_plots\%s.png' % stockName)
-                    plt.clf()
-            except np.RankWarning:
-                pass
-        except np.linalg.LinAlgError:
-            return False
-    """
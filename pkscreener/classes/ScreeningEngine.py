@@ -0,0 +1,465 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import warnings
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+
+import pkscreener.classes.Screener as Screener
+from pkscreener.classes.CandlePatterns import CandlePatterns
+from pkscreener.classes.ColorText import colorText
+from pkscreener.classes.ParallelProcessing import StockConsumer
+from pkscreener.classes.Pktalib import pktalib
+from pkscreener.classes.ScanPlan import ScanPlan
+from pkscreener.classes.SuppressOutput import SuppressOutput
+
+# Scanners (executeOption) whose filters can be evaluated for all the
+# stocks together with the arrays below.
+SUPPORTED_OPTIONS = [1, 2, 3, 5, 8, 9, 14, 15, 16, 17]
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+# Screens all the cached stocks together. The data of every stock is stacked
+# into (symbols x days) arrays with the oldest day in the first column and the
+# most recent day in the last column. Stocks with fewer days are padded with
+# NaN on the older side, so that column -1 is always the latest day and
+# values[:, -n:] is what data.head(n) is for one stock after preprocessData.
+# Only the stocks that match the filters are then run through the regular
+# Screener.tools checks to build the same rows that StockConsumer would. The
+# arrays only narrow down the stocks: each of them must still pass the
+# ScanPlan of the scanner, as in StockConsumer.screenStocks, to make it to
+# the results.
+class tools:
+    def __init__(self, configManager, default_logger) -> None:
+        self.configManager = configManager
+        self.default_logger = default_logger
+        self.screener = Screener.tools(configManager, default_logger)
+        self.candlePatterns = CandlePatterns()
+
+    def supports(self, executeOption, newlyListedOnly=False):
+        return executeOption in SUPPORTED_OPTIONS and not newlyListedOnly
+
+    def stackStockData(self, stockDict, stockCodes):
+        symbols = []
+        blocks = []
+        for stock in stockCodes:
+            payload = stockDict.get(stock)
+            if payload is None:
+                continue
+            try:
+                columns = list(payload["columns"])
+                values = np.asarray(payload["data"], dtype=np.float64)
+                if values.ndim != 2 or len(values) == 0:
+                    continue
+                blocks.append(values[:, [columns.index(column) for column in OHLCV]])
+                symbols.append(stock)
+            except Exception as e:
+                self.default_logger.debug(e, exc_info=True)
+        lengths = np.array([len(block) for block in blocks], dtype=np.int64)
+        days = int(lengths.max()) if len(lengths) > 0 else 0
+        stacked = np.full((len(OHLCV), len(symbols), days), np.nan)
+        for i, block in enumerate(blocks):
+            stacked[:, i, days - len(block) :] = block.T
+        stackedData = {"Stock": symbols, "Length": lengths}
+        for i, column in enumerate(OHLCV):
+            stackedData[column] = stacked[i]
+        return stackedData
+
+    # Same as data.fillna(0).replace([np.inf, -np.inf], 0) for every stock,
+    # while keeping the padding as NaN so that it can be skipped.
+    def fillValues(self, values, lengths):
+        age = np.arange(values.shape[1])[::-1]
+        filled = np.where(np.isfinite(values), values, 0.0)
+        filled[age[None, :] >= lengths[:, None]] = np.nan
+        return filled
+
+    def nanReduce(self, reducer, values):
+        # All-NaN rows (no data in the window) are expected and stay NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if values.shape[1] == 0:
+                return np.full(values.shape[0], np.nan)
+            return reducer(values, axis=1)
+
+    def nanMax(self, values):
+        return self.nanReduce(np.nanmax, values)
+
+    def nanMin(self, values):
+        return self.nanReduce(np.nanmin, values)
+
+    # Latest RSI of every row, computed the way TA-Lib does (Wilder's
+    # smoothing seeded with the average of the first timeperiod changes).
+    def latestRSI(self, close, timeperiod=14):
+        return pktalib.RSI(close, timeperiod)[:, -1]
+
+    # Latest CCI of every row, computed the way TA-Lib does
+    def latestCCI(self, high, low, close, timeperiod=14):
+        if high.shape[1] < timeperiod:
+            return np.full(high.shape[0], np.nan)
+        typicalPrice = (
+            high[:, -timeperiod:] + low[:, -timeperiod:] + close[:, -timeperiod:]
+        ) / 3.0
+        average = typicalPrice.sum(axis=1) / timeperiod
+        deviation = np.abs(typicalPrice - average[:, None]).sum(axis=1)
+        latest = typicalPrice[:, -1] - average
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cci = latest / (0.015 * (deviation / timeperiod))
+        return np.where((latest != 0) & (deviation != 0), cci, 0.0)
+
+    def computeScreeningValues(self, stackedData, volumeRatio=None, minRSI=0, maxRSI=100):
+        configManager = self.configManager
+        if volumeRatio is None or volumeRatio <= 0:
+            volumeRatio = configManager.volumeRatio
+        daysToLookback = configManager.daysToLookback
+        lengths = stackedData["Length"]
+        days = stackedData["Close"].shape[1]
+        age = np.arange(days)[::-1]
+        open, high, low, close, volume = [
+            self.fillValues(stackedData[column], lengths) for column in OHLCV
+        ]
+        values = {"Stock": stackedData["Stock"], "Length": lengths}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # validateLTP
+            ltp = np.round(close[:, -1], 2)
+            isLtpValid = (ltp >= configManager.minLTP) & (ltp <= configManager.maxLTP)
+            if configManager.stageTwo:
+                yearlyLow = self.nanMin(close[:, -250:])
+                yearlyHigh = self.nanMax(close[:, -250:])
+                isLtpValid &= ~(
+                    (lengths > 250)
+                    & ((ltp < 2 * yearlyLow) | (ltp < 0.75 * yearlyHigh))
+                )
+            values["LTP"] = ltp
+            values["isLtpValid"] = isLtpValid
+
+            # validateConsolidation
+            hc = self.nanMax(close[:, -daysToLookback:])
+            lc = self.nanMin(close[:, -daysToLookback:])
+            consolidation = np.round(np.abs((hc - lc) / hc) * 100, 1)
+            values["Consol."] = consolidation
+            values["isConsolidating"] = (
+                consolidation <= configManager.consolidationPercentage
+            ) & (consolidation != 0)
+
+            # validateVolume
+            volMA = (
+                stackedData["Volume"][:, -20:].mean(axis=1)
+                if days >= 20
+                else np.full(len(lengths), np.nan)
+            )
+            volMA = np.where(np.isfinite(volMA), volMA, 0.0)
+            ratio = np.round(volume[:, -1] / volMA, 2)
+            values["Volume"] = np.where(volMA == 0, 0, ratio)
+            values["isVolumeHigh"] = (volMA == 0) | (
+                (ratio >= volumeRatio) & np.isfinite(ratio) & (ratio != 20)
+            )
+
+            # findBreakout
+            previousHigh = high[:, -daysToLookback:-1]
+            hs = np.round(self.nanMax(previousHigh), 2)
+            hc = np.round(self.nanMax(close[:, -daysToLookback:-1]), 2)
+            rc = np.round(close[:, -1], 2)
+            higherShadows = np.sum(previousHigh > hc[:, None], axis=1)
+            breakoutLevel = np.where(
+                (hs > hc)
+                & ((hs - hc) > (hs * 2 / 100))
+                & ((daysToLookback / higherShadows) <= 3),
+                hs,
+                hc,
+            )
+            values["isBreaking"] = (
+                ~np.isnan(hs)
+                & ~np.isnan(hc)
+                & (rc >= breakoutLevel)
+                & (close[:, -1] >= open[:, -1])
+            )
+
+            # validateRSI and validateCCI
+            rsi = self.latestRSI(stackedData["Close"])
+            rsi = np.trunc(np.where(np.isfinite(rsi), rsi, 0.0))
+            values["RSI"] = rsi
+            values["isValidRsi"] = ((rsi >= minRSI) & (rsi <= maxRSI)) | (
+                (rsi <= 71) & (rsi >= 67)
+            )
+            cci = self.latestCCI(
+                stackedData["High"], stackedData["Low"], stackedData["Close"]
+            )
+            cci = np.trunc(np.where(np.isfinite(cci), cci, 0.0))
+            values["CCI"] = cci
+            values["isCciInRange"] = (cci <= minRSI) | (cci >= maxRSI)
+
+            # find52WeekHighBreakout, find52WeekLowBreakout, find10DaysLowBreakout
+            # The previous week is data.head(10).tail(5), which overlaps with
+            # the last week for stocks that have fewer than 10 days of data.
+            previousWeekEnd = np.minimum(lengths, 10)
+            previousWeek = (age[None, :] < previousWeekEnd[:, None]) & (
+                age[None, :] >= (previousWeekEnd - 5)[:, None]
+            )
+            recentHigh = high[:, -1]
+            last1WeekHigh = self.nanMax(high[:, -5:])
+            previousWeekHigh = self.nanMax(np.where(previousWeek, high, np.nan))
+            full52WeekHigh = self.nanMax(high[:, -250:])
+            values["is52WeekHighBreakout"] = (
+                (recentHigh >= full52WeekHigh)
+                | (last1WeekHigh >= np.maximum(full52WeekHigh, last1WeekHigh))
+                | (
+                    (last1WeekHigh >= previousWeekHigh)
+                    & (previousWeekHigh >= np.maximum(full52WeekHigh, previousWeekHigh))
+                )
+            )
+            recentLow = low[:, -1]
+            last1WeekLow = self.nanMin(low[:, -5:])
+            previousWeekLow = self.nanMin(np.where(previousWeek, low, np.nan))
+            full52WeekLow = self.nanMin(low[:, -250:])
+            values["is52WeekLowBreakout"] = (
+                (recentLow <= full52WeekLow)
+                | (last1WeekLow <= np.minimum(full52WeekLow, last1WeekLow))
+                | (
+                    (last1WeekLow <= previousWeekLow)
+                    & (previousWeekLow <= np.minimum(full52WeekLow, previousWeekLow))
+                )
+            )
+            values["is10DaysLowBreakout"] = (
+                recentLow <= np.minimum(previousWeekLow, last1WeekLow)
+            ) & (last1WeekLow <= previousWeekLow)
+
+            # findNR4Day (the volume check is on data.tail(1), the oldest day)
+            oldestVolume = stackedData["Volume"][
+                np.arange(len(lengths)), np.maximum(days - lengths, 0)
+            ]
+            candleRange = high - low
+            isNR4Day = ~(oldestVolume <= 50000) & (lengths >= 5)
+            if days >= 5:
+                for previousDay in range(2, 6):
+                    isNR4Day &= candleRange[:, -1] < candleRange[:, -previousDay]
+            sma = {
+                period: close[:, -period:].mean(axis=1)
+                if days >= period
+                else np.full(len(lengths), np.nan)
+                for period in [10, 50, 200]
+            }
+            values["isNR4Day"] = isNR4Day & (sma[10] > sma[50]) & (sma[50] > sma[200])
+        return values
+
+    def findMatches(self, values, executeOption):
+        isBreakoutWithVolume = (
+            values["isBreaking"] & values["isVolumeHigh"] & values["isLtpValid"]
+        )
+        isConsolidating = values["isConsolidating"] & values["isLtpValid"]
+        matches = {
+            1: isBreakoutWithVolume | isConsolidating,
+            2: isBreakoutWithVolume,
+            3: isConsolidating,
+            5: values["isLtpValid"] & values["isValidRsi"],
+            # The trend that validateCCI also needs is checked by the ScanPlan
+            8: values["isLtpValid"] & values["isCciInRange"],
+            9: values["isVolumeHigh"],
+            14: values["isNR4Day"],
+            15: values["is52WeekLowBreakout"],
+            16: values["is10DaysLowBreakout"],
+            17: values["is52WeekHighBreakout"],
+        }
+        return matches[executeOption]
+
+    # Builds the screening and the save dictionaries of one stock in the
+    # same order as StockConsumer.screenStocks does. Returns None for a stock
+    # that does not pass the scanPlan, if one is given.
+    def describeStock(
+        self,
+        stock,
+        payload,
+        minRSI=0,
+        maxRSI=100,
+        volumeRatio=None,
+        respChartPattern=None,
+        insideBarToLookback=7,
+        candlePattern=None,
+        trendSlope=None,
+        scanPlan=None,
+    ):
+        configManager = self.configManager
+        screener = self.screener
+        if volumeRatio is None or volumeRatio <= 0:
+            volumeRatio = configManager.volumeRatio
+        screeningDictionary, saveDictionary = StockConsumer().initResultDictionaries()
+        try:
+            data = pd.DataFrame(
+                payload["data"], columns=payload["columns"], index=payload["index"]
+            )
+            fullData, processedData = screener.preprocessData(
+                data, daysToLookback=configManager.daysToLookback
+            )
+            if processedData.empty:
+                return None
+            if (
+                scanPlan is not None
+                and scanPlan.passes(stock, screener, fullData, processedData) is None
+            ):
+                self.default_logger.debug(
+                    "%s matched the arrays but not the checks of the scanner", stock
+                )
+                return None
+            screeningDictionary["Stock"] = (
+                colorText.BOLD
+                + colorText.BLUE
+                + f"\x1B]8;;https://in.tradingview.com/chart?symbol=NSE%3A{stock}\x1B\\{stock}\x1B]8;;\x1B\\"
+                + colorText.END
+            )
+            saveDictionary["Stock"] = stock
+            screener.validateLTP(
+                fullData,
+                screeningDictionary,
+                saveDictionary,
+                minLTP=configManager.minLTP,
+                maxLTP=configManager.maxLTP,
+            )
+            screener.validateConsolidation(
+                processedData,
+                screeningDictionary,
+                saveDictionary,
+                percentage=configManager.consolidationPercentage,
+            )
+            screener.validateMovingAverages(
+                processedData, screeningDictionary, saveDictionary, maRange=1.25
+            )
+            screener.validateVolume(
+                processedData, screeningDictionary, saveDictionary, volumeRatio=volumeRatio
+            )
+            screener.findBreakout(
+                processedData,
+                screeningDictionary,
+                saveDictionary,
+                daysToLookback=configManager.daysToLookback,
+            )
+            screener.validateRSI(
+                processedData, screeningDictionary, saveDictionary, minRSI, maxRSI
+            )
+            if trendSlope is None:
+                screener.findTrend(
+                    processedData,
+                    screeningDictionary,
+                    saveDictionary,
+                    daysToLookback=configManager.daysToLookback,
+                    stockName=stock,
+                )
+            else:
+                screener.describeTrend(trendSlope, screeningDictionary, saveDictionary)
+            screener.validateCCI(
+                processedData, screeningDictionary, saveDictionary, minRSI, maxRSI
+            )
+            try:
+                if candlePattern is None:
+                    self.candlePatterns.findPattern(
+                        processedData,
+                        screeningDictionary,
+                        saveDictionary,
+                        useKernel=True,
+                    )
+                else:
+                    self.candlePatterns.describePattern(
+                        *candlePattern, screeningDictionary, saveDictionary
+                    )
+            except Exception as e:
+                self.default_logger.debug(e, exc_info=True)
+                screeningDictionary["Pattern"] = ""
+                saveDictionary["Pattern"] = ""
+            screener.validateInsideBar(
+                processedData,
+                screeningDictionary,
+                saveDictionary,
+                chartPattern=respChartPattern,
+                daysToLookback=insideBarToLookback,
+            )
+            with SuppressOutput(suppress_stderr=True, suppress_stdout=True):
+                screener.validateNarrowRange(
+                    processedData, screeningDictionary, saveDictionary
+                )
+            screener.validateMomentum(processedData, screeningDictionary, saveDictionary)
+            screener.validateVolumeSpreadAnalysis(
+                processedData, screeningDictionary, saveDictionary
+            )
+            return screeningDictionary, saveDictionary
+        except Exception as e:
+            self.default_logger.debug(e, exc_info=True)
+        return None
+
+    # Returns the (screeningDictionary, saveDictionary) of every stock that
+    # matches the given scanner.
+    def screen(
+        self,
+        stockDict,
+        stockCodes,
+        executeOption,
+        minRSI=0,
+        maxRSI=100,
+        volumeRatio=None,
+        respChartPattern=None,
+        insideBarToLookback=7,
+    ):
+        stackedData = self.stackStockData(stockDict, stockCodes)
+        values = self.computeScreeningValues(
+            stackedData, volumeRatio=volumeRatio, minRSI=minRSI, maxRSI=maxRSI
+        )
+        matches = self.findMatches(values, executeOption)
+        scanPlan = ScanPlan(
+            self.configManager,
+            executeOption,
+            respChartPattern=respChartPattern,
+            minRSI=minRSI,
+            maxRSI=maxRSI,
+            volumeRatio=volumeRatio,
+            insideBarToLookback=insideBarToLookback,
+        )
+        # The candle patterns of all the stocks are found together
+        patterns, signs = self.candlePatterns.findPatterns(
+            *[stackedData[column] for column in ["Open", "High", "Low", "Close"]]
+        )
+        # So are the slopes of their trends
+        trendSlopes = self.screener.findTrendSlopes(
+            self.fillValues(stackedData["Close"], stackedData["Length"])[
+                :, -self.configManager.daysToLookback :
+            ]
+        )
+        results = []
+        for i in np.flatnonzero(matches):
+            stock = stackedData["Stock"][i]
+            result = self.describeStock(
+                stock,
+                stockDict.get(stock),
+                minRSI=minRSI,
+                maxRSI=maxRSI,
+                volumeRatio=volumeRatio,
+                respChartPattern=respChartPattern,
+                insideBarToLookback=insideBarToLookback,
+                candlePattern=(patterns[i], signs[i]),
+                trendSlope=trendSlopes[i],
+                scanPlan=scanPlan,
+            )
+            if result is not None:
+                results.append(result)
+        return results
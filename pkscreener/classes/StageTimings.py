@@ -0,0 +1,162 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import math
+import time
+from functools import wraps
+
+# Each histogram bucket is about 10% wider than the one before it, which
+# is as close as the percentiles get to the real ones.
+BUCKET_GROWTH = 1.1
+LOG_BUCKET_GROWTH = math.log(BUCKET_GROWTH)
+# Anything that takes less than a microsecond goes into the first bucket
+SMALLEST_BUCKET = math.floor(math.log(1e-6) / LOG_BUCKET_GROWTH)
+
+# Whether the stages are being timed in this process
+enabled = False
+
+
+# How long each named stage (span) of the screening took, as histograms of
+# the durations that can be sent from a worker process to the parent and
+# merged there with those of the other workers.
+class StageTimings:
+    def __init__(self):
+        # stage -> {bucket: count}
+        self.histograms = {}
+        self.totals = {}
+        self.counts = {}
+
+    def __len__(self):
+        return len(self.counts)
+
+    def record(self, stage, seconds):
+        bucket = SMALLEST_BUCKET
+        if seconds > 0:
+            bucket = max(math.floor(math.log(seconds) / LOG_BUCKET_GROWTH), bucket)
+        histogram = self.histograms.setdefault(stage, {})
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+        self.totals[stage] = self.totals.get(stage, 0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def merge(self, other):
+        if other is None:
+            return self
+        for stage, histogram in other.histograms.items():
+            mergedHistogram = self.histograms.setdefault(stage, {})
+            for bucket, count in histogram.items():
+                mergedHistogram[bucket] = mergedHistogram.get(bucket, 0) + count
+            self.totals[stage] = self.totals.get(stage, 0) + other.totals[stage]
+            self.counts[stage] = self.counts.get(stage, 0) + other.counts[stage]
+        return self
+
+    # The duration (in seconds) that the given fraction of the durations
+    # of the stage are shorter than, to within a bucket
+    def percentile(self, stage, fraction):
+        histogram = self.histograms.get(stage, {})
+        rank = fraction * self.counts.get(stage, 0)
+        seen = 0
+        for bucket in sorted(histogram.keys()):
+            seen += histogram[bucket]
+            if seen >= rank:
+                return BUCKET_GROWTH ** (bucket + 0.5)
+        return 0
+
+    # One row for each stage, the one that took the longest in all first
+    def summary(self):
+        return [
+            {
+                "Stage": stage,
+                "Count": self.counts[stage],
+                "p50 (ms)": round(self.percentile(stage, 0.5) * 1000, 3),
+                "p95 (ms)": round(self.percentile(stage, 0.95) * 1000, 3),
+                "Total (s)": round(self.totals[stage], 3),
+            }
+            for stage in sorted(self.totals.keys(), key=self.totals.get, reverse=True)
+        ]
+
+
+# The timings of this process
+timings = StageTimings()
+
+
+def enable(enable=True):
+    global enabled
+    enabled = enable
+
+
+# Hands out the timings recorded in this process so far and starts afresh
+def drain():
+    global timings
+    recorded = timings
+    timings = StageTimings()
+    return recorded
+
+
+class _Span:
+    __slots__ = ["stage", "start"]
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        timings.record(self.stage, time.perf_counter() - self.start)
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_noSpan = _NoSpan()
+
+
+# Times whatever runs within it as the given stage:
+#   with span("preprocess"):
+#       ...
+def span(stage):
+    return _Span(stage) if enabled else _noSpan
+
+
+# Times each call of the decorated function as the stage of its name
+def timed(func):
+    stage = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings.record(stage, time.perf_counter() - start)
+
+    return wrapper
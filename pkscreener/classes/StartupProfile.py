@@ -0,0 +1,92 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import builtins
+import sys
+import time
+
+# When the profiling started, close enough to the start of the application
+startTime = None
+# module -> [time spent in the module itself, time including its imports]
+importTimes = {}
+# Time taken by the imports of each module that is being imported
+_childTimes = []
+_originalImport = None
+
+
+def _timedImport(name, globals=None, locals=None, fromlist=(), level=0):
+    # Modules that are already there cost next to nothing, and relative
+    # imports are left out for want of the full name
+    if level != 0 or name in sys.modules:
+        return _originalImport(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    _childTimes.append(0.0)
+    try:
+        return _originalImport(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        childTime = _childTimes.pop()
+        if len(_childTimes) > 0:
+            _childTimes[-1] += elapsed
+        importTimes.setdefault(name, [elapsed - childTime, elapsed])
+
+
+# Starts timing every module that gets imported from now on
+def start():
+    global startTime, _originalImport
+    if _originalImport is not None:
+        return
+    startTime = time.perf_counter()
+    importTimes.clear()
+    _originalImport = builtins.__import__
+    builtins.__import__ = _timedImport
+
+
+def stop():
+    global _originalImport
+    if _originalImport is not None:
+        builtins.__import__ = _originalImport
+        _originalImport = None
+
+
+def profiling():
+    return _originalImport is not None
+
+
+def elapsed():
+    return 0 if startTime is None else time.perf_counter() - startTime
+
+
+# The modules that took the longest to import, with the time taken by the
+# imports of a module included in its own
+def summary(top=20):
+    slowest = sorted(importTimes.items(), key=lambda item: item[1][1], reverse=True)
+    return [
+        {
+            "Module": module,
+            "Self (ms)": round(selfTime * 1000, 1),
+            "Cumulative (ms)": round(cumulativeTime * 1000, 1),
+        }
+        for module, (selfTime, cumulativeTime) in slowest[:top]
+    ]
@@ -0,0 +1,321 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import atexit
+import os
+import tempfile
+import warnings
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+
+from pkscreener.classes.log import default_logger
+
+# The stock data cache is a columnar file made of consecutive .npy records:
+#   symbols : str[N]          symbol names
+#   offsets : int64[N + 1]    rows of symbols[i] are offsets[i]:offsets[i+1]
+#   columns : str[C]          OHLCV column names
+#   meta    : str[1]          timezone of the index ("" if tz-naive)
+#   index   : int64[R]        row timestamps in ns (UTC if tz-aware)
+#   values  : float64[R, C]   OHLCV values of all symbols stacked together
+# The small records are read eagerly and the last two are memory-mapped so
+# that reading a few symbols or the trailing rows does not load everything.
+NPY_MAGIC = b"\x93NUMPY"
+
+
+class StockDataStore:
+    def __init__(self, filePath):
+        self.filePath = filePath
+        with open(filePath, "rb") as f:
+            self.symbols = np.lib.format.read_array(f, allow_pickle=False)
+            self.offsets = np.lib.format.read_array(f, allow_pickle=False)
+            self.columns = [
+                str(column)
+                for column in np.lib.format.read_array(f, allow_pickle=False)
+            ]
+            meta = np.lib.format.read_array(f, allow_pickle=False)
+            self.tz = str(meta[0]) if len(meta) > 0 and len(meta[0]) > 0 else None
+            self.index = self._mapNextArray(f)
+            self.values = self._mapNextArray(f)
+        self.symbolIndex = {str(symbol): i for i, symbol in enumerate(self.symbols)}
+
+    def _mapNextArray(self, f):
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortranOrder, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortranOrder, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+        count = int(np.prod(shape)) if len(shape) > 0 else 1
+        f.seek(offset + count * dtype.itemsize)
+        if count == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(
+            self.filePath,
+            dtype=dtype,
+            mode="r",
+            offset=offset,
+            shape=shape,
+            order="F" if fortranOrder else "C",
+        )
+
+    def __contains__(self, symbol):
+        return symbol in self.symbolIndex
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def keys(self):
+        return list(self.symbolIndex.keys())
+
+    def rowRange(self, symbol, lastN=None):
+        i = self.symbolIndex[symbol]
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        if lastN is not None and lastN > 0:
+            start = max(start, end - lastN)
+        return start, end
+
+    def dateIndex(self, start, end):
+        index = pd.to_datetime(np.asarray(self.index[start:end]))
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    # Returns the same "split" dict that DataFrame.to_dict("split") would
+    # return, except that "data" is a 2D float array instead of lists.
+    def get(self, symbol, lastN=None, default=None):
+        if symbol not in self.symbolIndex:
+            return default
+        start, end = self.rowRange(symbol, lastN)
+        return {
+            "index": self.dateIndex(start, end),
+            "columns": self.columns,
+            "data": np.array(self.values[start:end]),
+        }
+
+    def getDataFrame(self, symbol, lastN=None):
+        data = self.get(symbol, lastN=lastN)
+        if data is None:
+            return None
+        return pd.DataFrame(data["data"], columns=data["columns"], index=data["index"])
+
+    def toDict(self, symbols=None, lastN=None):
+        symbols = self.keys() if symbols is None else symbols
+        stockDict = {}
+        for symbol in symbols:
+            data = self.get(symbol, lastN=lastN)
+            if data is not None:
+                stockDict[symbol] = data
+        return stockDict
+
+    def close(self):
+        # Drop the memory maps so that the file can be replaced/deleted
+        self.index = None
+        self.values = None
+
+    def isStoreFile(filePath):
+        try:
+            with open(filePath, "rb") as f:
+                return f.read(len(NPY_MAGIC)) == NPY_MAGIC
+        except Exception as e:
+            default_logger().debug(e, exc_info=True)
+            return False
+
+    # stockDict holds stock -> DataFrame.to_dict("split") like payloads,
+    # the same as what the workers keep in the shared stock dictionary.
+    def save(stockDict, filePath):
+        symbols = []
+        indices = []
+        blocks = []
+        columns = None
+        tz = None
+        for symbol in stockDict.keys():
+            try:
+                payload = stockDict.get(symbol)
+                index = pd.DatetimeIndex(payload["index"])
+                if len(index) == 0:
+                    continue
+                values = np.asarray(payload["data"], dtype=np.float64)
+                if values.ndim != 2 or len(values) != len(index):
+                    continue
+                payloadColumns = list(payload["columns"])
+                if columns is None:
+                    columns = payloadColumns
+                if payloadColumns != columns:
+                    frame = pd.DataFrame(values, columns=payloadColumns)
+                    values = frame.reindex(columns=columns).to_numpy(dtype=np.float64)
+                if index.tz is not None:
+                    tz = str(index.tz) if tz is None else tz
+                    index = index.tz_convert("UTC").tz_localize(None)
+                symbols.append(str(symbol))
+                indices.append(index.values.astype("datetime64[ns]").view(np.int64))
+                blocks.append(values)
+            except Exception as e:
+                default_logger().debug(e, exc_info=True)
+        columns = [] if columns is None else columns
+        offsets = np.zeros(len(symbols) + 1, dtype=np.int64)
+        if len(symbols) > 0:
+            offsets[1:] = np.cumsum([len(index) for index in indices])
+        tempPath = f"{filePath}.tmp"
+        with open(tempPath, "wb") as f:
+            np.save(f, np.array(symbols, dtype=str), allow_pickle=False)
+            np.save(f, offsets, allow_pickle=False)
+            np.save(f, np.array(columns, dtype=str), allow_pickle=False)
+            np.save(f, np.array([tz or ""], dtype=str), allow_pickle=False)
+            np.save(
+                f,
+                np.concatenate(indices) if len(indices) > 0 else np.empty(0, dtype=np.int64),
+                allow_pickle=False,
+            )
+            np.save(
+                f,
+                np.concatenate(blocks) if len(blocks) > 0 else np.empty((0, len(columns))),
+                allow_pickle=False,
+            )
+        os.replace(tempPath, filePath)
+        return len(symbols)
+
+
+# A dict like view of the stock data that can be shared with the worker
+# processes without pickling the data for every stock. Reads come from the
+# memory-mapped stores that are attached to it, so every worker maps the
+# same pages instead of asking a Manager process for a copy. Stocks that are
+# added later (for example, by the workers themselves) go into the updates
+# dict, which should be a multiprocessing.Manager().dict() when shared.
+class SharedStockDict:
+    def __init__(self, updates=None):
+        self.updates = {} if updates is None else updates
+        self.storePaths = []
+        self.ownedStorePaths = []
+        self._stores = {}
+        atexit.register(self.removeOwnedStores)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Each process maps the stores on its own when it first needs them
+        state["_stores"] = {}
+        return state
+
+    def _openStores(self):
+        stores = []
+        for filePath in reversed(self.storePaths):
+            store = self._stores.get(filePath)
+            if store is None:
+                try:
+                    store = StockDataStore(filePath)
+                    self._stores[filePath] = store
+                except Exception as e:
+                    default_logger().debug(e, exc_info=True)
+                    continue
+            stores.append(store)
+        return stores
+
+    def attach(self, filePath):
+        if filePath in self.storePaths:
+            self.storePaths.remove(filePath)
+            self._closeStore(filePath)
+        self.storePaths.append(filePath)
+
+    # Attaches a store that another process has added since this copy of
+    # the dict was made, unless it is attached already.
+    def ensureAttached(self, filePath):
+        if filePath not in self.storePaths:
+            self.storePaths.append(filePath)
+
+    def addStore(self, stockDict):
+        # Writes the given stock -> split dict payloads into a new store
+        # and attaches it, so that they can be read without any IPC.
+        fd, filePath = tempfile.mkstemp(prefix="pkscreener_stock_data_", suffix=".npy")
+        os.close(fd)
+        StockDataStore.save(stockDict, filePath)
+        self.ownedStorePaths.append(filePath)
+        self.attach(filePath)
+        return filePath
+
+    def _closeStore(self, filePath):
+        store = self._stores.pop(filePath, None)
+        if store is not None:
+            store.close()
+
+    def close(self):
+        for filePath in list(self._stores.keys()):
+            self._closeStore(filePath)
+
+    def removeOwnedStores(self):
+        self.close()
+        for filePath in self.ownedStorePaths:
+            try:
+                os.remove(filePath)
+            except Exception as e:
+                default_logger().debug(e, exc_info=True)
+        self.storePaths = [p for p in self.storePaths if p not in self.ownedStorePaths]
+        self.ownedStorePaths = []
+
+    def reset(self):
+        # Forget everything. Used when the data must be downloaded afresh.
+        self.removeOwnedStores()
+        self.storePaths = []
+        self.updates.clear()
+
+    def get(self, stock, default=None):
+        for store in self._openStores():
+            if stock in store:
+                return store.get(stock)
+        return self.updates.get(stock, default)
+
+    def keys(self):
+        keys = set(self.updates.keys())
+        for store in self._openStores():
+            keys.update(store.keys())
+        return list(keys)
+
+    def copy(self):
+        return {stock: self.get(stock) for stock in self.keys()}
+
+    def update(self, stockDict):
+        self.updates.update(stockDict)
+
+    def pop(self, stock, default=None):
+        return self.updates.pop(stock, default)
+
+    def __contains__(self, stock):
+        for store in self._openStores():
+            if stock in store:
+                return True
+        return stock in self.updates
+
+    def __getitem__(self, stock):
+        data = self.get(stock)
+        if data is None:
+            raise KeyError(stock)
+        return data
+
+    def __setitem__(self, stock, data):
+        self.updates[stock] = data
+
+    def __len__(self):
+        return len(self.keys())
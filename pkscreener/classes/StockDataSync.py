@@ -0,0 +1,138 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import warnings
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+
+from pkscreener.classes.log import default_logger
+
+# The bars are fetched again from the one before the last stored bar, so
+# that a last bar that was stored before the close gets completed and the
+# bar before it can be checked against the stored one.
+OVERLAP_BARS = 2
+# A stored bar that is off by more than this from the one fetched again
+# means that the prices have been adjusted since (a split or a dividend),
+# so the whole history of the stock has to be fetched again.
+MAXIMUM_PRICE_CHANGE = 0.005
+CHECKED_COLUMNS = ["Open", "Adj Close"]
+PERIOD_UNITS = {
+    "d": lambda count: pd.DateOffset(days=count),
+    "wk": lambda count: pd.DateOffset(weeks=count),
+    "mo": lambda count: pd.DateOffset(months=count),
+    "y": lambda count: pd.DateOffset(years=count),
+}
+
+
+# How far back the data of a yfinance period like 280d goes. None for max.
+def periodOffset(period):
+    for unit, offset in PERIOD_UNITS.items():
+        if period.endswith(unit) and period[: -len(unit)].isdigit():
+            return offset(int(period[: -len(unit)]))
+    return None
+
+
+# The stored data of a stock with the bars fetched since, or None if the
+# two don't line up and the whole history has to be fetched again
+def mergeStockData(storedData, fetchedData, period):
+    if len(storedData) < OVERLAP_BARS or len(fetchedData) == 0:
+        return None
+    if (storedData.index.tz is None) != (fetchedData.index.tz is None):
+        return None
+    overlap = storedData.index[-OVERLAP_BARS]
+    if overlap not in fetchedData.index:
+        return None
+    for column in CHECKED_COLUMNS:
+        if column not in storedData.columns or column not in fetchedData.columns:
+            continue
+        stored = storedData.at[overlap, column]
+        fetched = fetchedData.at[overlap, column]
+        if not np.isfinite(stored) or not np.isfinite(fetched) or stored == 0:
+            return None
+        if abs(fetched / stored - 1) > MAXIMUM_PRICE_CHANGE:
+            return None
+    fetchedData = fetchedData.reindex(columns=storedData.columns)
+    merged = pd.concat([storedData[storedData.index < fetchedData.index[0]], fetchedData])
+    offset = periodOffset(period)
+    if offset is not None:
+        merged = merged[merged.index > merged.index[-1] - offset]
+    return merged
+
+
+# Brings the stocks that are in an earlier cache (a StockDataStore) up to
+# date by fetching only the bars since the last ones that were stored. The
+# stocks are fetched together with the others that were stored up to the
+# same day. Returns stock -> DataFrame for the stocks that could be brought
+# up to date; the rest have to be fetched in full.
+def syncStockData(
+    fetcher,
+    store,
+    stockCodes,
+    period,
+    duration,
+    proxyServer,
+    chunkSize=None,
+    printCounter=False,
+    threads=True,
+):
+    stockDataDict = {}
+    if store is None:
+        return stockDataDict
+    storedDataDict = {}
+    stocksByStart = {}
+    for stockCode in stockCodes:
+        try:
+            storedData = store.getDataFrame(stockCode)
+        except Exception as e:
+            default_logger().debug(e, exc_info=True)
+            continue
+        if storedData is None or len(storedData) < OVERLAP_BARS:
+            continue
+        storedDataDict[stockCode] = storedData
+        start = storedData.index[-OVERLAP_BARS]
+        stocksByStart.setdefault(start, []).append(stockCode)
+    for start, stocks in stocksByStart.items():
+        fetchedDataDict = fetcher.fetchStockDataInChunks(
+            stocks,
+            period,
+            duration,
+            proxyServer,
+            chunkSize=chunkSize,
+            printCounter=printCounter,
+            start=start.strftime("%Y-%m-%d"),
+            threads=threads,
+        )
+        for stockCode, fetchedData in fetchedDataDict.items():
+            try:
+                merged = mergeStockData(storedDataDict[stockCode], fetchedData, period)
+            except Exception as e:
+                default_logger().debug(e, exc_info=True)
+                merged = None
+            if merged is not None:
+                stockDataDict[stockCode] = merged
+    return stockDataDict
@@ -32,23 +32,67 @@
 
 import os
 import sys
+import threading
 
 
 class SuppressOutput:
+    # In quiet mode (see enableQuietMode), the output of the whole process
+    # already goes nowhere, so there is nothing left to suppress.
+    quiet = False
+    _devnull = None
+    _streams = None
+
     def __init__(self, suppress_stdout=False, suppress_stderr=False):
-        self.suppress_stdout = suppress_stdout
-        self.suppress_stderr = suppress_stderr
+        # sys.stdout and sys.stderr are shared by all the threads of the
+        # process. A background thread (see FetchPipeline) that swapped them
+        # would also silence the main thread, or even put back the wrong ones
+        # when the main thread swaps them in the meantime, so it leaves them
+        # alone and has to keep quiet on its own.
+        suppress = (
+            not SuppressOutput.quiet
+            and threading.current_thread() is threading.main_thread()
+        )
+        self.suppress_stdout = suppress_stdout and suppress
+        self.suppress_stderr = suppress_stderr and suppress
         self._stdout = None
         self._stderr = None
 
+    @staticmethod
+    def devnull():
+        if SuppressOutput._devnull is None:
+            SuppressOutput._devnull = open(os.devnull, "w")
+        return SuppressOutput._devnull
+
+    # For a process that must not print anything at all, such as a worker
+    # process that screens stocks with logging turned off. Its stdout and
+    # stderr are pointed at devnull once, so that SuppressOutput need not
+    # swap them around each call that may print something. A worker process
+    # that lives on to the next job (see PKWorkerPool) has to switch it off
+    # again when the next job is not to be quiet.
+    @staticmethod
+    def enableQuietMode():
+        if SuppressOutput.quiet:
+            return
+        SuppressOutput._streams = (sys.stdout, sys.stderr)
+        sys.stdout = SuppressOutput.devnull()
+        sys.stderr = SuppressOutput.devnull()
+        SuppressOutput.quiet = True
+
+    @staticmethod
+    def disableQuietMode():
+        if not SuppressOutput.quiet:
+            return
+        sys.stdout, sys.stderr = SuppressOutput._streams
+        SuppressOutput._streams = None
+        SuppressOutput.quiet = False
+
     def __enter__(self):
-        devnull = open(os.devnull, "w")
         if self.suppress_stdout:
             self._stdout = sys.stdout
-            sys.stdout = devnull
+            sys.stdout = SuppressOutput.devnull()
         if self.suppress_stderr:
             self._stderr = sys.stderr
-            sys.stderr = devnull
+            sys.stderr = SuppressOutput.devnull()
 
     def __exit__(self, *args):
         if self.suppress_stdout:
@@ -0,0 +1,121 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Finds the swing highs and lows of 1-D arrays or of every row of 2-D
+# (stocks x days) arrays at once, along the last axis with the oldest day
+# first. A day is a swing high (low) of order k when it is not lower
+# (higher) than any of the k days on either side of it, with the first and
+# the last day standing in for the days beyond the ends, the same as
+# pktalib.argrelextrema(values, np.greater_equal (np.less_equal), order=k).
+# Days with missing (NaN) values, and the days next to them, are never
+# swing points.
+
+
+def windowsAround(values, order):
+    values = np.asarray(values, dtype=np.float64)
+    padded = np.concatenate(
+        [
+            np.repeat(values[..., :1], order, axis=-1),
+            values,
+            np.repeat(values[..., -1:], order, axis=-1),
+        ],
+        axis=-1,
+    )
+    return values, sliding_window_view(padded, 2 * order + 1, axis=-1)
+
+
+def swingHighs(values, order=1):
+    if np.shape(values)[-1] == 0:
+        return np.zeros(np.shape(values), dtype=bool)
+    values, windows = windowsAround(values, order)
+    with np.errstate(invalid="ignore"):
+        return values >= windows.max(axis=-1)
+
+
+def swingLows(values, order=1):
+    if np.shape(values)[-1] == 0:
+        return np.zeros(np.shape(values), dtype=bool)
+    values, windows = windowsAround(values, order)
+    with np.errstate(invalid="ignore"):
+        return values <= windows.min(axis=-1)
+
+
+# Keeps only the latest count swing points of every row
+def latestPoints(isPoint, count):
+    fromLatest = np.cumsum(isPoint[..., ::-1], axis=-1)[..., ::-1]
+    return isPoint & (fromLatest <= count)
+
+
+# The volatility contraction pattern of every row of highs, lows and closes
+# (stocks x days, oldest day first), as Screener.tools.validateVCP finds it.
+# The latest 4 swing highs of the given order have to be within
+# percentageFromTop percent of the highest of them, and the latest close has
+# to be below that highest top and above the highest of the lows between
+# the tops. Rows that are padded with NaN on the older side to stack them
+# need their lengths. Returns whether each row is a VCP and its highest top.
+def findVCP(high, low, close, window=3, percentageFromTop=3, lengths=None):
+    high, low, close = [
+        np.atleast_2d(np.asarray(values, dtype=np.float64))
+        for values in [high, low, close]
+    ]
+    rows, days = high.shape
+    position = np.arange(days)
+    if lengths is None:
+        isPadding = np.zeros((rows, days), dtype=bool)
+    else:
+        isPadding = position[None, :] < (days - np.asarray(lengths))[:, None]
+        # The first day of a shorter row stands in for the days before it
+        firstDay = np.minimum(days - np.asarray(lengths), days - 1)
+        high = np.where(isPadding, high[np.arange(rows), firstDay][:, None], high)
+    isTop = latestPoints(swingHighs(high, window) & ~isPadding, 4)
+    filledLow = np.where(np.isfinite(low), low, 0.0)
+    filledClose = np.where(np.isfinite(close), close, 0.0)
+    with np.errstate(invalid="ignore"):
+        isTop &= high > 0
+    tops = isTop.sum(axis=1)
+    highestTop = np.round(
+        np.where(isTop, high, -np.inf).max(axis=1, initial=-np.inf), 1
+    )
+    limit = highestTop - (highestTop * (percentageFromTop / 100))
+    with np.errstate(invalid="ignore"):
+        inRange = ~(isTop & ~(high > limit[:, None])).any(axis=1)
+    # The lowest low from each top back to the one before it
+    fromLatest = np.cumsum(isTop[:, ::-1], axis=1)[:, ::-1]
+    highestLowPoint = np.full(rows, -np.inf)
+    for top in range(1, 4):
+        newer = np.where(isTop & (fromLatest == top), position, -1).max(axis=1)
+        older = np.where(isTop & (fromLatest == top + 1), position, -1).max(axis=1)
+        between = (position[None, :] >= older[:, None]) & (
+            position[None, :] <= newer[:, None]
+        )
+        lowPoint = np.where(between, filledLow, np.inf).min(axis=1)
+        highestLowPoint = np.where(
+            older >= 0, np.maximum(highestLowPoint, lowPoint), highestLowPoint
+        )
+    ltp = filledClose[:, -1] if days > 0 else np.full(rows, np.nan)
+    isVCP = (tops >= 2) & inRange & (ltp < highestTop) & (ltp > highestLowPoint)
+    return isVCP, np.where(tops > 0, highestTop, np.nan)
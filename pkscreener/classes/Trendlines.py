@@ -0,0 +1,88 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import numpy as np
+
+# The support line is fitted through at most this many of the lowest lows
+SUPPORT_POINTS = 30
+# Every round of supportLines leaves the lows below the line fitted through
+# the previous ones, about half of them, so a few rounds are enough for any
+# history. The lows only stop shrinking when rounding puts all of them
+# below their own line (for example, when they are on one line), and the
+# rounds stop there instead of going on forever.
+MAXIMUM_ROUNDS = 64
+
+
+# The least-squares slope and intercept of y over x for every row, using
+# only the days that are selected. Rows with fewer than 2 of them get NaN.
+def fitLines(x, y, selected):
+    count = selected.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xMean = np.where(selected, x, 0.0).sum(axis=1) / count
+        yMean = np.where(selected, y, 0.0).sum(axis=1) / count
+        dx = np.where(selected, x - xMean[:, None], 0.0)
+        dy = np.where(selected, y - yMean[:, None], 0.0)
+        slope = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+    return slope, yMean - slope * xMean
+
+
+# The support lines of every row of lows and closes (stocks x days, oldest
+# day first). The lows below the least-squares line through them are kept
+# until no more than points of them are left, and the line is then fitted
+# through the closes of those days. Missing (NaN) days, such as the padding
+# of shorter histories, are left out. Returns the slopes and the intercepts
+# over the day numbers 1, 2, ..., days.
+def supportLines(low, close, points=SUPPORT_POINTS, maximumRounds=MAXIMUM_ROUNDS):
+    low = np.atleast_2d(np.asarray(low, dtype=np.float64))
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    number = np.arange(1, low.shape[1] + 1, dtype=np.float64)[None, :]
+    selected = np.isfinite(low) & np.isfinite(close)
+    remaining = selected.sum(axis=1)
+    for _ in range(maximumRounds):
+        active = remaining > points
+        if not active.any():
+            break
+        slope, intercept = fitLines(number, low, selected)
+        with np.errstate(invalid="ignore"):
+            below = low < slope[:, None] * number + intercept[:, None]
+        selected = np.where(active[:, None], selected & below, selected)
+        shrunk = selected.sum(axis=1)
+        # Rows whose lows did not shrink will not shrink any more
+        remaining = np.where(shrunk < remaining, shrunk, 0)
+    return fitLines(number, close, selected)
+
+
+# Whether the latest close of every row is within percentage of its rising
+# support line
+def isNearSupport(low, close, percentage=0.05, minimumSlope=0.15):
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    slope, intercept = supportLines(low, close)
+    support = slope * close.shape[1] + intercept
+    latest = close[:, -1]
+    with np.errstate(invalid="ignore"):
+        return (
+            (support - support * percentage < latest)
+            & (latest < support + support * percentage)
+            & (slope > minimumSlope)
+        )
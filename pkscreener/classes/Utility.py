@@ -41,7 +41,6 @@ import platform
 import tempfile
 import time
 
-import joblib
 import numpy as np
 import pytz
 from genericpath import isfile
@@ -49,9 +48,6 @@ from genericpath import isfile
 from pkscreener import Imports
 from pkscreener.classes.log import default_logger
 
-if Imports["keras"]:
-    import keras
-
 import warnings
 from time import sleep
 
@@ -59,17 +55,16 @@ warnings.simplefilter("ignore", DeprecationWarning)
 warnings.simplefilter("ignore", FutureWarning)
 import pandas as pd
 from alive_progress import alive_bar
-from PIL import Image, ImageDraw, ImageFont
-from requests_cache import CachedSession
 from tabulate import tabulate
 
 import pkscreener.classes.ConfigManager as ConfigManager
 import pkscreener.classes.Fetcher as Fetcher
+import pkscreener.classes.NiftyModel as NiftyModel
 from pkscreener.classes import VERSION, Archiver, Changelog
 from pkscreener.classes.ColorText import colorText
 from pkscreener.classes.MenuOptions import menus
+from pkscreener.classes.StockDataStore import SharedStockDict, StockDataStore
 
-session = CachedSession("pkscreener_cache", cache_control=True)
 fetcher = Fetcher.tools(ConfigManager.tools())
 artText = """
     $$$$$$      $$   $$      $$$$$                                                        
@@ -212,6 +207,8 @@ class tools:
         return cellFillColor, cleanedUpStyledValue
 
     def tableToImage(table, styledTable, filename, label):
+        from PIL import Image, ImageDraw, ImageFont
+
         warnings.filterwarnings("ignore", category=DeprecationWarning)
         # First 4 lines are headers. Last 1 line is bottom grid line
         fontURL = 'https://raw.githubusercontent.com/pkjmesra/pkscreener/main/pkscreener/courbd.ttf'
@@ -436,24 +433,58 @@ class tools:
                 break
         return exists, cache_file
 
-    def saveStockData(stockDict, configManager, loadCount):
+    # The most recent stock data cache in the current directory that can
+    # be brought up to date instead of downloading everything again
+    def latestStockDataCache(intraday=False):
+        pattern = f"{'intraday_' if intraday else ''}stock_data_"
+        caches = []
+        for f in glob.glob(f"{pattern}*.pkl"):
+            try:
+                cacheDate = datetime.datetime.strptime(
+                    os.path.basename(f)[len(pattern) : -len(".pkl")], "%d%m%y"
+                )
+            except ValueError as e:
+                default_logger().debug(e, exc_info=True)
+                continue
+            if StockDataStore.isStoreFile(f):
+                caches.append((cacheDate, f))
+        if len(caches) == 0:
+            return None
+        return max(caches)[1]
+
+    def saveStockData(stockDict, configManager, loadCount, downloadOnly=False):
         exists, cache_file = tools.afterMarketStockDataExists(configManager.isIntradayConfig())
         if exists:
             configManager.deleteFileWithPattern(excludeFile=cache_file)
 
         if not os.path.exists(cache_file) or len(stockDict) > (loadCount + 1):
-            with open(cache_file, "wb") as f:
-                try:
-                    pickle.dump(stockDict.copy(), f)
-                    print(colorText.BOLD + colorText.GREEN + "=> Done." + colorText.END)
-                except pickle.PicklingError as e:
-                    default_logger().debug(e, exc_info=True)
-                    print(
-                        colorText.BOLD
-                        + colorText.FAIL
-                        + "=> Error while Caching Stock Data."
-                        + colorText.END
-                    )
+            try:
+                stockData = stockDict.copy()
+                if isinstance(stockDict, SharedStockDict):
+                    # Release the mapped cache file before it gets replaced
+                    stockDict.close()
+                if os.path.exists(cache_file) and StockDataStore.isStoreFile(cache_file):
+                    # Only a part of the cache may have been loaded for this scan.
+                    # Carry over the rest of the stocks from the existing cache.
+                    store = StockDataStore(cache_file)
+                    for stock in store.keys():
+                        if stock not in stockData:
+                            stockData[stock] = store.get(stock)
+                    store.close()
+                StockDataStore.save(stockData, cache_file)
+                if downloadOnly:
+                    # The earlier caches are only kept to be brought up to
+                    # date from (see StockDataSync). A download has done so.
+                    configManager.deleteFileWithPattern(excludeFile=cache_file)
+                print(colorText.BOLD + colorText.GREEN + "=> Done." + colorText.END)
+            except Exception as e:
+                default_logger().debug(e, exc_info=True)
+                print(
+                    colorText.BOLD
+                    + colorText.FAIL
+                    + "=> Error while Caching Stock Data."
+                    + colorText.END
+                )
         else:
             print(
                 colorText.BOLD + colorText.GREEN + "=> Already Cached." + colorText.END
@@ -465,13 +496,43 @@ class tools:
         downloadOnly=False,
         defaultAnswer=None,
         retrial=False,
+        stockCodes=None,
     ):
         exists, cache_file = tools.afterMarketStockDataExists(configManager.isIntradayConfig())
         default_logger().info(
             f"Stock data cache file:{cache_file} exists ->{str(exists)}"
         )
         stockDataLoaded = False
-        if exists:
+        if exists and StockDataStore.isStoreFile(cache_file):
+            try:
+                store = StockDataStore(cache_file)
+                if not downloadOnly:
+                    print(
+                        colorText.BOLD
+                        + colorText.GREEN
+                        + "[+] Automatically Using Cached Stock Data due to After-Market hours!"
+                        + colorText.END
+                    )
+                if isinstance(stockDict, SharedStockDict):
+                    # The workers will map the cache file directly
+                    stockDict.attach(cache_file)
+                else:
+                    # Only read the stocks that we're going to need for this scan
+                    stockDict.update(store.toDict(symbols=stockCodes))
+                store.close()
+                stockDataLoaded = True
+            except Exception as e:
+                default_logger().debug(e, exc_info=True)
+                print(
+                    colorText.BOLD
+                    + colorText.FAIL
+                    + "[+] Stock Cache Corrupted."
+                    + colorText.END
+                )
+                if tools.promptFileExists(defaultAnswer=defaultAnswer) == "Y":
+                    configManager.deleteFileWithPattern()
+        elif exists:
+            # Older caches were a pickled dictionary of stock -> DataFrame.to_dict("split")
             with open(cache_file, "rb") as f:
                 try:
                     stockData = pickle.load(f)
@@ -569,6 +630,7 @@ class tools:
                         downloadOnly,
                         defaultAnswer,
                         retrial=True,
+                        stockCodes=stockCodes,
                     )
         if not stockDataLoaded:
             print(
@@ -855,8 +917,12 @@ class tools:
         return bar, spinner
 
     def getNiftyModel(retrial=False):
+        # The model exported to NumPy (see NiftyModel) needs neither keras
+        # nor a download. The keras model is only used without it.
+        model = NiftyModel.loadModel()
+        if model is not None:
+            return model, {"columns": model.columns, "scaler": model.scaler}
         files = ["nifty_model_v2.h5", "nifty_model_v2.pkl"]
-        model = None
         urls = [
             "https://raw.github.com/pkjmesra/PKScreener/main/pkscreener/ml/nifty_model_v2.h5",
             "https://raw.github.com/pkjmesra/PKScreener/main/pkscreener/ml/nifty_model_v2.pkl",
@@ -906,8 +972,15 @@ class tools:
             time.sleep(3)
         try:
             if os.path.isfile(files[0]) and os.path.isfile(files[1]):
+                # keras pulls in tensorflow, which takes seconds to import,
+                # so neither is imported until the model is needed
+                import joblib
+
                 pkl = joblib.load(files[1])
-                model = keras.models.load_model(files[0]) if Imports["keras"] else None
+                if Imports["keras"]:
+                    import keras
+
+                    model = keras.models.load_model(files[0])
         except Exception as e:
             default_logger().debug(e, exc_info=True)
             os.remove(files[0])
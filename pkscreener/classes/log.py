@@ -56,6 +56,9 @@ __all__ = [
 __trace__ = False
 __filter__ = None
 __DEBUG__ = False
+# The handlers added by filterlogger.addHandlers, so that each of them is
+# only added once to a logger
+__handlers__ = {}
 
 
 class colors:
@@ -138,8 +141,12 @@ class filterlogger:
             h.flush()
 
     def addHandlers(self, log_file_path=None, levelname=logging.NOTSET):
+        global __handlers__
         if log_file_path is None:
             log_file_path = os.path.join(tempfile.gettempdir(), "pkscreener-logs.txt")
+        key = (self.logger.name, log_file_path, levelname)
+        if key in __handlers__:
+            return __handlers__[key]
         trace_formatter = logging.Formatter(
             fmt="\n%(asctime)s - %(name)s - %(levelname)s - %(filename)s - %(module)s - %(funcName)s - %(lineno)d\n%(message)s\n"
         )
@@ -157,6 +164,7 @@ class filterlogger:
             global __DEBUG__
             __DEBUG__ = True
             self.logger.debug("Logging started. Filter:{}".format(filter))
+        __handlers__[key] = (consolehandler, filehandler)
         return consolehandler, filehandler
 
     def debug(self, e, exc_info=False):
@@ -184,11 +192,16 @@ class filterlogger:
         elif self.level == logging.INFO:
             self.info(line)
 
-    def info(self, line):
+    # Like logging, the line is only formatted with args (line % args) when
+    # it does get logged, so that the callers need not build lines with
+    # large objects in them (DataFrames etc.) when logging is off.
+    def info(self, line, *args):
         global __filter__, __DEBUG__
         __DEBUG__ = self.level == logging.DEBUG
         if not self.logger.level == logging.DEBUG:
             return
+        if args:
+            line = line % args
         frame = inspect.stack()[1]
         # filename = (frame[0].f_code.co_filename).rsplit('/', 1)[1]
         components = str(frame).split(",")
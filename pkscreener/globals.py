@@ -47,11 +47,15 @@ from tabulate import tabulate
 import pkscreener.classes.ConfigManager as ConfigManager
 import pkscreener.classes.Fetcher as Fetcher
 import pkscreener.classes.Screener as Screener
+import pkscreener.classes.ScreeningEngine as ScreeningEngine
+import pkscreener.classes.StockDataSync as StockDataSync
 import pkscreener.classes.Utility as Utility
-from pkscreener.classes import VERSION, Committer
-from pkscreener.classes.Backtest import backtest, backtestSummary
+from pkscreener.classes import VERSION, Committer, StartupProfile
+from pkscreener.classes.Backtest import (BacktestResults, backtestSummary,
+                                         formattedBacktestResults)
 from pkscreener.classes.CandlePatterns import CandlePatterns
 from pkscreener.classes.ColorText import colorText
+from pkscreener.classes.FetchPipeline import FetchPipeline
 from pkscreener.classes.log import default_logger, tracelog
 from pkscreener.classes.MenuOptions import (level0MenuDict, level1_X_MenuDict,
                                             level2_X_MenuDict,
@@ -60,6 +64,10 @@ from pkscreener.classes.MenuOptions import (level0MenuDict, level1_X_MenuDict,
 from pkscreener.classes.OtaUpdater import OTAUpdater
 from pkscreener.classes.ParallelProcessing import StockConsumer
 from pkscreener.classes.PKMultiProcessorClient import PKMultiProcessorClient
+from pkscreener.classes.PKTaskBatch import taskBatches
+from pkscreener.classes.PKWorkerPool import PKWorkerPool
+from pkscreener.classes.StageTimings import StageTimings
+from pkscreener.classes.StockDataStore import SharedStockDict, StockDataStore
 from pkscreener.Telegram import (is_token_telegram_configured, send_document,
                                  send_message)
 
@@ -88,11 +96,93 @@ menuChoiceHierarchy = ""
 newlyListedOnly = False
 screenCounter = None
 screener = Screener.tools(configManager, default_logger())
+screeningEngine = ScreeningEngine.tools(configManager, default_logger())
 screenResults = None
 screenResultsCounter = None
 selectedChoice = {"0": "", "1": "", "2": "", "3": "", "4": ""}
 stockDict = None
 userPassedArgs = None
+workerPool = None
+
+# Adds the backtest results to the end of the backtest report (the one
+# sorted by stock) without writing the results that are already in it
+def appendBacktestResults(backtest_df, optionalName="backtest_result"):
+    backtest_df = formattedBacktestResults(backtest_df)
+    print(tabulate(backtest_df, headers="keys", tablefmt="grid")+"\n")
+    htmlEnd = "</tbody></table></span></body></html>"
+    colored_text = reformatTable("", {}, backtest_df.to_html(), sorting=True)
+    rows = colored_text[colored_text.index("<tbody>") + len("<tbody>"):colored_text.rindex("</tbody>")]
+    try:
+        with open(backtestReportFileName(optionalName), "rb+") as f:
+            f.seek(-len(htmlEnd), os.SEEK_END)
+            if f.read().decode() != htmlEnd:
+                raise ValueError("The backtest report does not end with its table.")
+            f.seek(-len(htmlEnd), os.SEEK_END)
+            f.write((rows + htmlEnd).encode())
+    except Exception as e:
+        default_logger().debug(e, exc_info=True)
+
+def backtestReportChoices():
+    choices = ""
+    for choice in selectedChoice:
+        if len(selectedChoice[choice]) > 0:
+            if len(choices) > 0:
+                choices = f"{choices}_"
+            choices = f"{choices}{selectedChoice[choice]}"
+    if choices.endswith('_'):
+        choices = choices[:-1]
+        choices = f"{choices}{'_i' if userPassedArgs.intraday else ''}"
+    return choices
+
+def backtestReportFileName(optionalName="backtest_result", sortKey="Stock"):
+    return f"PKScreener_{backtestReportChoices()}_{optionalName}_{sortKey}Sorted.html"
+
+# Number of worker processes for the given number of tasks
+def consumersCount(minimumCount=0):
+    totalConsumers = min(minimumCount, multiprocessing.cpu_count())
+    if totalConsumers == 1:
+        totalConsumers = 2  # This is required for single core machine
+    if configManager.cacheEnabled is True and multiprocessing.cpu_count() > 2:
+        totalConsumers -= 1
+    return totalConsumers
+
+# Downloads the data of the given stocks, bringing the latest cache up to
+# date where it can and downloading the rest in full.
+def downloadStockData(stocksToFetch, threads=True, printCounter=False):
+    period = configManager.period
+    if newlyListedOnly and int(configManager.period[:-1]) > 250:
+        period = "250d"
+    stockDataDict = syncWithLatestCache(
+        stocksToFetch, period, threads=threads, printCounter=printCounter
+    )
+    stockDataDict.update(
+        fetcher.fetchStockDataInChunks(
+            [stock for stock in stocksToFetch if stock not in stockDataDict],
+            period,
+            configManager.duration,
+            fetcher.proxyServer,
+            chunkSize=configManager.downloadChunkSize,
+            printCounter=printCounter,
+            threads=threads,
+        )
+    )
+    return stockDataDict
+
+# Shows and saves the backtest results found since the last dump and the
+# summary of all of them. Only the new results are worked on, so a long
+# backtest takes time in proportion to the number of results it finds.
+def dumpBacktestResults(backtestResults):
+    isFirstDump = backtestResults.dumpedCount == 0
+    backtest_df = backtestResults.newDataFrame()
+    if len(backtest_df) > 0:
+        backtest_df.set_index("Stock", inplace=True)
+        if isFirstDump:
+            showBacktestResults(backtest_df)
+        else:
+            appendBacktestResults(backtest_df)
+    summary_df = backtestResults.summary()
+    if summary_df is not None:
+        showBacktestResults(summary_df,optionalName="Summary")
 
 def finishScreening(
     downloadOnly,
@@ -218,6 +308,33 @@ def getTopLevelMenuChoices(startupoptions, testBuild, downloadOnly,defaultAnswer
         menuOption, tickerOption, executeOption, selectedChoice = getDownloadChoices(defaultAnswer=defaultAnswer)
     return options, menuOption, tickerOption, executeOption
 
+# The workers that stay alive from one run to the next. A new pool is made
+# when there is none yet, when any of its workers has died (for example,
+# after Ctrl+C) or when the run needs more workers than it has.
+def getWorkerPool(itemsCount):
+    global workerPool
+    totalConsumers = consumersCount(itemsCount)
+    if (
+        workerPool is not None
+        and workerPool.isAlive()
+        and workerPool.totalConsumers >= totalConsumers
+    ):
+        return workerPool
+    if workerPool is not None:
+        workerPool.terminate()
+    tasks_queue, results_queue, totalConsumers = initQueues(itemsCount)
+    workerPool = PKWorkerPool(
+        tasks_queue,
+        results_queue,
+        totalConsumers,
+        screenCounter,
+        screenResultsCounter,
+        fetcher.proxyServer,
+        keyboardInterruptEvent,
+        default_logger(),
+    )
+    return workerPool
+
 def handleScannerExecuteOption4(executeOption, options):
     try:
         # m2.find(str(executeOption))
@@ -312,6 +429,7 @@ def initExecution(menuOption=None):
     Utility.tools.clearScreen()
 
     m0.renderForMenu(selectedMenu=None)
+    showStartupProfile()
     try:
         if menuOption is None:
             menuOption = input(colorText.BOLD + colorText.FAIL + "[+] Select option: ")
@@ -453,13 +571,35 @@ def initPostLevel1Execution(tickerOption, executeOption=None, skip=[], retrial=F
 def initQueues(minimumCount=0):
     tasks_queue = multiprocessing.JoinableQueue()
     results_queue = multiprocessing.Queue()
+    return tasks_queue, results_queue, consumersCount(minimumCount)
 
-    totalConsumers = min(minimumCount, multiprocessing.cpu_count())
-    if totalConsumers == 1:
-        totalConsumers = 2  # This is required for single core machine
-    if configManager.cacheEnabled is True and multiprocessing.cpu_count() > 2:
-        totalConsumers -= 1
-    return tasks_queue, results_queue, totalConsumers
+# Whether the stock data is to be downloaded while the workers screen it (see
+# FetchPipeline) instead of all of it before they begin. That is only worth
+# it when all the data has to be downloaded afresh anyway, and not for the
+# scanners of the screening engine, which need all the data at once.
+def isFetchPipelined(menuOption, executeOption, listStockCodes, downloadOnly, testing):
+    if (
+        testing
+        or menuOption not in ["X", "B"]
+        or configManager.downloadChunkSize <= 0
+        or listStockCodes is None
+        or len(listStockCodes) == 0
+        or not isFreshDataRequired(downloadOnly)
+    ):
+        return False
+    return not (
+        menuOption == "X"
+        and configManager.vectorizedScreening
+        and not downloadOnly
+        and screeningEngine.supports(executeOption, newlyListedOnly)
+    )
+
+def isFreshDataRequired(downloadOnly):
+    return (
+        downloadOnly
+        or not configManager.cacheEnabled
+        or Utility.tools.isTradingTime()
+    )
 
 def labelDataForPrinting(screenResults, saveResults, configManager, volumeRatio):
     # Publish to gSheet with https://github.com/burnash/gspread
@@ -504,14 +644,21 @@ def main(userArgs=None):
     startupoptions=None if userArgs is None else userArgs.options
     user=None if userArgs is None else userArgs.user
     defaultAnswer = None if userArgs is None else userArgs.answerdefault
+    timeStages = False if userArgs is None else userArgs.timings
     userPassedArgs = userArgs
     options = []
-    screenCounter = multiprocessing.Value("i", 1)
-    screenResultsCounter = multiprocessing.Value("i", 0)
-    keyboardInterruptEvent = multiprocessing.Manager().Event()
+    # The workers that live on from one run to the next hold on to these
+    if screenCounter is None:
+        screenCounter = multiprocessing.Value("i", 1)
+        screenResultsCounter = multiprocessing.Value("i", 0)
+        keyboardInterruptEvent = multiprocessing.Manager().Event()
+    else:
+        screenCounter.value = 1
+        screenResultsCounter.value = 0
+        keyboardInterruptEvent.clear()
 
     if stockDict is None:
-        stockDict = multiprocessing.Manager().dict()
+        stockDict = SharedStockDict(multiprocessing.Manager().dict())
         loadCount = 0
 
     minRSI = 0
@@ -859,12 +1006,19 @@ def main(userArgs=None):
             input("Exiting now...")
             sys.exit(0)
 
+        # Only the stocks required for a scan are read from the cache. A later
+        # scan with a different set of stocks may need to read the cache again.
+        stocksMissingFromLoadedCache = (
+            loadedStockData
+            and not set(listStockCodes).issubset(stockDict.keys())
+            and Utility.tools.afterMarketStockDataExists(configManager.isIntradayConfig())[0]
+        )
         if (
             menuOption == "X"
             and not downloadOnly
             and not Utility.tools.isTradingTime()
             and configManager.cacheEnabled
-            and not loadedStockData
+            and (not loadedStockData or stocksMissingFromLoadedCache)
             and not testing
         ):
             dfsd = None  # Archiver.readData(f'SD_{Utility.tools.tradingDate()}_{selectedChoice["0"]}_{selectedChoice["1"]}_{selectedChoice["2"]}_{selectedChoice["3"]}.pkl')
@@ -901,6 +1055,7 @@ def main(userArgs=None):
                 configManager,
                 downloadOnly=downloadOnly,
                 defaultAnswer=defaultAnswer,
+                stockCodes=listStockCodes,
             )
             loadedStockData = True
         loadCount = len(stockDict)
@@ -918,6 +1073,12 @@ def main(userArgs=None):
                 + "[+] Starting download.. Press Ctrl+C to stop!\n"
             )
 
+        pipelineFetch = isFetchPipelined(
+            menuOption, executeOption, listStockCodes, downloadOnly, testing
+        )
+        dataPrefetched = pipelineFetch or prefetchStockData(
+            listStockCodes, stockDict, downloadOnly, printCounter=userArgs.log
+        )
         suggestedHistoricalDuration = (
             getHistoricalDays(len(listStockCodes), testing) if menuOption.upper() == "B" else 1
         )
@@ -935,12 +1096,14 @@ def main(userArgs=None):
                 + colorText.WARN
                 + f"[+] A total of {suggestedHistoricalDuration} days of historical data will be considered for backtesting. You can change this in User Config.\n"
             )
-        items = []
+        # The parameters of the tasks for each day, which are the same for
+        # all the stocks. The stock in them is filled in by PKTaskBatch.
+        taskParameters = []
         actualHistoricalDuration = samplingDuration - fillerPlaceHolder
         # Lets begin from y days ago, evaluate from that date if the selected strategy had yielded any result
         # and then keep coming to the next day (x-1) until we get to today (actualHistoricalDuration = 0)
         while actualHistoricalDuration >= 0:
-            moreItems = [
+            taskParameters.append(
                 (
                     executeOption,
                     reversalOption,
@@ -952,7 +1115,7 @@ def main(userArgs=None):
                     insideBarToLookback,
                     len(listStockCodes),
                     configManager.cacheEnabled,
-                    stock,
+                    None,
                     newlyListedOnly,
                     downloadOnly,
                     volumeRatio,
@@ -962,45 +1125,116 @@ def main(userArgs=None):
                     (backtestPeriod if menuOption == "B" else configManager.daysToLookback),
                     default_logger().level,
                     False,
+                    dataPrefetched,
                 )
-                for stock in listStockCodes
-            ]
-            items.extend(moreItems)
+            )
+            if menuOption == "B":
+                # StockConsumer.backtestStocks goes through all the days from
+                # actualHistoricalDuration days ago till today for each stock
+                break
             fillerPlaceHolder = fillerPlaceHolder + 1
             actualHistoricalDuration = samplingDuration - fillerPlaceHolder
-        tasks_queue, results_queue, totalConsumers = initQueues(len(items))
-        consumers = [
-            PKMultiProcessorClient(
-                StockConsumer().screenStocks,
+        # All the cached stocks can be screened together for the scanners
+        # that the screening engine supports, without any worker processes.
+        useScreeningEngine = (
+            menuOption == "X"
+            and configManager.vectorizedScreening
+            and not downloadOnly
+            and not testing
+            and (dataPrefetched or not Utility.tools.isTradingTime())
+            and screeningEngine.supports(executeOption, newlyListedOnly)
+            and set(listStockCodes).issubset(stockDict.keys())
+        )
+        if useScreeningEngine:
+            screenResults, saveResults = screenWithEngine(
+                executeOption,
+                listStockCodes,
+                minRSI,
+                maxRSI,
+                volumeRatio,
+                respChartPattern,
+                insideBarToLookback,
+                screenResults,
+                saveResults,
+            )
+        else:
+            processorMethod = (
+                StockConsumer().backtestStocks
+                if menuOption == "B"
+                else StockConsumer().screenStocks
+            )
+            # Unit tests may stop before all the results are in, so they get
+            # their own workers which are done away with at the end.
+            persistentWorkers = not testing
+            itemsCount = len(taskParameters) * len(listStockCodes)
+            fetchPipeline = None
+            if pipelineFetch:
+                # Whatever is left over from an earlier run is stale by now.
+                # This has to be done before the workers get the stockDict.
+                stockDict.reset()
+            if persistentWorkers:
+                pool = getWorkerPool(itemsCount)
+                tasks_queue, results_queue = pool.tasks_queue, pool.results_queue
+                startWorkers(pool.submitJob(processorMethod, stockDict, configManager))
+                consumers = pool.consumers
+            else:
+                tasks_queue, results_queue, totalConsumers = initQueues(itemsCount)
+                consumers = [
+                    PKMultiProcessorClient(
+                        processorMethod,
+                        tasks_queue,
+                        results_queue,
+                        screenCounter,
+                        screenResultsCounter,
+                        stockDict,
+                        fetcher.proxyServer,
+                        keyboardInterruptEvent,
+                        default_logger(),
+                    )
+                    for _ in range(totalConsumers)
+                ]
+                startWorkers(consumers)
+            if pipelineFetch:
+                # The pipeline puts the batches in the tasks queue as the
+                # chunks of stocks get downloaded.
+                items = []
+                fetchPipeline = FetchPipeline(
+                    lambda stocks, threads: downloadStockData(stocks, threads=threads),
+                    stockDict,
+                ).start(
+                    listStockCodes,
+                    configManager.downloadChunkSize,
+                    taskParameters,
+                    tasks_queue,
+                    len(consumers),
+                    timed=timeStages,
+                )
+            else:
+                items = taskBatches(
+                    taskParameters, listStockCodes, len(consumers), timed=timeStages
+                )
+            screenResults, saveResults, backtest_df = runScanners(
+                menuOption,
+                items,
                 tasks_queue,
                 results_queue,
-                screenCounter,
-                screenResultsCounter,
-                stockDict,
-                fetcher.proxyServer,
-                keyboardInterruptEvent,
-                default_logger(),
+                listStockCodes,
+                backtestPeriod,
+                (1 if menuOption == "B" else samplingDuration - 1),
+                consumers,
+                screenResults,
+                saveResults,
+                backtest_df,
+                testing=testing,
+                persistentWorkers=persistentWorkers,
             )
-            for _ in range(totalConsumers)
-        ]
-        startWorkers(consumers)
-        screenResults, saveResults, backtest_df = runScanners(
-            menuOption,
-            items,
-            tasks_queue,
-            results_queue,
-            listStockCodes,
-            backtestPeriod,
-            samplingDuration - 1,
-            consumers,
-            screenResults,
-            saveResults,
-            backtest_df,
-            testing=testing
-        )
 
-        print(colorText.END)
-        terminateAllWorkers(consumers, tasks_queue, testing)
+            if fetchPipeline is not None:
+                fetchPipeline.stop()
+                fetchPipeline.join()
+            print(colorText.END)
+            if not persistentWorkers:
+                terminateAllWorkers(consumers, tasks_queue, testing)
         if not downloadOnly and menuOption == "X":
             screenResults, saveResults = labelDataForPrinting(
                 screenResults, saveResults, configManager, volumeRatio
@@ -1089,13 +1323,42 @@ def main(userArgs=None):
         newlyListedOnly = False
 
 
-def populateQueues(items, tasks_queue):
+def populateQueues(items, tasks_queue, exitSignals=True):
     for item in items:
         tasks_queue.put(item)
+    if not exitSignals:
+        # The workers stay on for the next run
+        return
     # Append exit signal for each process indicated by None
     for _ in range(multiprocessing.cpu_count()):
         tasks_queue.put(None)
 
+def prefetchStockData(listStockCodes, stockDict, downloadOnly, printCounter=False):
+    # Download the stock data in chunks before the workers begin so that
+    # the workers do not have to go to the network one stock at a time.
+    if configManager.downloadChunkSize <= 0 or listStockCodes is None or len(listStockCodes) == 0:
+        return False
+    freshDataRequired = isFreshDataRequired(downloadOnly)
+    stocksToFetch = listStockCodes
+    if not freshDataRequired:
+        cachedStocks = set(stockDict.keys())
+        stocksToFetch = [stock for stock in listStockCodes if stock not in cachedStocks]
+    if len(stocksToFetch) > 0:
+        try:
+            stockDataDict = downloadStockData(stocksToFetch, printCounter=printCounter)
+        except Exception as e:
+            default_logger().debug(e, exc_info=True)
+            return False
+        if freshDataRequired:
+            # Whatever is left over from an earlier run is stale by now.
+            # Let the workers fetch the missing stocks again individually.
+            stockDict.reset()
+        if len(stockDataDict) > 0:
+            stockDict.addStore(
+                {stock: data.to_dict("split") for stock, data in stockDataDict.items()}
+            )
+    return True
+
 def printNotifySaveScreenedResults(
     screenResults, saveResults, selectedChoice, menuChoiceHierarchy, testing, user=None
 ):
@@ -1192,11 +1455,14 @@ def runScanners(
     screenResults,
     saveResults,
     backtest_df,
-    testing=False
+    testing=False,
+    persistentWorkers=False,
 ):
     global selectedChoice, userPassedArgs
-    populateQueues(items, tasks_queue)
+    populateQueues(items, tasks_queue, exitSignals=not persistentWorkers)
     choices = userReportName(selectedChoice)
+    backtestResults = BacktestResults()
+    stageTimings = StageTimings()
     try:
         numStocks = len(listStockCodes) * int(iterations)
         dumpFreq = 1
@@ -1207,51 +1473,52 @@ def runScanners(
         with alive_bar(numStocks, bar=bar, spinner=spinner) as progressbar:
             lstscreen = []
             lstsave = []
-            lstFullData = []
             stocks = []
-            while numStocks:
-                counter += 1
-                result = results_queue.get()
-                if result is not None:
-                    lstscreen.append(result[0])
-                    lstsave.append(result[1])
-                    lstFullData.append(result[2])
-                    stocks.append(result[3])
-                    sampleDays = result[4]
-                    # Backtest for results
-                    if menuOption == "B":
-                        sellSignal = (
-                            str(selectedChoice["2"]) in ["6","7"] and 
-                            str(selectedChoice["3"]) in ["2"]
-                            ) or selectedChoice["2"] in ["15","16","19"]
-                        backtest_df = backtest(
-                            result[3],
-                            result[2],
-                            result[0],
-                            backtestPeriod,
-                            sampleDays,
-                            backtest_df,
-                            sellSignal
-                        )
-                        elapsed_time = time.time() - start_time
-                        if  screenResultsCounter.value >= 50 * (4 if userPassedArgs.prodbuild else 1) * dumpFreq:
-                            # Dump results on the screen and into a file every 50 results
-                            showBacktestResults(backtest_df)
-                            summary_df = backtestSummary(backtest_df)
-                            # summary_df.set_index("Stock", inplace=True)
-                            showBacktestResults(summary_df,optionalName="Summary")
-                            dumpFreq = dumpFreq + 1
-                        # Commit intermittently if its been running for over 5 hours
-                        if userPassedArgs.prodbuild and elapsed_time >= 5*3600:
-                            Committer.commitTempOutcomes(choices)
-                numStocks -= 1
-                progressbar.text(
-                    colorText.BOLD
-                    + colorText.GREEN
-                    + f"Found {screenResultsCounter.value} Stocks"
-                    + colorText.END
-                )
-                progressbar()
+            while numStocks > 0:
+                # Each item in the queue has the results of a batch of stocks
+                batchResults = results_queue.get()
+                stageTimings.merge(getattr(batchResults, "timings", None))
+                for stockResult in batchResults:
+                    counter += 1
+                    # Each backtest task has the results of all the days of a stock
+                    stockResults = (
+                        (stockResult or []) if menuOption == "B" else [stockResult]
+                    )
+                    for dayResult in stockResults:
+                        if dayResult is None:
+                            continue
+                        lstscreen.append(dayResult[0])
+                        lstsave.append(dayResult[1])
+                        stocks.append(dayResult[3])
+                        # Backtest for results
+                        if menuOption == "B":
+                            sellSignal = (
+                                str(selectedChoice["2"]) in ["6","7"] and 
+                                str(selectedChoice["3"]) in ["2"]
+                                ) or selectedChoice["2"] in ["15","16","19"]
+                            backtestResults.add(
+                                dayResult[3],
+                                dayResult[2],
+                                dayResult[0],
+                                backtestPeriod,
+                                sellSignal=sellSignal,
+                            )
+                            elapsed_time = time.time() - start_time
+                            if  screenResultsCounter.value >= 50 * (4 if userPassedArgs.prodbuild else 1) * dumpFreq:
+                                # Dump results on the screen and into a file every 50 results
+                                dumpBacktestResults(backtestResults)
+                                dumpFreq = dumpFreq + 1
+                            # Commit intermittently if its been running for over 5 hours
+                            if userPassedArgs.prodbuild and elapsed_time >= 5*3600:
+                                Committer.commitTempOutcomes(choices)
+                    numStocks -= 1
+                    progressbar.text(
+                        colorText.BOLD
+                        + colorText.GREEN
+                        + f"Found {screenResultsCounter.value} Stocks"
+                        + colorText.END
+                    )
+                    progressbar()
                 # If it's being run under unit testing, let's wrap up if we find at least 1
                 # stock or if we've already tried screening through 5% of the list. 
                 if testing and (len(lstscreen) >= 1 or counter >= int(len(listStockCodes)*.05)):
@@ -1277,6 +1544,14 @@ def runScanners(
         for worker in consumers:
             worker.terminate()
         logging.shutdown()
+    if len(stageTimings) > 0:
+        showStageTimings(stageTimings)
+    if menuOption == "B" and len(backtestResults) > 0:
+        backtest_df = (
+            backtestResults.dataFrame()
+            if backtest_df is None
+            else pd.concat([backtest_df, backtestResults.dataFrame()])
+        )
     return screenResults, saveResults, backtest_df
 
 
@@ -1289,7 +1564,9 @@ def saveDownloadedData(downloadOnly, testing, stockDict, configManager, loadCoun
             + colorText.END,
             end="",
         )
-        Utility.tools.saveStockData(stockDict, configManager, loadCount)
+        Utility.tools.saveStockData(
+            stockDict, configManager, loadCount, downloadOnly=downloadOnly
+        )
     else:
         print(
             colorText.BOLD + colorText.GREEN + "[+] Skipped Saving!" + colorText.END,
@@ -1329,6 +1606,52 @@ def saveNotifyResultsFile(
     if defaultAnswer is None:
         input("Press <Enter> to continue...")
 
+def screenWithEngine(
+    executeOption,
+    listStockCodes,
+    minRSI,
+    maxRSI,
+    volumeRatio,
+    respChartPattern,
+    insideBarToLookback,
+    screenResults,
+    saveResults,
+):
+    print(
+        colorText.BOLD
+        + colorText.GREEN
+        + f"[+] Screening {len(listStockCodes)} stocks together..."
+        + colorText.END
+    )
+    start_time = time.time()
+    results = screeningEngine.screen(
+        stockDict,
+        listStockCodes,
+        executeOption,
+        minRSI=minRSI,
+        maxRSI=maxRSI,
+        volumeRatio=volumeRatio,
+        respChartPattern=respChartPattern,
+        insideBarToLookback=insideBarToLookback,
+    )
+    screenResultsCounter.value = len(results)
+    print(
+        colorText.BOLD
+        + colorText.GREEN
+        + f"[+] Found {len(results)} Stocks in {round(time.time() - start_time, 2)} sec."
+        + colorText.END
+    )
+    df_extendedscreen = pd.DataFrame(
+        [result[0] for result in results], columns=screenResults.columns
+    )
+    df_extendedsave = pd.DataFrame(
+        [result[1] for result in results], columns=saveResults.columns
+    )
+    screenResults = pd.concat([screenResults, df_extendedscreen])
+    saveResults = pd.concat([saveResults, df_extendedsave])
+    return screenResults, saveResults
+
+
 def sendMessageToTelegramChannel(
     message=None, photo_filePath=None, document_filePath=None, caption=None, user=None
 ):
@@ -1379,6 +1702,7 @@ def showBacktestResults(backtest_df, sortKey="Stock",optionalName='backtest_resu
     lastSummaryRow = None
     if optionalName != "Summary":
         backtest_df.sort_values(by=[sortKey], ascending=False, inplace=True)
+        backtest_df = formattedBacktestResults(backtest_df)
     else:
         lastRow = backtest_df.iloc[-1,:]
         if lastRow.iloc[0] == 'SUMMARY':
@@ -1389,19 +1713,8 @@ def showBacktestResults(backtest_df, sortKey="Stock",optionalName='backtest_resu
     tabulated_text = tabulate(backtest_df, headers="keys", tablefmt="grid")
     print(colorText.FAIL+summaryText+colorText.END+"\n")
     print(tabulated_text+"\n")
-    choices = ""
-    choices = ""
-    for choice in selectedChoice:
-        if len(selectedChoice[choice]) > 0:
-            if len(choices) > 0:
-                choices = f"{choices}_"
-            choices = f"{choices}{selectedChoice[choice]}"
-    if choices.endswith('_'):
-        choices = choices[:-1]
-        choices = f"{choices}{'_i' if userPassedArgs.intraday else ''}"
-    filename = (
-        f"PKScreener_{choices}_{optionalName}_{sortKey}Sorted.html"
-    )
+    choices = backtestReportChoices()
+    filename = backtestReportFileName(optionalName, sortKey)
     headerDict = {0:"<th></th>"}
     index = 1
     for col in backtest_df.columns:
@@ -1443,6 +1756,28 @@ def showOptionErrorMessage():
     sleep(2)
     Utility.tools.clearScreen()
 
+def showStageTimings(stageTimings):
+    print(
+        colorText.BOLD
+        + colorText.GREEN
+        + "\n[+] Time taken by each stage of the screening (in all the workers):"
+        + colorText.END
+    )
+    print(tabulate(stageTimings.summary(), headers="keys", tablefmt="psql"))
+
+# Shown only once, when the first menu is shown with --startup-profile
+def showStartupProfile():
+    if not StartupProfile.profiling():
+        return
+    StartupProfile.stop()
+    print(
+        colorText.BOLD
+        + colorText.GREEN
+        + f"[+] The first menu was shown {StartupProfile.elapsed():.2f} seconds after the start. The slowest imports were:"
+        + colorText.END
+    )
+    print(tabulate(StartupProfile.summary(), headers="keys", tablefmt="psql"))
+
 def shutdown(frame, signum):
     # your app's shutdown or whatever
     print("Shutting down for test coverage")
@@ -1469,6 +1804,29 @@ def startWorkers(consumers):
         worker.daemon = True
         worker.start()
 
+# The stocks that are in the latest stock data cache only need the bars since
+# it was saved. Returns stock -> DataFrame for those that could be brought up
+# to date that way.
+def syncWithLatestCache(stocksToFetch, period, threads=True, printCounter=False):
+    cacheFile = Utility.tools.latestStockDataCache(configManager.isIntradayConfig())
+    if cacheFile is None:
+        return {}
+    store = StockDataStore(cacheFile)
+    try:
+        return StockDataSync.syncStockData(
+            fetcher,
+            store,
+            stocksToFetch,
+            period,
+            configManager.duration,
+            fetcher.proxyServer,
+            chunkSize=configManager.downloadChunkSize,
+            printCounter=printCounter,
+            threads=threads,
+        )
+    finally:
+        store.close()
+
 def takeBacktestInputs(
     menuOption=None, tickerOption=None, executeOption=None, backtestPeriod=0
 ):
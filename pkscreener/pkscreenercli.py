@@ -37,6 +37,12 @@ import tempfile
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Time the imports from the very start, before argparse gets to see it
+if "--startup-profile" in sys.argv:
+    from pkscreener.classes import StartupProfile
+
+    StartupProfile.start()
+
 try:
     logging.getLogger("tensorflow").setLevel(logging.ERROR)
 except Exception:
@@ -71,7 +77,6 @@ from pkscreener.classes.log import default_logger
 multiprocessing.freeze_support()
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 os.environ['AUTOGRAPH_VERBOSITY'] = '0'
-from pkscreener.classes.IntradayMonitor import intradayMonitorInstance
 
 # Argument Parsing for test purpose
 argParser = argparse.ArgumentParser()
@@ -147,6 +152,18 @@ argParser.add_argument(
     help="Run with full logging enabled",
     required=False,
 )
+argParser.add_argument(
+    "--startup-profile",
+    action="store_true",
+    help="Show how long the application took to show the first menu and the modules that took the longest to import.",
+    required=False,
+)
+argParser.add_argument(
+    "--timings",
+    action="store_true",
+    help="Show how long each stage of the screening took across all the workers at the end of each scan.",
+    required=False,
+)
 argParser.add_argument("-v", action="store_true")  # Dummy Arg for pytest -v
 argsv = argParser.parse_known_args()
 args = argsv[0]
@@ -217,6 +234,8 @@ def pkscreenercli():
             ConfigManager.parser, default=True, showFileCreatedText=False
         )
     if args.monitor:
+        from pkscreener.classes.IntradayMonitor import intradayMonitorInstance
+
         Utility.tools.clearScreen()
         intradayMonitorInstance.monitor()
         sys.exit(0)
@@ -25,13 +25,16 @@
 import warnings
 from unittest.mock import patch
 
+import numpy as np
+
 warnings.simplefilter("ignore", DeprecationWarning)
 warnings.simplefilter("ignore", FutureWarning)
 import pandas as pd
 import pytest
 
 from pkscreener.classes import Pktalib
-from pkscreener.classes.CandlePatterns import CandlePatterns
+from pkscreener.classes.CandlePatterns import (CANDLES, KERNELS, PATTERNS,
+                                               CandlePatterns)
 
 
 @pytest.fixture
@@ -351,4 +354,70 @@ def test_findPattern_bearish_engulfing(candle_patterns):
         cdl_obj.return_value = df.tail(1).squeeze()
         assert candle_patterns.findPattern(df, dict, saveDict) is True
     assert dict["Pattern"] == "\033[1m\033[91mBearish Engulfing\033[0m"
-    assert saveDict["Pattern"] == "Bearish Engulfing"
\ No newline at end of file
+    assert saveDict["Pattern"] == "Bearish Engulfing"
+def randomCandles(rng, rows):
+    if rng.integers(0, 2):
+        # Small whole numbers, so that the bodies often line up
+        open = rng.integers(1, 5, rows).astype(float)
+        close = rng.integers(1, 5, rows).astype(float)
+    else:
+        open = rng.normal(100, 2, rows)
+        close = open + rng.normal(0, 2, rows)
+    return pd.DataFrame(
+        {
+            "Open": open,
+            "High": np.maximum(open, close) + 1,
+            "Low": np.minimum(open, close) - 1,
+            "Close": close,
+        }
+    )
+
+def test_talib_finds_no_other_pattern_in_the_last_candles():
+    pytest.importorskip("talib")
+    from talib import abstract
+    for function, _, _ in PATTERNS:
+        lookback = abstract.Function(function).lookback
+        if function in KERNELS:
+            assert KERNELS[function][0] == lookback
+        else:
+            assert lookback >= CANDLES
+
+def test_findPattern_kernel_matches_talib(candle_patterns):
+    pytest.importorskip("talib")
+    rng = np.random.default_rng(7)
+    found = set()
+    for trial in range(3000):
+        # Newest candle first, as findPattern gets the data
+        data = randomCandles(rng, int(rng.integers(1, 7)))
+        if trial % 5 == 0:
+            data.iloc[int(rng.integers(0, len(data))), int(rng.integers(0, 4))] = np.nan
+        dict, saveDict, kernelDict, kernelSaveDict = {}, {}, {}, {}
+        try:
+            expected = candle_patterns.findPattern(data, dict, saveDict)
+        except Exception:
+            # TA-Lib gives up when all the values of a column are missing
+            continue
+        assert candle_patterns.findPattern(data, kernelDict, kernelSaveDict, useKernel=True) == expected
+        assert (kernelDict, kernelSaveDict) == (dict, saveDict)
+        found.add(saveDict["Pattern"])
+    assert {"Bullish Engulfing", "Bearish Engulfing", "3 Outside Up", "3 Outside Down"} <= found
+
+def test_findPatterns_all_the_stocks_together(candle_patterns):
+    rng = np.random.default_rng(11)
+    stocks = [randomCandles(rng, int(rng.integers(1, 8))) for _ in range(200)]
+    days = max(len(data) for data in stocks)
+    # Oldest candle first, padded with NaN on the older side
+    stacked = {
+        column: np.array(
+            [[np.nan] * (days - len(data)) + data[column][::-1].tolist() for data in stocks]
+        )
+        for column in ["Open", "High", "Low", "Close"]
+    }
+    patterns, signs = CandlePatterns.findPatterns(
+        stacked["Open"], stacked["High"], stacked["Low"], stacked["Close"]
+    )
+    for data, pattern, sign in zip(stocks, patterns, signs):
+        dict, saveDict, stackedDict, stackedSaveDict = {}, {}, {}, {}
+        candle_patterns.findPattern(data, dict, saveDict, useKernel=True)
+        CandlePatterns.describePattern(pattern, sign, stackedDict, stackedSaveDict)
+        assert (stackedDict, stackedSaveDict) == (dict, saveDict)
@@ -0,0 +1,122 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import queue
+import threading
+import warnings
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+import pytest
+
+from pkscreener.classes.FetchPipeline import FetchPipeline
+from pkscreener.classes.PKTaskBatch import STOCK_INDEX
+from pkscreener.classes.StockDataStore import SharedStockDict
+
+
+def sample_frame(start):
+    values = np.arange(5, dtype=float) + start
+    return pd.DataFrame(
+        {"Open": values, "High": values, "Low": values, "Close": values, "Volume": values},
+        index=pd.date_range("2023-01-02", periods=5, freq="D"),
+    )
+
+@pytest.fixture
+def stockDict():
+    stockDict = SharedStockDict()
+    yield stockDict
+    stockDict.removeOwnedStores()
+
+def drain(tasks_queue):
+    batches = []
+    while not tasks_queue.empty():
+        batches.append(tasks_queue.get())
+    return batches
+
+def test_each_chunk_is_handed_over_with_its_store(stockDict):
+    symbols = [f"STOCK{index}" for index in range(7)]
+    fetchedChunks = []
+    def fetchChunk(stocks, threads):
+        fetchedChunks.append((list(stocks), threads))
+        if "STOCK3" in stocks:
+            raise Exception("Network error")
+        return {stock: sample_frame(index) for index, stock in enumerate(stocks)}
+    tasks_queue = queue.Queue()
+    pipeline = FetchPipeline(fetchChunk, stockDict, fetchThreads=8).start(
+        symbols, 3, [tuple(range(21))], tasks_queue, 2
+    )
+    pipeline.join()
+    assert fetchedChunks == [
+        (["STOCK0", "STOCK1", "STOCK2"], 8),
+        (["STOCK3", "STOCK4", "STOCK5"], 8),
+        (["STOCK6"], 8),
+    ]
+    batches = drain(tasks_queue)
+    stocks = [task[STOCK_INDEX] for batch in batches for task in batch.tasks()]
+    assert stocks == symbols
+    assert pipeline.fetchedCount == 4
+    assert pipeline.fedCount == 7
+    # The stocks that could not be downloaded are left to the workers
+    storePaths = {
+        task[STOCK_INDEX]: batch.storePath for batch in batches for task in batch.tasks()
+    }
+    assert all(storePaths[stock] is None for stock in ["STOCK3", "STOCK4", "STOCK5"])
+    assert storePaths["STOCK0"] in stockDict.storePaths
+    assert storePaths["STOCK6"] in stockDict.storePaths
+    assert sorted(stockDict.keys()) == ["STOCK0", "STOCK1", "STOCK2", "STOCK6"]
+    assert stockDict.get("STOCK1")["data"][0][3] == 1.0
+
+def test_fetch_waits_for_the_feed_stage(stockDict):
+    feeding = threading.Event()
+    fetched = []
+    def fetchChunk(stocks, threads):
+        fetched.append(stocks[0])
+        return {}
+    class BlockingQueue(queue.Queue):
+        def put(self, item, *args, **kwargs):
+            feeding.wait()
+            super().put(item, *args, **kwargs)
+    tasks_queue = BlockingQueue()
+    pipeline = FetchPipeline(fetchChunk, stockDict, maximumPendingChunks=1).start(
+        [f"STOCK{index}" for index in range(5)], 1, [tuple(range(21))], tasks_queue, 1
+    )
+    # One chunk is stuck in the feed stage and one waits in the queue, so
+    # the fetch stage is held back on the third one.
+    pipeline.join(timeout=0.5)
+    assert len(fetched) == 3
+    feeding.set()
+    pipeline.join()
+    assert len(fetched) == 5
+    assert len(drain(tasks_queue)) == 5
+
+def test_stop_hands_over_no_more_chunks(stockDict):
+    tasks_queue = queue.Queue()
+    pipeline = FetchPipeline(lambda stocks, threads: {}, stockDict)
+    pipeline.stop()
+    pipeline.start(["SBIN", "TCS"], 1, [tuple(range(21))], tasks_queue, 1).join()
+    assert tasks_queue.empty()
+    assert pipeline.fedCount == 0
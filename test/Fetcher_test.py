@@ -164,6 +164,69 @@ def test_fetchStockData_negative(configManager, tools_instance):
             timeout=configManager.longTimeout
         )
 
+def chunked_download_frame(tickers):
+    columns = pd.MultiIndex.from_product([tickers, ['Open', 'High', 'Low', 'Close', 'Volume']])
+    return pd.DataFrame([[1.0] * len(columns), [2.0] * len(columns)], columns=columns)
+
+def test_fetchStockDataInChunks_positive(configManager, tools_instance):
+    with patch('yfinance.download') as mock_download:
+        mock_download.side_effect = lambda **kwargs: chunked_download_frame(kwargs['tickers'])
+        result = tools_instance.fetchStockDataInChunks(['SBIN', 'TCS', 'INFY'], '280d', '1d', None, chunkSize=2)
+        assert mock_download.call_count == 2
+        mock_download.assert_any_call(
+            tickers=['SBIN.NS', 'TCS.NS'],
+            period='280d',
+            interval='1d',
+            proxy=None,
+            progress=False,
+            group_by='ticker',
+            threads=True,
+            show_errors=False,
+            timeout=configManager.longTimeout
+        )
+        assert sorted(result.keys()) == ['INFY', 'SBIN', 'TCS']
+        assert result['SBIN'].columns.tolist() == ['Open', 'High', 'Low', 'Close', 'Volume']
+        assert len(result['TCS']) == 2
+
+def test_fetchStockDataInChunks_missing_stock(configManager, tools_instance):
+    with patch('yfinance.download') as mock_download:
+        data = chunked_download_frame(['SBIN.NS', 'TCS.NS'])
+        data['TCS.NS'] = float('nan')
+        mock_download.return_value = data
+        result = tools_instance.fetchStockDataInChunks(['SBIN', 'TCS', 'INFY'], '280d', '1d', None, chunkSize=100)
+        assert mock_download.call_count == 1
+        assert list(result.keys()) == ['SBIN']
+
+def test_fetchStockDataInChunks_single_stock(configManager, tools_instance):
+    with patch('yfinance.download') as mock_download:
+        mock_download.return_value = pd.DataFrame({'Close': [100, 200, 300]})
+        result = tools_instance.fetchStockDataInChunks(['SBIN'], '280d', '1d', None)
+        assert result['SBIN'].equals(pd.DataFrame({'Close': [100, 200, 300]}))
+
+def test_fetchStockDataInChunks_negative(configManager, tools_instance):
+    with patch('yfinance.download') as mock_download:
+        mock_download.side_effect = Exception("Network error")
+        result = tools_instance.fetchStockDataInChunks(['SBIN', 'TCS'], '280d', '1d', None)
+        assert result == {}
+        assert tools_instance.fetchStockDataInChunks([], '280d', '1d', None) == {}
+
+def test_fetchStockDataInChunks_since_start(configManager, tools_instance):
+    with patch('yfinance.download') as mock_download:
+        mock_download.side_effect = lambda **kwargs: chunked_download_frame(kwargs['tickers'])
+        result = tools_instance.fetchStockDataInChunks(['SBIN', 'TCS'], '280d', '1d', None, start='2023-06-01')
+        mock_download.assert_called_once_with(
+            tickers=['SBIN.NS', 'TCS.NS'],
+            start='2023-06-01',
+            interval='1d',
+            proxy=None,
+            progress=False,
+            group_by='ticker',
+            threads=True,
+            show_errors=False,
+            timeout=configManager.longTimeout
+        )
+        assert sorted(result.keys()) == ['SBIN', 'TCS']
+
 def test_fetchLatestNiftyDaily_positive(configManager, tools_instance):
     with patch('yfinance.download') as mock_download:
         mock_download.return_value = pd.DataFrame({'Close': [100, 200, 300]})
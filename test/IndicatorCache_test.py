@@ -0,0 +1,155 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import warnings
+from unittest.mock import patch
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+import pytest
+
+import pkscreener.classes.ConfigManager as ConfigManager
+from pkscreener.classes.IndicatorCache import IndicatorCache, requiredIndicators
+from pkscreener.classes.log import default_logger as dl
+from pkscreener.classes.Pktalib import pktalib
+from pkscreener.classes.Screener import tools
+
+
+def stock_data(rows=300):
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    return pd.DataFrame(
+        {
+            "Open": close * 0.99,
+            "High": close * 1.01,
+            "Low": close * 0.98,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": rng.integers(60000, 200000, rows).astype(float),
+        },
+        index=pd.date_range("2022-01-03", periods=rows),
+    )
+
+@pytest.fixture
+def configManager():
+    return ConfigManager.tools()
+
+@pytest.fixture
+def screener(configManager):
+    return tools(configManager, dl())
+
+def test_get_computes_each_indicator_once():
+    indicators = IndicatorCache(stock_data())
+    with patch.object(pktalib, "RSI", wraps=pktalib.RSI) as mock_rsi:
+        first = indicators.get("RSI", 14)
+        second = indicators.get("RSI", 14)
+        indicators.get("RSI", 12)
+    assert first is second
+    assert mock_rsi.call_count == 2
+    assert indicators.keys() == [("RSI", (14,)), ("RSI", (12,))]
+
+def test_get_keeps_unfilled_data_apart_when_values_are_missing():
+    data = stock_data()
+    data.iloc[100, data.columns.get_loc("Close")] = np.nan
+    indicators = IndicatorCache(data)
+    assert indicators.hasMissingValues
+    unfilled = indicators.get("SMA", 10, filled=False)
+    filled = indicators.get("SMA", 10)
+    assert np.isnan(unfilled.iloc[105])
+    assert not np.isnan(filled.iloc[105])
+    assert len(indicators.indicators) == 2
+
+def test_get_shares_indicators_when_no_values_are_missing():
+    indicators = IndicatorCache(stock_data())
+    assert not indicators.hasMissingValues
+    assert indicators.get("EMA", 50, filled=False) is indicators.get("EMA", 50)
+
+def test_validateBullishForTomorrow_computes_macd_once(screener):
+    data = stock_data()
+    indicators = IndicatorCache(data)
+    fullData, _ = screener.preprocessData(data, indicators=indicators)
+    with patch.object(pktalib, "MACD", wraps=pktalib.MACD) as mock_macd:
+        result = screener.validateBullishForTomorrow(fullData, indicators=indicators)
+        assert screener.validateMACDHistogramBelow0(fullData, indicators=indicators) in [True, False]
+    assert mock_macd.call_count == 1
+    assert result == screener.validateBullishForTomorrow(fullData)
+
+@pytest.mark.parametrize(
+    "executeOption, check",
+    [
+        (12, "validate15MinutePriceVolumeBreakout"),
+        (13, "findBullishIntradayRSIMACD"),
+        (14, "findNR4Day"),
+        (18, "findAroonBullishCrossover"),
+        (19, "validateMACDHistogramBelow0"),
+        (20, "validateBullishForTomorrow"),
+    ],
+)
+def test_requiredIndicators_lists_what_checks_compute(screener, configManager, executeOption, check):
+    data = stock_data()
+    indicators = IndicatorCache(data)
+    fullData, _ = screener.preprocessData(data, indicators=indicators)
+    expected = getattr(screener, check)(fullData)
+    assert getattr(screener, check)(fullData, indicators=indicators) == expected
+    assert sorted(indicators.keys()) == sorted(requiredIndicators(executeOption, useEMA=configManager.useEMA))
+
+def test_requiredIndicators_lists_what_findReversalMA_computes(screener, configManager):
+    data = stock_data()
+    indicators = IndicatorCache(data)
+    fullData, _ = screener.preprocessData(data, indicators=indicators)
+    screener.findReversalMA(fullData, {}, {}, 50, indicators=indicators)
+    assert sorted(indicators.keys()) == sorted(requiredIndicators(6, reversalOption=4, useEMA=configManager.useEMA))
+
+def test_preprocessData_with_and_without_cache(screener):
+    fullData, processedData = screener.preprocessData(stock_data(), indicators=IndicatorCache(stock_data()))
+    expectedFullData, expectedProcessedData = screener.preprocessData(stock_data())
+    pd.testing.assert_frame_equal(fullData, expectedFullData)
+    pd.testing.assert_frame_equal(processedData, expectedProcessedData)
+
+@pytest.mark.parametrize("withMissingValues", [False, True])
+def test_head_matches_indicators_of_fewer_rows(withMissingValues):
+    data = stock_data()
+    if withMissingValues:
+        data.iloc[100, data.columns.get_loc("Close")] = np.nan
+        data.iloc[250, data.columns.get_loc("Volume")] = np.nan
+    parent = IndicatorCache(data)
+    for rows in [50, 150, 260]:
+        indicators = parent.head(rows)
+        expected = IndicatorCache(data.head(rows))
+        for indicator, params in requiredIndicators(13) + [("AROON", (14,)), ("MACD", (12, 26, 9))]:
+            for filled in [True, False]:
+                actual = indicators.get(indicator, *params, filled=filled)
+                value = expected.get(indicator, *params, filled=filled)
+                for a, e in zip(actual if isinstance(actual, tuple) else [actual], value if isinstance(value, tuple) else [value]):
+                    np.testing.assert_array_equal(np.asarray(a), np.asarray(e))
+
+def test_head_computes_indicators_once_for_all_rows():
+    parent = IndicatorCache(stock_data())
+    with patch.object(pktalib, "RSI", wraps=pktalib.RSI) as mock_rsi:
+        for rows in range(100, 300, 10):
+            parent.head(rows).get("RSI", 14)
+    assert mock_rsi.call_count == 1
@@ -0,0 +1,154 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import pkscreener.classes.IndicatorKernels as IndicatorKernels
+import pkscreener.classes.Pktalib as Pktalib
+from pkscreener.classes.Pktalib import pktalib
+
+
+def kernels(high, low, close):
+    return {
+        "SMA": IndicatorKernels.sma(close, 5),
+        "EMA": IndicatorKernels.ema(close, 10),
+        "RSI": IndicatorKernels.rsi(close, 14),
+        "CCI": IndicatorKernels.cci(high, low, close, 14),
+        "MACD": IndicatorKernels.macd(close, 12, 26, 9),
+        "AROON": IndicatorKernels.aroon(high, low, 14),
+        "STOCHRSI": IndicatorKernels.stochrsi(close, 14, 5, 3, 0),
+    }
+
+
+def test_kernels_match_talib(randomPrices):
+    talib = pytest.importorskip("talib")
+    highs, lows, closes = randomPrices(20, 80, seed=7)
+    for high, low, close in zip(highs, lows, closes):
+        expected = {
+            "SMA": talib.SMA(close, 5),
+            "EMA": talib.EMA(close, 10),
+            "RSI": talib.RSI(close, 14),
+            "CCI": talib.CCI(high, low, close, 14),
+            "MACD": talib.MACD(close, 12, 26, 9),
+            "AROON": talib.AROON(high, low, 14),
+            "STOCHRSI": talib.STOCHRSI(close, 14, 5, 3, 0),
+        }
+        for indicator, values in kernels(high, low, close).items():
+            assert np.allclose(
+                np.array(values), np.array(expected[indicator]), equal_nan=True
+            ), indicator
+
+
+def test_kernels_match_talib_after_missing_days(randomPrices):
+    talib = pytest.importorskip("talib")
+    _, _, close = randomPrices(1, 60, seed=7)
+    close = close[0]
+    close[:7] = np.nan
+    assert np.allclose(
+        IndicatorKernels.ema(close, 10), talib.EMA(close, 10), equal_nan=True
+    )
+    assert np.allclose(
+        IndicatorKernels.rsi(close, 14), talib.RSI(close, 14), equal_nan=True
+    )
+
+
+def test_kernels_compute_each_row_of_2d_arrays_on_its_own(randomPrices):
+    high, low, close = randomPrices(5, 60, seed=7)
+    # Pad the start of a row with missing days, as ScreeningEngine does
+    high[2, :10] = low[2, :10] = close[2, :10] = np.nan
+    stacked = kernels(high, low, close)
+    for row in range(5):
+        single = kernels(high[row], low[row], close[row])
+        for indicator, values in stacked.items():
+            if isinstance(values, tuple):
+                for rowValues, singleValues in zip(values, single[indicator]):
+                    assert np.array_equal(
+                        rowValues[row], singleValues, equal_nan=True
+                    ), indicator
+            else:
+                assert values.shape == close.shape
+                assert np.array_equal(
+                    values[row], single[indicator], equal_nan=True
+                ), indicator
+
+
+def test_kernels_return_nan_until_there_is_enough_data(randomPrices):
+    _, _, close = randomPrices(1, 20, seed=7)
+    rsi = IndicatorKernels.rsi(close[0], 14)
+    assert np.isnan(rsi[:14]).all()
+    assert not np.isnan(rsi[14:]).any()
+    assert np.isnan(IndicatorKernels.sma(close[0][:3], 5)).all()
+
+
+def test_stochrsi_only_supports_sma(randomPrices):
+    _, _, close = randomPrices(1, 60, seed=7)
+    with pytest.raises(ValueError):
+        IndicatorKernels.stochrsi(close[0], 14, 5, 3, 1)
+
+
+def test_selectImplementations_picks_first_available_backend():
+    registry = {
+        "RSI": [("talib", "talibRSI"), ("numpy", "numpyRSI")],
+        "CDLDOJI": [("talib", "talibDOJI")],
+    }
+    assert Pktalib.selectImplementations(
+        registry, {"talib": True, "numpy": True}
+    ) == {"RSI": ("talib", "talibRSI"), "CDLDOJI": ("talib", "talibDOJI")}
+    assert Pktalib.selectImplementations(
+        registry, {"talib": False, "numpy": True}
+    ) == {"RSI": ("numpy", "numpyRSI")}
+
+
+def test_pktalib_without_talib_returns_series_like_talib(monkeypatch, randomPrices):
+    monkeypatch.setattr(
+        Pktalib,
+        "IMPLEMENTATIONS",
+        Pktalib.selectImplementations(
+            Pktalib.REGISTRY, {"talib": False, "numpy": True}
+        ),
+    )
+    high, low, close = randomPrices(1, 60, seed=7)
+    index = pd.date_range("2023-01-01", periods=60)
+    high, low, close = [pd.Series(values[0], index=index) for values in [high, low, close]]
+    rsi = pktalib.RSI(close, 14)
+    assert isinstance(rsi, pd.Series)
+    assert rsi.index.equals(index)
+    macd = pktalib.MACD(close, 12, 26, 9)
+    assert len(macd) == 3 and all(values.index.equals(index) for values in macd)
+    aroon = pktalib.Aroon(high, low, 14)
+    assert list(aroon.columns) == ["AROOND_14", "AROONU_14"]
+    fastK, fastD = pktalib.STOCHRSI(close, 14, 5, 3, 0)
+    assert isinstance(fastK, np.ndarray)
+    assert pktalib.CDLDOJI(close, high, low, close) is None
+
+
+def test_pktalib_computes_2d_arrays_with_numpy(randomPrices):
+    high, low, close = randomPrices(4, 60, seed=7)
+    assert np.array_equal(
+        pktalib.EMA(close, 10), IndicatorKernels.ema(close, 10), equal_nan=True
+    )
+    aroonDown, aroonUp = pktalib.Aroon(high, low, 14)
+    assert aroonDown.shape == close.shape
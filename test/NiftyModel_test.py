@@ -0,0 +1,113 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pkscreener.classes.NiftyModel as NiftyModel
+from pkscreener.classes.NiftyModel import NiftyScaler
+
+
+@pytest.fixture
+def model():
+    return NiftyModel.NiftyModel(
+        [[[1.0, -1.0], [2.0, 0.5]], [[1.0], [-1.0]]],
+        [[0.0, 0.5], [0.25]],
+        ["relu", "sigmoid"],
+        ["Open", "Close"],
+        NiftyScaler([1.0, 2.0], [2.0, 4.0]),
+    )
+
+@pytest.fixture
+def stockData():
+    rng = np.random.default_rng(7)
+    close = 18000 * np.exp(np.cumsum(rng.normal(0, 0.01, 60)))
+    return pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.005, 60)),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1000, 5000, 60),
+        },
+        index=pd.date_range("2023-01-02", periods=60),
+    )
+
+def test_predict(model):
+    rows = np.array([[1.0, 2.0], [-3.0, 1.0]])
+    hidden = np.maximum(rows @ np.array([[1.0, -1.0], [2.0, 0.5]]) + [0.0, 0.5], 0)
+    expected = 1 / (1 + np.exp(-(hidden @ np.array([[1.0], [-1.0]]) + 0.25)))
+    assert np.allclose(model.predict(rows), expected)
+    assert model.predict(rows[0]).shape == (1, 1)
+
+def test_save_and_load(model, tmp_path):
+    filePath = tmp_path / "model.npz"
+    model.save(filePath)
+    loaded = NiftyModel.NiftyModel.load(filePath)
+    assert loaded.columns == ["Open", "Close"]
+    assert loaded.activations == ["relu", "sigmoid"]
+    rows = np.array([[1.0, 2.0], [-3.0, 1.0]])
+    assert np.allclose(loaded.predict(rows), model.predict(rows))
+
+def test_loadModel_is_cached(model, tmp_path):
+    filePath = str(tmp_path / "model.npz")
+    model.save(filePath)
+    assert NiftyModel.loadModel([filePath]) is NiftyModel.loadModel([filePath])
+    assert NiftyModel.loadModel([str(tmp_path / "missing.npz")]) is None
+
+def test_predictHistory_is_the_prediction_of_each_day(stockData):
+    model = NiftyModel.loadModel()
+    predictions = model.predictHistory(stockData)
+    assert np.isnan(predictions.iloc[0])
+    for day in [1, 30, 59]:
+        data = stockData.iloc[: day + 1][model.columns].copy()
+        for column in ["High", "Low", "Open", "Close"]:
+            data[column] = data[column].pct_change() * 100
+        expected = model.predict(model.scaler.transform([data.iloc[-1]]))[0][0]
+        assert predictions.iloc[day] == pytest.approx(expected)
+
+def test_fromKeras(model, tmp_path):
+    h5py = pytest.importorskip("h5py")
+    joblib = pytest.importorskip("joblib")
+    preprocessing = pytest.importorskip("sklearn.preprocessing")
+    scaler = preprocessing.StandardScaler().fit([[-1.0, -2.0], [3.0, 6.0]])
+    joblib.dump({"scaler": scaler, "columns": ["Open", "Close"]}, tmp_path / "model.pkl")
+    layers = [{"class_name": "InputLayer", "config": {"name": "input"}}]
+    with h5py.File(tmp_path / "model.h5", "w") as f:
+        weights = f.create_group("model_weights")
+        for layer, (kernel, bias, activation) in enumerate(zip(model.kernels, model.biases, model.activations)):
+            name = f"dense_{layer}"
+            layers.append({"class_name": "Dense", "config": {"name": name, "activation": activation}})
+            group = weights.create_group(name)
+            group.attrs["weight_names"] = [f"{name}/kernel:0", f"{name}/bias:0"]
+            group.create_dataset(f"{name}/kernel:0", data=kernel)
+            group.create_dataset(f"{name}/bias:0", data=bias)
+        f.attrs["model_config"] = json.dumps({"class_name": "Sequential", "config": {"layers": layers}})
+    converted = NiftyModel.NiftyModel.fromKeras(tmp_path / "model.h5", tmp_path / "model.pkl")
+    rows = np.array([[1.0, 2.0], [-3.0, 1.0]])
+    assert np.allclose(converted.predict(rows), model.predict(rows))
+    assert np.allclose(converted.scaler.transform(rows), scaler.transform(rows))
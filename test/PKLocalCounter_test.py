@@ -0,0 +1,67 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import multiprocessing
+from unittest.mock import patch
+
+from pkscreener.classes.PKLocalCounter import PKLocalCounter
+
+
+def test_counts_locally_till_published():
+    sharedCounter = multiprocessing.Value("i", 5)
+    counter = PKLocalCounter(sharedCounter)
+    with patch.object(sharedCounter, "get_lock") as mock_lock:
+        for _ in range(3):
+            counter.value += 1
+        assert counter.value == 8
+        assert sharedCounter.value == 5
+        mock_lock.assert_not_called()
+    counter.publish()
+    assert sharedCounter.value == 8
+    assert counter.value == 8
+
+def test_publish_adds_to_the_counts_of_other_workers():
+    sharedCounter = multiprocessing.Value("i", 0)
+    counters = [PKLocalCounter(sharedCounter) for _ in range(3)]
+    for index, counter in enumerate(counters):
+        for _ in range(index + 1):
+            counter.value += 1
+    for counter in counters:
+        counter.publish()
+    assert sharedCounter.value == 6
+    assert counters[-1].value == 6
+
+def test_publish_picks_up_a_reset():
+    sharedCounter = multiprocessing.Value("i", 10)
+    counter = PKLocalCounter(sharedCounter)
+    sharedCounter.value = 0
+    counter.publish()
+    assert counter.value == 0
+
+def test_without_shared_counter():
+    counter = PKLocalCounter()
+    counter.value += 2
+    assert counter.value == 2
+    counter.publish()
+    assert counter.value == 2
@@ -22,13 +22,16 @@
     SOFTWARE.
 """
 
+import multiprocessing
 from multiprocessing import Event
 from queue import Queue
 from unittest.mock import Mock, patch
 
 import pytest
 
+import pkscreener.classes.StageTimings as StageTimings
 from pkscreener.classes.PKMultiProcessorClient import PKMultiProcessorClient
+from pkscreener.classes.PKTaskBatch import STOCK_INDEX, PKTaskBatch
 
 
 @pytest.fixture(autouse=True)
@@ -130,3 +133,53 @@ def test_run_keyboard_interrupt(client, task_queue, result_queue, default_logger
     assert not client.task_queue.empty()
     assert client.result_queue.empty()
     assert not default_logger.debug.called
+
+def test_run_batch(client, task_queue, result_queue):
+    client.processorMethod.side_effect = lambda *args: args[STOCK_INDEX]
+    client.task_queue.put(PKTaskBatch(tuple(range(21)), ["SBIN", "TCS", "INFY"]))
+    client.run()
+    assert client.result_queue.get() == ["SBIN", "TCS", "INFY"]
+    assert client.processorMethod.call_args[0][-1] == client
+
+def test_run_publishes_counters(task_queue, result_queue, object_dictionary, proxy_server, keyboard_interrupt_event, default_logger):
+    processingCounter = multiprocessing.Value("i", 1)
+    processingResultsCounter = multiprocessing.Value("i", 0)
+    def count(*args):
+        hostRef = args[-1]
+        hostRef.processingCounter.value += 1
+        hostRef.processingResultsCounter.value += 1
+        return args[STOCK_INDEX]
+    client = PKMultiProcessorClient(
+        count,
+        task_queue,
+        result_queue,
+        processingCounter,
+        processingResultsCounter,
+        object_dictionary,
+        proxy_server,
+        keyboard_interrupt_event,
+        default_logger
+    )
+    client.task_queue.put(PKTaskBatch(tuple(range(21)), ["SBIN", "TCS"]))
+    client.run()
+    assert processingCounter.value == 3
+    assert processingResultsCounter.value == 2
+
+def test_run_timed_batch(client, task_queue, result_queue):
+    client.processorMethod.side_effect = lambda *args: args[STOCK_INDEX]
+    client.task_queue.put(PKTaskBatch(tuple(range(21)), ["SBIN", "TCS"], timed=True))
+    try:
+        client.run()
+    finally:
+        StageTimings.enable(False)
+    answer = client.result_queue.get()
+    assert answer == ["SBIN", "TCS"]
+    assert answer.timings.counts == {"resultTransfer": 1}
+
+def test_run_batch_attaches_its_store(client, task_queue, result_queue):
+    client.objectDictionary = Mock()
+    client.processorMethod.side_effect = lambda *args: args[STOCK_INDEX]
+    client.task_queue.put(PKTaskBatch(tuple(range(21)), ["SBIN"], storePath="store.npy"))
+    client.run()
+    assert client.result_queue.get() == ["SBIN"]
+    client.objectDictionary.ensureAttached.assert_called_once_with("store.npy")
@@ -0,0 +1,71 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import pytest
+
+from pkscreener.classes.PKTaskBatch import (MAXIMUM_BATCH_SIZE, STOCK_INDEX,
+                                            PKTaskBatch, batchSize,
+                                            taskBatches)
+
+
+@pytest.fixture
+def parameters():
+    return tuple(range(21))
+
+def test_tasks_fill_in_the_stock(parameters):
+    batch = PKTaskBatch(parameters, ["SBIN", "TCS"])
+    tasks = list(batch.tasks())
+    assert len(batch) == 2
+    assert [task[STOCK_INDEX] for task in tasks] == ["SBIN", "TCS"]
+    for task in tasks:
+        assert len(task) == len(parameters)
+        assert task[:STOCK_INDEX] == parameters[:STOCK_INDEX]
+        assert task[STOCK_INDEX + 1 :] == parameters[STOCK_INDEX + 1 :]
+
+def test_batchSize():
+    assert batchSize(0, 4) == 1
+    assert batchSize(10, 4) == 1
+    assert batchSize(160, 4) == 10
+    assert batchSize(2000, 7) == 50
+    assert batchSize(100000, 1) == MAXIMUM_BATCH_SIZE
+    assert batchSize(100, 0) == 25
+
+def test_taskBatches_cover_all_the_stocks_of_each_day(parameters):
+    symbols = [f"STOCK{index}" for index in range(103)]
+    days = [parameters, parameters[:16] + (5,) + parameters[17:]]
+    batches = taskBatches(days, symbols, 2)
+    assert max(len(batch) for batch in batches) == batchSize(206, 2)
+    for day in days:
+        stocks = [
+            task[STOCK_INDEX]
+            for batch in batches
+            if batch.parameters == day
+            for task in batch.tasks()
+        ]
+        assert stocks == symbols
+
+def test_taskBatches_point_to_the_store(parameters):
+    batches = taskBatches([parameters], ["SBIN", "TCS"], 1, storePath="store.npy")
+    assert all(batch.storePath == "store.npy" for batch in batches)
+    assert PKTaskBatch(parameters, ["SBIN"]).storePath is None
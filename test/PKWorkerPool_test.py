@@ -0,0 +1,117 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import functools
+import logging
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+import pkscreener.classes.ConfigManager as ConfigManager
+from pkscreener.classes.log import default_logger as dl
+from pkscreener.classes.ParallelProcessing import StockConsumer
+from pkscreener.classes.PKWorkerPool import PKWorkerPool
+from pkscreener.classes.SuppressOutput import SuppressOutput
+
+
+def double(value, hostRef=None):
+    return (value * 2, os.getpid(), len(hostRef.objectDictionary))
+
+def square(value, hostRef=None):
+    return (value * value, os.getpid(), len(hostRef.objectDictionary))
+
+def configured(value, hostRef=None):
+    return (hostRef.configManager.period, hostRef.screener.configManager.period)
+
+def quietness(consumer, job, hostRef=None):
+    logLevel, quiet = job
+    consumer.setupLoggers(hostRef, hostRef.screener, logLevel, "SBIN", quiet=quiet)
+    return (SuppressOutput.quiet, sys.stdout is SuppressOutput.devnull(), os.getpid())
+
+@pytest.fixture
+def pool():
+    pool = PKWorkerPool(
+        multiprocessing.JoinableQueue(),
+        multiprocessing.Queue(),
+        2,
+        multiprocessing.Value("i", 1),
+        multiprocessing.Value("i", 0),
+        None,
+        multiprocessing.Event(),
+        dl(),
+    )
+    yield pool
+    pool.terminate()
+
+def runJob(pool, processorMethod, objectDictionary, values, configManager=None):
+    for consumer in pool.submitJob(processorMethod, objectDictionary, configManager):
+        consumer.daemon = True
+        consumer.start()
+    for value in values:
+        pool.tasks_queue.put((value,))
+    return [pool.results_queue.get(timeout=30) for _ in values]
+
+def test_workers_take_up_the_next_job(pool):
+    results = runJob(pool, double, {"SBIN": 1}, range(10))
+    assert sorted(result[0] for result in results) == [value * 2 for value in range(10)]
+    assert all(result[2] == 1 for result in results)
+    pids = {consumer.pid for consumer in pool.consumers}
+    assert pool.isAlive()
+    results = runJob(pool, square, {"SBIN": 1, "TCS": 2}, range(10))
+    assert sorted(result[0] for result in results) == [value * value for value in range(10)]
+    assert all(result[2] == 2 for result in results)
+    # The same processes did the second job
+    assert {result[1] for result in results}.issubset(pids)
+    assert {consumer.pid for consumer in pool.consumers} == pids
+
+def test_workers_take_up_the_config_of_the_next_job(pool):
+    configManager = ConfigManager.tools()
+    configManager.period = "100d"
+    results = runJob(pool, configured, {}, range(4), configManager)
+    assert set(results) == {("100d", "100d")}
+    configManager.period = "450d"
+    results = runJob(pool, configured, {}, range(4), configManager)
+    assert set(results) == {("450d", "450d")}
+
+def test_quiet_mode_lasts_only_for_the_job(pool):
+    results = runJob(pool, functools.partial(quietness, StockConsumer()), {}, [(logging.INFO, True)] * 4)
+    assert {result[:2] for result in results} == {(True, True)}
+    pids = {consumer.pid for consumer in pool.consumers}
+    results = runJob(pool, functools.partial(quietness, StockConsumer()), {}, [(logging.DEBUG, True)] * 4)
+    assert {result[:2] for result in results} == {(False, False)}
+    results = runJob(pool, functools.partial(quietness, StockConsumer()), {}, [(logging.INFO, False)] * 4)
+    assert {result[:2] for result in results} == {(False, False)}
+    # The same processes did all three jobs
+    assert {result[2] for result in results}.issubset(pids)
+
+def test_terminate(pool):
+    runJob(pool, double, {}, [1])
+    consumers = pool.consumers
+    pool.terminate()
+    for consumer in consumers:
+        consumer.join(timeout=10)
+        assert not consumer.is_alive()
+    assert not pool.isAlive()
@@ -0,0 +1,118 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import warnings
+from unittest.mock import patch
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+import pytest
+
+from pkscreener.classes.Backtest import backtestRecord
+from pkscreener.classes.ParallelProcessing import StockConsumer
+from pkscreener.classes.Pktalib import pktalib
+
+
+@pytest.fixture
+def objectDictionary(randomStockData):
+    rng = np.random.default_rng(5)
+    return {
+        f"STOCK{i}": randomStockData(rng, int(rng.integers(20, 300))).to_dict("split")
+        for i in range(4)
+    }
+
+def task(executeOption, stock, backtestDuration):
+    return (
+        executeOption, None, None, 10, 30, 60, 1, 7, 4, True, stock, False, False,
+        1.5, False, False, backtestDuration, 30,
+    )
+
+@pytest.mark.parametrize("executeOption", [0, 5, 9])
+def test_backtestStocks_matches_screenStocks_for_each_day(hostRef, executeOption):
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    for stock in hostRef.objectDictionary.keys():
+        expected = []
+        for sampleDays in range(25, -1, -1):
+            result = consumer.screenStocks(*task(executeOption, stock, sampleDays), dataPrefetched=True, hostRef=hostRef, backtestWindow=True)
+            if result is not None:
+                expected.append(result)
+        results = consumer.backtestStocks(*task(executeOption, stock, 25), dataPrefetched=True, hostRef=hostRef)
+        assert len(results) == len(expected)
+        for result, expectedResult in zip(results, expected):
+            assert result[0] == expectedResult[0]
+            assert result[1] == expectedResult[1]
+            pd.testing.assert_frame_equal(result[2], expectedResult[2])
+            assert result[3] == expectedResult[3]
+            assert result[4] == expectedResult[4]
+
+def test_backtestStocks_computes_indicators_once(hostRef):
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    with patch.object(pktalib, "RSI", wraps=pktalib.RSI) as mock_rsi:
+        consumer.backtestStocks(*task(0, "STOCK0", 25), dataPrefetched=True, hostRef=hostRef)
+    assert mock_rsi.call_count == 1
+
+def test_backtestStocks_without_cached_data(hostRef):
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    with patch.object(consumer, "screenStocks", return_value=None) as mock_screen:
+        assert consumer.backtestStocks(*task(0, "MISSING", 3), dataPrefetched=True, hostRef=hostRef) == []
+    assert mock_screen.call_count == 4
+    assert [call.kwargs["backtestDuration"] for call in mock_screen.call_args_list] == [3, 2, 1, 0]
+    assert all(call.kwargs["stockData"] is None for call in mock_screen.call_args_list)
+
+def test_screenStocks_sends_back_prices_only_for_backtests(hostRef):
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    for stock in hostRef.objectDictionary.keys():
+        result = consumer.screenStocks(*task(0, stock, 0), dataPrefetched=True, hostRef=hostRef)
+        assert result is not None
+        assert result[2] is None
+        for sampleDays in [0, 5]:
+            result = consumer.screenStocks(*task(0, stock, sampleDays), dataPrefetched=True, hostRef=hostRef, backtestWindow=True)
+            assert list(result[2].columns) == ["Close"]
+            assert len(result[2]) <= 31
+
+def test_backtestWindow_keeps_the_backtest_records(hostRef):
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    stock = "STOCK0"
+    data = pd.DataFrame(**{key: hostRef.objectDictionary[stock][key] for key in ["data", "columns", "index"]})
+    for sampleDays in [0, 10]:
+        result = consumer.screenStocks(*task(0, stock, sampleDays), dataPrefetched=True, hostRef=hostRef, backtestWindow=True)
+        fullWindow = data if sampleDays == 0 else data.tail(sampleDays).head(31)
+        assert backtestRecord(stock, result[2], result[0]) == backtestRecord(stock, fullWindow, result[0])
+
+def test_screenStocks_sets_up_loggers_once(hostRef):
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    with patch("pkscreener.classes.log.filterlogger.addHandlers") as mock_addHandlers:
+        for stock in hostRef.objectDictionary.keys():
+            consumer.screenStocks(*task(0, stock, 0), dataPrefetched=True, hostRef=hostRef)
+    # One for each of the two loggers
+    assert mock_addHandlers.call_count == 2
@@ -0,0 +1,152 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import warnings
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+import pytest
+
+from pkscreener.classes.log import default_logger as dl
+from pkscreener.classes.ParallelProcessing import StockConsumer
+from pkscreener.classes.ScanPlan import PREDICATES, ScanPlan
+from pkscreener.classes.Screener import tools
+
+
+def screen(hostRef, executeOption, reversalOption=None, respChartPattern=1, maLength=None):
+    results = {}
+    consumer = StockConsumer()
+    consumer.isTradingTime = False
+    for stock in hostRef.objectDictionary.keys():
+        results[stock] = consumer.screenStocks(
+            executeOption, reversalOption, maLength, 10, 30, 60, respChartPattern,
+            7, len(hostRef.objectDictionary), True, stock, False, False, 1.5,
+            dataPrefetched=True, hostRef=hostRef,
+        )
+    return results
+
+@pytest.mark.parametrize(
+    "executeOption, reversalOption, respChartPattern, maLength",
+    [
+        (0, None, 1, None), (1, None, 1, None), (2, None, 1, None), (3, None, 1, None),
+        (4, None, 1, None), (5, None, 1, None), (6, 1, 1, None), (6, 3, 1, None),
+        (6, 4, 1, 50), (6, 5, 1, None), (6, 6, 1, 4), (7, None, 1, None),
+        (7, None, 2, None), (7, None, 3, None), (7, None, 4, None), (7, None, 5, None), (8, None, 1, None), (9, None, 1, None),
+        (10, None, 1, None), (14, None, 1, None), (15, None, 1, None), (16, None, 1, None),
+        (17, None, 1, None), (18, None, 1, None), (19, None, 1, None), (20, None, 1, None),
+    ],
+)
+def test_screenStocks_results_unchanged(hostRef, executeOption, reversalOption, respChartPattern, maLength):
+    expected = None
+    with patch("pkscreener.classes.ScanPlan.ScanPlan.passes", return_value={"values": {}}):
+        expected = screen(hostRef, executeOption, reversalOption, respChartPattern, maLength)
+    results = screen(hostRef, executeOption, reversalOption, respChartPattern, maLength)
+    for stock in expected.keys():
+        if expected[stock] is None:
+            assert results[stock] is None, stock
+        else:
+            assert results[stock] is not None, stock
+            assert results[stock][0] == expected[stock][0]
+            assert results[stock][1] == expected[stock][1]
+
+def test_alternatives_sorted_by_cost(configManager):
+    scanPlan = ScanPlan(configManager, 1)
+    assert scanPlan.alternatives == [["ltp", "consolidation"], ["ltp", "volume", "breakout"]]
+    for alternative in scanPlan.alternatives:
+        assert alternative == sorted(alternative, key=PREDICATES.index)
+
+def test_alternatives_ipoBase(configManager):
+    assert ScanPlan(configManager, 7, respChartPattern=4).alternatives == [["ltp", "VCP"]]
+    assert ScanPlan(configManager, 7, respChartPattern=4, newlyListedOnly=True).alternatives == [["ltp", "VCP"], ["ltp", "ipoBase"]]
+    assert ScanPlan(configManager, 7, respChartPattern=1, newlyListedOnly=True).alternatives == [["ltp", "insideBar"]]
+
+def test_alternatives_unknown_reversalOption(configManager):
+    assert ScanPlan(configManager, 6, reversalOption=9).alternatives == []
+    assert ScanPlan(configManager, 0).alternatives == [[]]
+
+def test_passes_short_circuits(configManager):
+    screener = tools(configManager, dl())
+    scanPlan = ScanPlan(configManager, 2)
+    with patch.object(screener, "validateLTP", return_value=(False, False)), \
+        patch.object(screener, "validateVolume") as mock_volume, \
+        patch.object(screener, "findBreakout") as mock_breakout:
+        assert not scanPlan.passes("SBIN", screener, pd.DataFrame(), pd.DataFrame())
+        mock_volume.assert_not_called()
+        mock_breakout.assert_not_called()
+
+def test_passes_checks_shared_predicates_once(configManager):
+    screener = tools(configManager, dl())
+    scanPlan = ScanPlan(configManager, 1)
+    with patch.object(screener, "validateLTP", return_value=(True, False)) as mock_ltp, \
+        patch.object(screener, "validateConsolidation", return_value=0), \
+        patch.object(screener, "validateVolume", return_value=True), \
+        patch.object(screener, "findBreakout", return_value=True):
+        assert scanPlan.passes("SBIN", screener, pd.DataFrame(), pd.DataFrame())
+        mock_ltp.assert_called_once()
+
+def test_passes_leaves_dictionaries_untouched(configManager, randomStockData):
+    screener = tools(configManager, dl())
+    scanPlan = ScanPlan(configManager, 5, minRSI=0, maxRSI=100)
+    data = randomStockData(np.random.default_rng(3), 100)
+    fullData, processedData = screener.preprocessData(data, daysToLookback=configManager.daysToLookback)
+    screenDict, saveDict = {"Stock": "SBIN", "RSI": 0}, {"Stock": "SBIN", "RSI": 0}
+    scanPlan.passes("SBIN", screener, fullData, processedData, screenDict=screenDict, saveDict=saveDict)
+    assert screenDict == {"Stock": "SBIN", "RSI": 0}
+    assert saveDict == {"Stock": "SBIN", "RSI": 0}
+
+def test_passes_returns_what_the_checks_returned_and_wrote(configManager):
+    screener = tools(configManager, dl())
+    scanPlan = ScanPlan(configManager, 7, respChartPattern=4)
+    def validateVCP(data, screenDict, saveDict):
+        saveDict["Pattern"] = "VCP (BO: 100.0)"
+        return True
+    with patch.object(screener, "validateLTP", return_value=(True, False)), \
+        patch.object(screener, "validateVCP", side_effect=validateVCP):
+        context = scanPlan.passes("SBIN", screener, pd.DataFrame(), pd.DataFrame())
+    assert context["values"] == {"ltp": (True, False), "VCP": True}
+    screenDict, saveDict = {"Pattern": ""}, {"Pattern": ""}
+    check = MagicMock()
+    assert scanPlan.reuse(context, "VCP", screenDict, saveDict, check)
+    check.assert_not_called()
+    assert saveDict == {"Pattern": "VCP (BO: 100.0)"}
+    assert screenDict == {"Pattern": ""}
+    assert scanPlan.reuse(context, "trendlineSupport", screenDict, saveDict, check) == check.return_value
+    with patch.object(screener, "validateLTP", return_value=(False, False)):
+        assert scanPlan.passes("SBIN", screener, pd.DataFrame(), pd.DataFrame()) is None
+
+def test_screenStocks_runs_the_checks_once(hostRef):
+    screener = hostRef.screener
+    with patch.object(screener, "validateVCP", return_value=True) as mock_vcp, \
+        patch.object(screener, "validateLTP", return_value=(True, False)) as mock_ltp, \
+        patch("pkscreener.classes.ParallelProcessing.ScanPlan", wraps=ScanPlan) as mock_scanPlan:
+        results = screen(hostRef, 7, respChartPattern=4)
+    stocks = len(hostRef.objectDictionary)
+    assert all(result is not None for result in results.values())
+    assert mock_vcp.call_count == stocks
+    assert mock_ltp.call_count == stocks
+    mock_scanPlan.assert_called_once()
@@ -0,0 +1,165 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import warnings
+from unittest.mock import patch
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+import pytest
+
+import pkscreener.classes.ScreeningEngine as ScreeningEngine
+from pkscreener.classes.log import default_logger as dl
+from pkscreener.classes.Screener import tools
+
+
+@pytest.fixture
+def screener(configManager):
+    return tools(configManager, dl())
+
+@pytest.fixture
+def engine(configManager):
+    return ScreeningEngine.tools(configManager, dl())
+
+@pytest.fixture
+def stockDict(randomStockData):
+    rng = np.random.default_rng(7)
+    stockDict = {}
+    for i in range(40):
+        data = randomStockData(rng, int(rng.integers(1, 300)))
+        if i % 9 == 0 and len(data) > 30:
+            data.iloc[-25, data.columns.get_loc("Close")] = np.nan
+        stockDict[f"STOCK{i}"] = data.to_dict("split")
+    return stockDict
+
+def test_stackStockData_positive(engine, stockDict):
+    stackedData = engine.stackStockData(stockDict, ["STOCK1", "STOCK2", "MISSING"])
+    assert stackedData["Stock"] == ["STOCK1", "STOCK2"]
+    days = int(stackedData["Length"].max())
+    assert stackedData["Close"].shape == (2, days)
+    for i, stock in enumerate(stackedData["Stock"]):
+        data = np.array(stockDict[stock]["data"])
+        length = stackedData["Length"][i]
+        assert length == len(data)
+        # Latest day in the last column, padding on the older side
+        np.testing.assert_array_equal(stackedData["Close"][i, days - length :], data[:, 3])
+        assert np.isnan(stackedData["Close"][i, : days - length]).all()
+
+def test_stackStockData_empty(engine):
+    stackedData = engine.stackStockData({}, ["SBIN"])
+    assert stackedData["Stock"] == []
+    assert stackedData["Close"].shape == (0, 0)
+
+def test_computeScreeningValues_matches_screener(engine, screener, configManager, stockDict):
+    stackedData = engine.stackStockData(stockDict, list(stockDict.keys()))
+    values = engine.computeScreeningValues(stackedData, volumeRatio=1.5, minRSI=30, maxRSI=60)
+    for i, stock in enumerate(stackedData["Stock"]):
+        payload = stockDict[stock]
+        data = pd.DataFrame(payload["data"], columns=payload["columns"], index=payload["index"])
+        fullData, processedData = screener.preprocessData(data, daysToLookback=configManager.daysToLookback)
+        screenDict, saveDict = {"Stock": stock}, {"Stock": stock, "Trend": "Up"}
+        consolidation = screener.validateConsolidation(processedData, screenDict, saveDict, percentage=configManager.consolidationPercentage)
+        try:
+            isNR4Day = screener.findNR4Day(fullData)
+        except IndexError:
+            isNR4Day = False
+        expected = {
+            "isLtpValid": screener.validateLTP(fullData, screenDict, saveDict)[0],
+            "isConsolidating": consolidation <= configManager.consolidationPercentage and consolidation != 0,
+            "isVolumeHigh": screener.validateVolume(processedData, screenDict, saveDict, volumeRatio=1.5),
+            "isBreaking": screener.findBreakout(processedData, screenDict, saveDict, daysToLookback=configManager.daysToLookback),
+            "isValidRsi": screener.validateRSI(processedData, screenDict, saveDict, 30, 60),
+            "isCciInRange": screener.validateCCI(processedData, screenDict, saveDict, 30, 60),
+            "is52WeekHighBreakout": screener.find52WeekHighBreakout(fullData),
+            "is52WeekLowBreakout": screener.find52WeekLowBreakout(fullData),
+            "is10DaysLowBreakout": screener.find10DaysLowBreakout(fullData),
+            "isNR4Day": isNR4Day,
+        }
+        for key, value in expected.items():
+            assert bool(values[key][i]) == bool(value), f"{key} of {stock}"
+        assert values["RSI"][i] == saveDict["RSI"]
+        assert values["CCI"][i] == saveDict["CCI"]
+        assert values["Volume"][i] == saveDict["Volume"]
+
+def test_latestRSI_too_few_days(engine):
+    close = np.array([[np.nan, 1.0, 2.0, 3.0], [1.0, 2.0, 3.0, 4.0]])
+    assert np.isnan(engine.latestRSI(close, timeperiod=3)[0])
+    assert engine.latestRSI(close, timeperiod=3)[1] == 100
+
+def test_supports(engine):
+    assert engine.supports(17)
+    assert not engine.supports(17, newlyListedOnly=True)
+    assert not engine.supports(7)
+
+@pytest.mark.parametrize(
+    "executeOption, expectedStocks",
+    [
+        (1, [1, 4, 10]),
+        (2, [4]),
+        (3, [1, 10]),
+        (5, [2, 7, 10, 12, 15, 16, 17, 20, 21, 22, 25, 29, 30, 31, 32, 33, 34, 37]),
+        (8, [4, 36]),
+        (9, [1, 3, 4, 7, 8, 12, 15, 20, 29, 31, 34]),
+        (14, [13, 34]),
+        (15, [0, 1, 2, 5, 8, 11, 17, 19, 25, 26, 37, 39]),
+        (16, [2, 8, 11, 13, 19, 20, 32, 37, 39]),
+        (17, [1, 4, 23, 36]),
+    ],
+)
+def test_screen_returns_matching_stocks(engine, stockDict, executeOption, expectedStocks):
+    results = engine.screen(stockDict, list(stockDict.keys()), executeOption, minRSI=30, maxRSI=60, volumeRatio=1.5)
+    stocks = [saveDict["Stock"] for _, saveDict in results]
+    assert stocks == [f"STOCK{i}" for i in expectedStocks]
+    stackedData = engine.stackStockData(stockDict, list(stockDict.keys()))
+    values = engine.computeScreeningValues(stackedData, volumeRatio=1.5, minRSI=30, maxRSI=60)
+    matches = engine.findMatches(values, executeOption)
+    assert set(stocks).issubset([stock for stock, match in zip(stackedData["Stock"], matches) if match])
+    for screenDict, saveDict in results:
+        assert saveDict["Stock"] in screenDict["Stock"]
+        if executeOption == 8:
+            assert "Up" in saveDict["Trend"]
+
+def test_screen_describes_the_matching_stocks(engine, stockDict):
+    results = engine.screen(stockDict, list(stockDict.keys()), 9, minRSI=30, maxRSI=60, volumeRatio=1.5)
+    saveDicts = {saveDict["Stock"]: saveDict for _, saveDict in results}
+    assert saveDicts["STOCK4"]["LTP"] == " 152.51"
+    assert saveDicts["STOCK4"]["RSI"] == 81
+    assert saveDicts["STOCK4"]["Trend"] == "Weak Up"
+    assert saveDicts["STOCK3"]["Pattern"] == "Bullish Engulfing"
+    assert saveDicts["STOCK29"]["Pattern"] == "Demand Rise"
+    assert saveDicts["STOCK8"]["RSI"] == 23
+
+# The arrays only narrow down the stocks, the checks of the scanner decide
+def test_screen_checks_each_matching_stock(engine, stockDict):
+    stocks = list(stockDict.keys())
+    def passes(stock, screener, fullData, processedData):
+        return {} if stock == "STOCK4" else None
+    with patch.object(engine, "findMatches", return_value=np.ones(len(stocks), dtype=bool)), \
+        patch("pkscreener.classes.ScreeningEngine.ScanPlan.passes", side_effect=passes) as mock_passes:
+        results = engine.screen(stockDict, stocks, 9, minRSI=30, maxRSI=60, volumeRatio=1.5)
+    assert [saveDict["Stock"] for _, saveDict in results] == ["STOCK4"]
+    assert mock_passes.call_count > 1
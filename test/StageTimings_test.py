@@ -0,0 +1,94 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import pickle
+
+import pytest
+
+import pkscreener.classes.StageTimings as StageTimings
+
+
+@pytest.fixture
+def enabled():
+    StageTimings.drain()
+    StageTimings.enable()
+    yield
+    StageTimings.enable(False)
+    StageTimings.drain()
+
+def test_percentiles():
+    timings = StageTimings.StageTimings()
+    for milliseconds in range(1, 101):
+        timings.record("preprocessData", milliseconds / 1000)
+    assert timings.counts["preprocessData"] == 100
+    assert timings.totals["preprocessData"] == pytest.approx(5.05)
+    assert timings.percentile("preprocessData", 0.5) == pytest.approx(0.05, rel=0.1)
+    assert timings.percentile("preprocessData", 0.95) == pytest.approx(0.095, rel=0.1)
+    assert timings.percentile("findPattern", 0.5) == 0
+
+def test_record_tiny_durations():
+    timings = StageTimings.StageTimings()
+    timings.record("cacheRead", 0)
+    timings.record("cacheRead", 1e-9)
+    assert set(timings.histograms["cacheRead"].keys()) == {StageTimings.SMALLEST_BUCKET}
+
+def test_merge():
+    first, second = StageTimings.StageTimings(), StageTimings.StageTimings()
+    first.record("validateLTP", 0.001)
+    second.record("validateLTP", 0.001)
+    second.record("findPattern", 0.002)
+    merged = first.merge(pickle.loads(pickle.dumps(second))).merge(None)
+    assert merged.counts == {"validateLTP": 2, "findPattern": 1}
+    assert sum(merged.histograms["validateLTP"].values()) == 2
+
+def test_summary_longest_first():
+    timings = StageTimings.StageTimings()
+    timings.record("validateLTP", 0.001)
+    timings.record("preprocessData", 0.01)
+    summary = timings.summary()
+    assert [row["Stage"] for row in summary] == ["preprocessData", "validateLTP"]
+    assert list(summary[0].keys()) == ["Stage", "Count", "p50 (ms)", "p95 (ms)", "Total (s)"]
+
+def test_nothing_recorded_when_disabled():
+    StageTimings.enable(False)
+    @StageTimings.timed
+    def validateSomething():
+        return True
+    with StageTimings.span("cacheRead"):
+        assert validateSomething()
+    assert len(StageTimings.drain()) == 0
+
+def test_span_and_timed(enabled):
+    @StageTimings.timed
+    def validateSomething(value):
+        if value is None:
+            raise ValueError
+        return value
+    with StageTimings.span("cacheRead"):
+        assert validateSomething(1) == 1
+    with pytest.raises(ValueError):
+        validateSomething(None)
+    timings = StageTimings.drain()
+    assert timings.counts == {"validateSomething": 2, "cacheRead": 1}
+    assert len(StageTimings.drain()) == 0
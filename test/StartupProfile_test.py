@@ -0,0 +1,73 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import builtins
+import subprocess
+import sys
+
+import pytest
+
+import pkscreener.classes.StartupProfile as StartupProfile
+
+
+@pytest.fixture
+def profile():
+    StartupProfile.start()
+    yield StartupProfile
+    StartupProfile.stop()
+
+def test_imports_are_timed(profile, tmp_path, monkeypatch):
+    (tmp_path / "startupProfileParent.py").write_text("import startupProfileChild\n")
+    (tmp_path / "startupProfileChild.py").write_text("import time\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import startupProfileParent  # noqa: F401
+    parentSelf, parentCumulative = profile.importTimes["startupProfileParent"]
+    childSelf, childCumulative = profile.importTimes["startupProfileChild"]
+    assert childCumulative >= 0.02
+    assert parentCumulative >= childCumulative
+    assert parentSelf < childSelf
+    assert profile.summary(top=1)[0]["Module"] == "startupProfileParent"
+    assert profile.elapsed() >= 0.02
+
+def test_stop_restores_import(profile):
+    assert builtins.__import__ is not StartupProfile._originalImport
+    originalImport = StartupProfile._originalImport
+    profile.stop()
+    assert not profile.profiling()
+    assert builtins.__import__ is originalImport
+
+# The heavy modules must only be imported when they are used
+def test_startup_does_not_import_heavy_modules():
+    heavyModules = ["scipy.stats", "telegram", "keras", "tensorflow", "joblib", "requests_cache", "PIL"]
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\nimport pkscreener.globals\n"
+            + f"print([m for m in {heavyModules} if m in sys.modules])",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert output.stdout.strip().splitlines()[-1] == "[]"
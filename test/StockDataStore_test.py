@@ -0,0 +1,154 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import os
+import pickle
+import warnings
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+import pytest
+
+from pkscreener.classes.StockDataStore import SharedStockDict, StockDataStore
+
+
+def sample_frame(rows, start=100.0, tz=None):
+    index = pd.date_range("2023-01-02 09:15", periods=rows, freq="min", tz=tz)
+    values = np.arange(rows, dtype=float) + start
+    return pd.DataFrame(
+        {"Open": values, "High": values + 1, "Low": values - 1, "Close": values, "Volume": values * 10},
+        index=index,
+    )
+
+@pytest.fixture
+def store_file(tmp_path):
+    stockDict = {
+        "SBIN": sample_frame(10).to_dict("split"),
+        "TCS": sample_frame(4, start=200).to_dict("split"),
+    }
+    filePath = str(tmp_path / "stock_data_010123.pkl")
+    StockDataStore.save(stockDict, filePath)
+    return filePath
+
+def test_save_and_read_positive(store_file):
+    store = StockDataStore(store_file)
+    assert len(store) == 2
+    assert "SBIN" in store and "INFY" not in store
+    pd.testing.assert_frame_equal(store.getDataFrame("SBIN"), sample_frame(10), check_freq=False, check_index_type=False)
+    pd.testing.assert_frame_equal(store.getDataFrame("TCS"), sample_frame(4, start=200), check_freq=False, check_index_type=False)
+
+def test_read_trailing_rows(store_file):
+    store = StockDataStore(store_file)
+    df = store.getDataFrame("SBIN", lastN=3)
+    pd.testing.assert_frame_equal(df, sample_frame(10).tail(3), check_freq=False, check_index_type=False)
+    assert len(store.getDataFrame("TCS", lastN=30)) == 4
+
+def test_toDict_selected_symbols(store_file):
+    store = StockDataStore(store_file)
+    stockDict = store.toDict(symbols=["TCS", "INFY"])
+    assert list(stockDict.keys()) == ["TCS"]
+    data = stockDict["TCS"]
+    df = pd.DataFrame(data["data"], columns=data["columns"], index=data["index"])
+    assert df["Close"].tolist() == [200.0, 201.0, 202.0, 203.0]
+
+def test_timezone_aware_index(tmp_path):
+    filePath = str(tmp_path / "intraday_stock_data_010123.pkl")
+    frame = sample_frame(5, tz="Asia/Kolkata")
+    StockDataStore.save({"SBIN": frame.to_dict("split")}, filePath)
+    df = StockDataStore(filePath).getDataFrame("SBIN")
+    assert str(df.index.tz) == "Asia/Kolkata"
+    assert df.index.equals(frame.index)
+
+def test_save_skips_invalid_payloads(tmp_path):
+    filePath = str(tmp_path / "stock_data_010123.pkl")
+    stockDict = {
+        "SBIN": sample_frame(3).to_dict("split"),
+        "BAD": {"index": [], "columns": [], "data": []},
+        "WORSE": 100,
+    }
+    assert StockDataStore.save(stockDict, filePath) == 1
+    assert StockDataStore(filePath).keys() == ["SBIN"]
+
+def test_empty_store(tmp_path):
+    filePath = str(tmp_path / "stock_data_010123.pkl")
+    assert StockDataStore.save({}, filePath) == 0
+    store = StockDataStore(filePath)
+    assert len(store) == 0
+    assert store.get("SBIN") is None
+
+def test_isStoreFile(store_file, tmp_path):
+    assert StockDataStore.isStoreFile(store_file)
+    legacyFile = str(tmp_path / "legacy.pkl")
+    with open(legacyFile, "wb") as f:
+        pickle.dump({"SBIN": sample_frame(3).to_dict("split")}, f)
+    assert not StockDataStore.isStoreFile(legacyFile)
+    assert not StockDataStore.isStoreFile(str(tmp_path / "missing.pkl"))
+
+def test_shared_dict_reads_attached_store(store_file):
+    shared = SharedStockDict()
+    shared.attach(store_file)
+    assert sorted(shared.keys()) == ["SBIN", "TCS"]
+    assert len(shared) == 2
+    assert "TCS" in shared and "INFY" not in shared
+    data = shared.get("TCS")
+    df = pd.DataFrame(data["data"], columns=data["columns"], index=data["index"])
+    assert df["Close"].tolist() == [200.0, 201.0, 202.0, 203.0]
+    assert shared.get("INFY") is None
+    with pytest.raises(KeyError):
+        shared["INFY"]
+
+def test_shared_dict_updates_and_added_stores(store_file):
+    shared = SharedStockDict()
+    shared.attach(store_file)
+    shared["INFY"] = sample_frame(2).to_dict("split")
+    ownedFile = shared.addStore({"HDFC": sample_frame(3).to_dict("split")})
+    assert os.path.exists(ownedFile)
+    assert sorted(shared.keys()) == ["HDFC", "INFY", "SBIN", "TCS"]
+    assert sorted(shared.copy().keys()) == ["HDFC", "INFY", "SBIN", "TCS"]
+    assert len(shared.get("HDFC")["data"]) == 3
+    shared.reset()
+    assert not os.path.exists(ownedFile)
+    assert len(shared) == 0
+
+def test_shared_dict_pickles_without_mapped_data(store_file):
+    shared = SharedStockDict()
+    shared.attach(store_file)
+    assert shared.get("SBIN") is not None
+    state = pickle.dumps(shared)
+    assert len(state) < 2048
+    restored = pickle.loads(state)
+    assert len(restored.get("SBIN")["data"]) == 10
+
+def test_shared_dict_ensureAttached_store_added_elsewhere(store_file):
+    shared = SharedStockDict()
+    copied = pickle.loads(pickle.dumps(shared))
+    shared.attach(store_file)
+    assert copied.get("SBIN") is None
+    copied.ensureAttached(store_file)
+    copied.ensureAttached(store_file)
+    assert copied.storePaths == [store_file]
+    assert len(copied.get("SBIN")["data"]) == 10
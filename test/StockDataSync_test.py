@@ -0,0 +1,106 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pkscreener.classes.StockDataStore import StockDataStore
+from pkscreener.classes.StockDataSync import (mergeStockData, periodOffset,
+                                              syncStockData)
+
+
+def stockData(start, periods, price=100.0):
+    index = pd.bdate_range(start, periods=periods)
+    close = price + np.arange(periods, dtype=float)
+    return pd.DataFrame(
+        {"Open": close - 1, "High": close + 1, "Low": close - 2, "Close": close, "Adj Close": close, "Volume": 1000.0},
+        index=index,
+    )
+
+@pytest.fixture
+def history():
+    return stockData("2023-01-02", 250)
+
+def test_periodOffset():
+    assert periodOffset("280d") == pd.DateOffset(days=280)
+    assert periodOffset("2y") == pd.DateOffset(years=2)
+    assert periodOffset("3mo") == pd.DateOffset(months=3)
+    assert periodOffset("max") is None
+
+def test_mergeStockData_appends_the_new_bars(history):
+    stored = history.iloc[:-3].copy()
+    # The last stored bar was saved before the close
+    stored.iloc[-1, stored.columns.get_loc("Close")] -= 5
+    fetched = history.iloc[-5:]
+    merged = mergeStockData(stored, fetched, "max")
+    pd.testing.assert_frame_equal(merged, history, check_freq=False)
+
+def test_mergeStockData_keeps_the_period(history):
+    merged = mergeStockData(history.iloc[:-3], history.iloc[-5:], "100d")
+    assert merged.index[-1] == history.index[-1]
+    assert merged.index[0] > history.index[-1] - pd.DateOffset(days=100)
+    assert merged.index[0] - pd.Timedelta(days=5) <= history.index[-1] - pd.DateOffset(days=100)
+
+def test_mergeStockData_adjusted_prices(history):
+    # A 1:2 split since the cache was saved
+    fetched = history.iloc[-5:].copy()
+    fetched[["Open", "High", "Low", "Close", "Adj Close"]] /= 2
+    assert mergeStockData(history.iloc[:-3], fetched, "max") is None
+
+def test_mergeStockData_without_overlap(history):
+    assert mergeStockData(history.iloc[:-10], history.iloc[-5:], "max") is None
+    assert mergeStockData(history.iloc[:1], history.iloc[-5:], "max") is None
+
+def test_syncStockData(history, tmp_path):
+    filePath = str(tmp_path / "stock_data_020623.pkl")
+    StockDataStore.save(
+        {
+            "SBIN": history.iloc[:-3].to_dict("split"),
+            "TCS": history.iloc[:-1].to_dict("split"),
+            "INFY": history.iloc[:-1].to_dict("split"),
+        },
+        filePath,
+    )
+    fetcher = Mock()
+    fetcher.fetchStockDataInChunks.side_effect = lambda stocks, *args, start=None, **kwargs: {
+        stock: history[history.index >= start] for stock in stocks if stock != "INFY"
+    }
+    store = StockDataStore(filePath)
+    result = syncStockData(fetcher, store, ["SBIN", "TCS", "INFY", "WIPRO"], "max", "1d", None)
+    store.close()
+    # The stocks stored up to the same day are fetched together
+    assert fetcher.fetchStockDataInChunks.call_count == 2
+    starts = sorted(call.kwargs["start"] for call in fetcher.fetchStockDataInChunks.call_args_list)
+    assert starts == [str(history.index[-5].date()), str(history.index[-3].date())]
+    assert sorted(result.keys()) == ["SBIN", "TCS"]
+    for stock in ["SBIN", "TCS"]:
+        pd.testing.assert_frame_equal(result[stock], history, check_freq=False, check_index_type=False)
+
+def test_syncStockData_without_cache():
+    fetcher = Mock()
+    assert syncStockData(fetcher, None, ["SBIN"], "280d", "1d", None) == {}
+    fetcher.fetchStockDataInChunks.assert_not_called()
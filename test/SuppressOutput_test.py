@@ -0,0 +1,84 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import sys
+import threading
+
+import pytest
+
+from pkscreener.classes.SuppressOutput import SuppressOutput
+
+
+@pytest.fixture
+def quietMode():
+    stdout, stderr = sys.stdout, sys.stderr
+    yield
+    SuppressOutput.quiet = False
+    sys.stdout, sys.stderr = stdout, stderr
+
+def test_suppress_output(capsys):
+    with SuppressOutput(suppress_stdout=True, suppress_stderr=True):
+        sys.stdout.write("Not shown\n")
+        sys.stderr.write("Not shown\n")
+    sys.stdout.write("Shown\n")
+    captured = capsys.readouterr()
+    assert captured.out == "Shown\n"
+    assert captured.err == ""
+
+def test_devnull_opened_once():
+    assert SuppressOutput.devnull() is SuppressOutput.devnull()
+    assert not SuppressOutput.devnull().closed
+
+def test_quiet_mode(quietMode):
+    SuppressOutput.enableQuietMode()
+    assert SuppressOutput.quiet
+    assert sys.stdout is SuppressOutput.devnull()
+    assert sys.stderr is SuppressOutput.devnull()
+    suppressOutput = SuppressOutput(suppress_stdout=True, suppress_stderr=True)
+    with suppressOutput:
+        assert suppressOutput._stdout is None
+        assert suppressOutput._stderr is None
+    assert sys.stdout is SuppressOutput.devnull()
+
+def test_quiet_mode_switched_off(quietMode):
+    stdout, stderr = sys.stdout, sys.stderr
+    SuppressOutput.enableQuietMode()
+    SuppressOutput.disableQuietMode()
+    assert not SuppressOutput.quiet
+    assert sys.stdout is stdout
+    assert sys.stderr is stderr
+    # Nothing to switch off
+    SuppressOutput.disableQuietMode()
+    assert sys.stdout is stdout
+
+def test_background_thread_leaves_the_streams_alone(capsys):
+    streams = []
+    def suppress():
+        with SuppressOutput(suppress_stdout=True, suppress_stderr=True):
+            streams.append((sys.stdout, sys.stderr))
+    thread = threading.Thread(target=suppress)
+    thread.start()
+    thread.join()
+    assert streams == [(sys.stdout, sys.stderr)]
+    assert streams[0][0] is not SuppressOutput.devnull()
@@ -0,0 +1,139 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import numpy as np
+import pandas as pd
+
+import pkscreener.classes.SwingPoints as SwingPoints
+from pkscreener.classes.Pktalib import pktalib
+
+
+# The VCP as Screener.tools.validateVCP used to find it, in the data of a
+# stock with the latest day first
+def slowVCP(data, window=3, percentageFromTop=3):
+    percentageFromTop /= 100
+    data = data.reset_index().rename(columns={"index": "Date"})
+    data["tops"] = (
+        data["High"]
+        .iloc[
+            list(
+                pktalib.argrelextrema(
+                    np.array(data["High"]), np.greater_equal, order=window
+                )[0]
+            )
+        ]
+        .head(4)
+    )
+    data = data.fillna(0)
+    tops = data[data.tops > 0]
+    highestTop = round(tops.describe()["High"]["max"], 1)
+    filteredTops = tops[tops.tops > (highestTop - (highestTop * percentageFromTop))]
+    if not filteredTops.equals(tops) or len(tops) < 2:
+        return False, highestTop
+    lowPoints = []
+    for i in range(len(tops) - 1):
+        endDate = tops.iloc[i]["Date"]
+        startDate = tops.iloc[i + 1]["Date"]
+        lowPoints.append(
+            data[(data.Date >= startDate) & (data.Date <= endDate)].describe()["Low"][
+                "min"
+            ]
+        )
+    ltp = data.head(1)["Close"].iloc[0]
+    return bool(ltp < highestTop and ltp > max(lowPoints)), highestTop
+
+
+def test_swing_points_match_argrelextrema(randomPrices):
+    _, _, close = randomPrices(30, 60, seed=3, decimals=0)
+    close[3, 10] = np.nan
+    for order in [1, 3, 5]:
+        highs = SwingPoints.swingHighs(close, order)
+        lows = SwingPoints.swingLows(close, order)
+        for row in range(len(close)):
+            assert np.array_equal(
+                np.flatnonzero(highs[row]),
+                pktalib.argrelextrema(close[row], np.greater_equal, order=order)[0],
+            )
+            assert np.array_equal(
+                np.flatnonzero(lows[row]),
+                pktalib.argrelextrema(close[row], np.less_equal, order=order)[0],
+            )
+            assert np.array_equal(SwingPoints.swingHighs(close[row], order), highs[row])
+
+
+def test_latestPoints():
+    isPoint = np.array([[True, False, True, True, False, True], [False] * 6])
+    assert SwingPoints.latestPoints(isPoint, 2).tolist() == [
+        [False, False, False, True, False, True],
+        [False] * 6,
+    ]
+
+
+def test_findVCP():
+    # Three tops within 3% of each other with rising lows between them
+    high = np.array([90, 100, 95, 92, 101, 97, 96, 100.5, 98, 99, 99.5])
+    low = high - 2
+    close = high - 1
+    isVCP, highestTop = SwingPoints.findVCP(high, low, close, window=1)
+    assert isVCP[0]
+    assert highestTop[0] == 101
+    # The latest close is above the highest top
+    close[-1] = 102
+    assert not SwingPoints.findVCP(high, low, close, window=1)[0][0]
+    # A single top is not a VCP
+    assert not SwingPoints.findVCP([1, 2, 3], [1, 2, 3], [1, 2, 3])[0][0]
+
+
+def test_findVCP_matches_the_old_validateVCP(randomPrices):
+    found = 0
+    for days in [15, 30, 60]:
+        high, low, close = randomPrices(100, days, seed=5, decimals=0)
+        isVCP, highestTop = SwingPoints.findVCP(high, low, close)
+        for row in range(100):
+            data = pd.DataFrame(
+                {"High": high[row], "Low": low[row], "Close": close[row]},
+                index=pd.date_range("2023-01-02", periods=days),
+            )[::-1]
+            rowVCP, rowTop = slowVCP(data)
+            assert isVCP[row] == rowVCP
+            if rowVCP:
+                assert highestTop[row] == rowTop
+                found += 1
+    assert found > 0
+
+
+def test_findVCP_of_stacked_rows_with_padding(randomPrices):
+    high, low, close = randomPrices(20, 120, seed=3, decimals=0)
+    lengths = np.random.default_rng(1).integers(10, 121, 20)
+    for values in [high, low, close]:
+        values[np.arange(120)[None, :] < (120 - lengths)[:, None]] = np.nan
+    isVCP, highestTop = SwingPoints.findVCP(high, low, close, lengths=lengths)
+    assert isVCP.any()
+    for row in range(20):
+        start = 120 - lengths[row]
+        rowVCP, rowTop = SwingPoints.findVCP(
+            high[row, start:], low[row, start:], close[row, start:]
+        )
+        assert isVCP[row] == rowVCP[0]
+        assert np.array_equal(highestTop[row], rowTop[0], equal_nan=True)
@@ -0,0 +1,86 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import numpy as np
+
+import pkscreener.classes.Trendlines as Trendlines
+
+
+# The support line as Screener.tools.findTrendlines used to find it
+def slowSupportLine(low, close, points=30):
+    number = np.arange(1, len(low) + 1)
+    selected = np.arange(len(low))
+    while len(selected) > points:
+        slope, intercept = np.polyfit(number[selected], low[selected], 1)
+        selected = selected[low[selected] < slope * number[selected] + intercept]
+    return np.polyfit(number[selected], close[selected], 1)
+
+
+def test_supportLines_match_the_iterative_fit(randomPrices):
+    _, low, close = randomPrices(20, 400, seed=11, drift=0.2, spread=2)
+    slopes, intercepts = Trendlines.supportLines(low, close)
+    for row in range(20):
+        slope, intercept = slowSupportLine(low[row], close[row])
+        assert np.isclose(slopes[row], slope)
+        assert np.isclose(intercepts[row], intercept)
+
+
+def test_supportLines_skip_padding_of_shorter_histories(randomPrices):
+    _, low, close = randomPrices(3, 400, seed=11, drift=0.2, spread=2)
+    padded = [np.concatenate([np.full(100, np.nan), values[1, 100:]]) for values in [low, close]]
+    slope, intercept = Trendlines.supportLines(padded[0], padded[1])
+    expectedSlope, expectedIntercept = Trendlines.supportLines(low[1, 100:], close[1, 100:])
+    assert np.isclose(slope[0], expectedSlope[0])
+    # The padded row counts its days from the first one of the padding
+    assert np.isclose(intercept[0] + 100 * slope[0], expectedIntercept[0])
+
+
+def test_supportLines_are_bounded(randomPrices):
+    # No low is below the line through lows that are all on it
+    low = 100 + 0.1 * np.arange(300)
+    slope, _ = Trendlines.supportLines(low, low + 1)
+    assert np.isnan(slope[0])
+    missing = np.full(300, np.nan)
+    slope, _ = Trendlines.supportLines(missing, missing)
+    assert np.isnan(slope[0])
+    # After the last round, the line goes through the lows that are left
+    _, low, close = randomPrices(1, 400, seed=11, drift=0.2, spread=2)
+    number = np.arange(1, 401)
+    slope, intercept = np.polyfit(number, low[0], 1)
+    below = low[0] < slope * number + intercept
+    expected = np.polyfit(number[below], close[0][below], 1)
+    slope, intercept = Trendlines.supportLines(low, close, maximumRounds=1)
+    assert np.allclose([slope[0], intercept[0]], expected)
+
+
+def test_isNearSupport():
+    days = np.arange(300)
+    close = 100 + days + 5 * np.sin(days)
+    low = close - 1
+    assert Trendlines.isNearSupport(low, close)[0]
+    # The latest close is far above the support line
+    close[-1] = 1000
+    assert not Trendlines.isNearSupport(low, close)[0]
+    # The support line is falling
+    assert not Trendlines.isNearSupport(low[::-1], close[::-1])[0]
@@ -34,6 +34,7 @@ import pandas as pd
 import pytz
 
 from pkscreener.classes.ColorText import colorText
+from pkscreener.classes.StockDataStore import StockDataStore
 from pkscreener.classes.Utility import tools
 
 
@@ -217,11 +218,66 @@ def test_saveStockData():
         pass
     with patch("pkscreener.classes.Utility.tools.afterMarketStockDataExists") as mock_data:
         mock_data.return_value = False, "stock_data_1.pkl"
-        mock_pickle = Mock()
-        with patch("pickle.dump", mock_pickle) as mock_dump:
+        mock_save = Mock()
+        with patch("pkscreener.classes.StockDataStore.StockDataStore.save", mock_save) as mock_dump:
             tools.saveStockData(stockDict, configManager, loadCount)
-            # Assert that pickle.dump() is called with the correct arguments
-            mock_dump.assert_called_once_with(stockDict.copy(),ANY)
+            # Assert that the columnar store is saved with the correct arguments
+            mock_dump.assert_called_once_with(stockDict.copy(),"stock_data_1.pkl")
+
+# Positive test case for latestStockDataCache() function
+def test_latestStockDataCache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert tools.latestStockDataCache() is None
+    stockDict = {"SBIN": pd.DataFrame({"Close": [1.0]}, index=pd.date_range("2023-01-02", periods=1)).to_dict("split")}
+    for cache_file in ["stock_data_311223.pkl", "stock_data_020124.pkl", "intraday_stock_data_030124.pkl"]:
+        StockDataStore.save(stockDict, cache_file)
+    # Not a stock data store
+    pd.DataFrame().to_pickle("stock_data_040124.pkl")
+    assert tools.latestStockDataCache() == "stock_data_020124.pkl"
+    assert tools.latestStockDataCache(intraday=True) == "intraday_stock_data_030124.pkl"
+
+# Positive test case for saveStockData() with downloadOnly
+def test_saveStockData_downloadOnly_removes_earlier_caches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stockDict = {"SBIN": pd.DataFrame({"Close": [1.0]}, index=pd.date_range("2023-01-02", periods=1)).to_dict("split")}
+    StockDataStore.save(stockDict, "stock_data_311223.pkl")
+    configManager = Mock()
+    configManager.deleteFileWithPattern.side_effect = lambda excludeFile=None: [
+        os.remove(f) for f in os.listdir(".") if f != excludeFile
+    ]
+    with patch("pkscreener.classes.Utility.tools.afterMarketStockDataExists") as mock_data:
+        mock_data.return_value = False, "stock_data_020124.pkl"
+        tools.saveStockData(stockDict, configManager, 0)
+        assert sorted(os.listdir(".")) == ["stock_data_020124.pkl", "stock_data_311223.pkl"]
+        tools.saveStockData(stockDict, configManager, -5, downloadOnly=True)
+        configManager.deleteFileWithPattern.assert_called_once_with(excludeFile="stock_data_020124.pkl")
+        assert os.listdir(".") == ["stock_data_020124.pkl"]
+
+# Positive test case for saveStockData() and loadStockData() round trip
+def test_saveStockData_loadStockData_roundtrip():
+    cache_file = "stock_data_3.pkl"
+    index = pd.date_range("2023-01-02", periods=5, freq="D")
+    sbin = pd.DataFrame({"Open": [1.0, 2, 3, 4, 5], "Close": [2.0, 3, 4, 5, 6]}, index=index)
+    tcs = pd.DataFrame({"Open": [7.0, 8], "Close": [9.0, 10]}, index=index[:2])
+    stockDict = {"SBIN": sbin.to_dict("split"), "TCS": tcs.to_dict("split")}
+    configManager = Mock()
+    with patch("pkscreener.classes.Utility.tools.afterMarketStockDataExists") as mock_data:
+        mock_data.return_value = False, cache_file
+        tools.saveStockData(stockDict, configManager, 0)
+        mock_data.return_value = True, cache_file
+        loadedDict = {}
+        tools.loadStockData(loadedDict, configManager, False, "Y", stockCodes=["TCS"])
+        assert list(loadedDict.keys()) == ["TCS"]
+        data = loadedDict["TCS"]
+        loaded = pd.DataFrame(data["data"], columns=data["columns"], index=data["index"])
+        pd.testing.assert_frame_equal(loaded, tcs, check_freq=False, check_index_type=False)
+        # Saving a partially loaded cache must retain the stocks that were not loaded
+        loadedDict["INFY"] = tcs.to_dict("split")
+        tools.saveStockData(loadedDict, configManager, -5)
+        loadedDict = {}
+        tools.loadStockData(loadedDict, configManager, False, "Y")
+        assert sorted(loadedDict.keys()) == ["INFY", "SBIN", "TCS"]
+    os.remove(cache_file)
 
 # Positive test case for loadStockData() function
 def test_loadStockData():
@@ -27,10 +27,13 @@ import warnings
 
 warnings.simplefilter("ignore", DeprecationWarning)
 warnings.simplefilter("ignore", FutureWarning)
+import numpy as np
 import pandas as pd
 import pytest
 
-from pkscreener.classes.Backtest import (backtest, backtestSummary,
+from pkscreener.classes.Backtest import (BacktestResults, backtest, backtestStatistics,
+                                         backtestSummary,
+                                         formattedBacktestResults,
                                          formattedOutput)
 
 
@@ -118,4 +121,57 @@ def test_backtestSummary_no_data():
 def test_formattedOutput():
     assert formattedOutput(85) == "\x1b[92m85.00%\x1b[0m"
     assert formattedOutput(70) == "\x1b[93m70.00%\x1b[0m"
-    assert formattedOutput(40) == "\x1b[91m40.00%\x1b[0m"
\ No newline at end of file
+    assert formattedOutput(40) == "\x1b[91m40.00%\x1b[0m"
+
+def test_backtest_stores_returns_as_numbers(sample_screened_dict):
+    result = backtest("AAPL", sample_data(), screenedDict=sample_screened_dict, sellSignal=True)
+    assert result["1-Pd"].iloc[0] == pytest.approx(10)
+    assert result["4-Pd"].iloc[0] == pytest.approx(40)
+    assert np.isnan(result["5-Pd"].iloc[0])
+    assert result["SellSignal"].iloc[0]
+
+def test_formattedBacktestResults_colors_wins(sample_screened_dict):
+    result = backtest("AAPL", sample_data(), screenedDict=sample_screened_dict)
+    result = backtest("SBIN", sample_data(), screenedDict=sample_screened_dict, backTestedData=result, sellSignal=True)
+    formatted = formattedBacktestResults(result)
+    assert "SellSignal" not in formatted.columns
+    assert formatted["1-Pd"].tolist() == ["\x1b[92m10.00%\x1b[0m", "\x1b[91m10.00%\x1b[0m"]
+    assert formatted["5-Pd"].tolist() == ["", ""]
+    assert result["1-Pd"].iloc[0] == pytest.approx(10)
+
+def test_backtestStatistics():
+    df = pd.DataFrame({
+        "Stock": ["SBIN", "SBIN", "SBIN", "TCS"],
+        "1-Pd": [2.0, -1.0, np.nan, -4.0],
+        "2-Pd": [1.0, 3.0, 5.0, np.nan],
+        "SellSignal": [False, False, False, True],
+    })
+    statistics = backtestStatistics(df)
+    assert statistics["Wins"].loc["SBIN"].tolist() == [1, 3]
+    assert statistics["Trades"].loc["SBIN"].tolist() == [2, 3]
+    assert statistics["WinRate"].at["SBIN", "1-Pd"] == 50
+    assert statistics["AverageReturn"].at["SBIN", "2-Pd"] == 3
+    # A fall is a gain for a sell signal
+    assert statistics["Wins"].at["TCS", "1-Pd"] == 1
+    assert statistics["AverageReturn"].at["TCS", "1-Pd"] == 4
+    assert np.isnan(statistics["WinRate"].at["TCS", "2-Pd"])
+    summary_df = backtestSummary(df)
+    assert summary_df["Stock"].tolist() == ["SBIN", "TCS", "SUMMARY"]
+    assert summary_df["2-Pd"].tolist()[1] == "-"
+    assert summary_df["Overall"].tolist()[-1] == f"{formattedOutput(5 * 100 / 6)} of (6)"
+
+def test_BacktestResults_matches_backtest(sample_screened_dict):
+    backtestResults = BacktestResults()
+    backTestedData = None
+    for i, stock in enumerate(["SBIN", "TCS", "SBIN", "IRCTC"]):
+        data = sample_data().set_index("Date").iloc[i % 2:]
+        backtestResults.add(stock, data, sample_screened_dict, sellSignal=i == 1)
+        backTestedData = backtest(stock, data, screenedDict=sample_screened_dict, backTestedData=backTestedData, sellSignal=i == 1)
+        if i == 1:
+            assert backtestResults.newDataFrame()["Stock"].tolist() == ["SBIN", "TCS"]
+            assert backtestResults.summary().equals(backtestSummary(backTestedData))
+    backtestResults.add("", None)
+    assert len(backtestResults) == 4
+    assert backtestResults.newDataFrame()["Stock"].tolist() == ["SBIN", "IRCTC"]
+    assert backtestResults.summary().equals(backtestSummary(backTestedData))
+    pd.testing.assert_frame_equal(backtestResults.dataFrame(), backTestedData.reset_index(drop=True), check_dtype=False)
@@ -0,0 +1,101 @@
+"""
+    The MIT License (MIT)
+
+    Copyright (c) 2023 pkjmesra
+
+    Permission is hereby granted, free of charge, to any person obtaining a copy
+    of this software and associated documentation files (the "Software"), to deal
+    in the Software without restriction, including without limitation the rights
+    to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+    copies of the Software, and to permit persons to whom the Software is
+    furnished to do so, subject to the following conditions:
+
+    The above copyright notice and this permission notice shall be included in all
+    copies or substantial portions of the Software.
+
+    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+    SOFTWARE.
+
+"""
+import multiprocessing
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+
+warnings.simplefilter("ignore", DeprecationWarning)
+warnings.simplefilter("ignore", FutureWarning)
+import pandas as pd
+import pytest
+
+import pkscreener.classes.ConfigManager as ConfigManager
+from pkscreener.classes.CandlePatterns import CandlePatterns
+from pkscreener.classes.log import default_logger as dl
+from pkscreener.classes.Screener import tools
+
+
+# The daily OHLCV data of a made up stock whose prices follow a random walk
+def stockData(rng, rows):
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    open = close * (1 + rng.normal(0, 0.01, rows))
+    high = np.maximum(open, close) * (1 + np.abs(rng.normal(0, 0.01, rows)))
+    low = np.minimum(open, close) * (1 - np.abs(rng.normal(0, 0.01, rows)))
+    volume = rng.integers(1000, 200000, rows).astype(float)
+    return pd.DataFrame(
+        {"Open": open, "High": high, "Low": low, "Close": close, "Adj Close": close, "Volume": volume},
+        index=pd.date_range("2022-01-03", periods=rows),
+    )
+
+@pytest.fixture
+def randomStockData():
+    return stockData
+
+@pytest.fixture
+def configManager():
+    return ConfigManager.tools()
+
+# The cached stocks of hostRef. A test module can override this to screen
+# other stocks.
+@pytest.fixture
+def objectDictionary():
+    rng = np.random.default_rng(11)
+    return {
+        f"STOCK{i}": stockData(rng, int(rng.integers(30, 300))).to_dict("split")
+        for i in range(15)
+    }
+
+# Stands in for the PKMultiProcessorClient that the StockConsumer methods get
+# as hostRef, so that they can be run in the test process
+@pytest.fixture
+def hostRef(configManager, objectDictionary):
+    return SimpleNamespace(
+        configManager=configManager,
+        fetcher=None,
+        screener=tools(configManager, dl()),
+        candlePatterns=CandlePatterns(),
+        default_logger=dl(),
+        objectDictionary=objectDictionary,
+        processingCounter=multiprocessing.Value("i", 0),
+        processingResultsCounter=multiprocessing.Value("i", 0),
+        proxyServer=None,
+    )
+
+# The high, low and close prices of made up stocks, one stock in each row,
+# that follow a random walk with the given drift
+def priceMatrices(rows, days, seed, drift=0.0, spread=1.0, decimals=None):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(drift, 1, (rows, days)), axis=1)
+    above = spread * rng.random((rows, days))
+    below = spread * rng.random((rows, days))
+    if decimals is not None:
+        close, above, below = (np.round(values, decimals) for values in [close, above, below])
+    return close + above, close - below, close
+
+@pytest.fixture
+def randomPrices():
+    return priceMatrices
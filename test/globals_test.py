@@ -23,7 +23,7 @@
 """
 
 import platform
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -177,3 +177,63 @@ def test_getTopLevelMenuChoices_edge():
     assert menuOption == ""
     assert tickerOption is None
     assert executeOption is None
+
+def test_dumpBacktestResults_appends_only_new_results(tmp_path, monkeypatch):
+    import pandas as pd
+    from types import SimpleNamespace
+
+    import pkscreener.globals as globals
+    from pkscreener.classes.Backtest import BacktestResults
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(globals, "userPassedArgs", SimpleNamespace(intraday=False))
+    monkeypatch.setattr(globals, "selectedChoice", {"0": "B", "1": "12", "2": "9", "3": "", "4": ""})
+    backtestResults = BacktestResults()
+    data = pd.DataFrame({"Close": [100, 110, 90]}, index=pd.date_range("2023-01-02", periods=3))
+    screenedDict = {"Volume": 1, "Trend": "Up", "MA-Signal": "Buy"}
+    backtestResults.add("SBIN", data, screenedDict)
+    with patch("pkscreener.classes.Utility.tools.clearScreen"), patch("builtins.print"):
+        dumpBacktestResults(backtestResults)
+        report = tmp_path / backtestReportFileName()
+        firstReport = report.read_text()
+        backtestResults.add("TCS", data, screenedDict, sellSignal=True)
+        with patch("pkscreener.globals.formattedBacktestResults", wraps=formattedBacktestResults) as mock_format:
+            dumpBacktestResults(backtestResults)
+            assert mock_format.call_args[0][0].index.tolist() == ["TCS"]
+    secondReport = report.read_text()
+    assert secondReport.startswith(firstReport[: firstReport.rindex("</tbody>")])
+    assert secondReport.endswith("</tbody></table></span></body></html>")
+    assert secondReport.count("<tr>") == firstReport.count("<tr>") + 1
+    summary = (tmp_path / backtestReportFileName("Summary")).read_text()
+    assert "TCS" in summary and "SBIN" in summary
+
+def test_isFetchPipelined_only_when_all_the_data_is_downloaded_afresh(monkeypatch):
+    import pkscreener.globals as globals
+    monkeypatch.setattr(globals.configManager, "downloadChunkSize", 100)
+    monkeypatch.setattr(globals.configManager, "cacheEnabled", True)
+    monkeypatch.setattr(globals.configManager, "vectorizedScreening", False)
+    with patch("pkscreener.classes.Utility.tools.isTradingTime", return_value=True):
+        assert isFetchPipelined("X", 12, ["SBIN"], False, False)
+        assert isFetchPipelined("B", 12, ["SBIN"], False, False)
+        assert not isFetchPipelined("X", 12, ["SBIN"], False, True)
+        assert not isFetchPipelined("X", 12, [], False, False)
+        monkeypatch.setattr(globals.configManager, "vectorizedScreening", True)
+        assert not isFetchPipelined("X", 1, ["SBIN"], False, False)
+        assert isFetchPipelined("B", 1, ["SBIN"], False, False)
+    with patch("pkscreener.classes.Utility.tools.isTradingTime", return_value=False):
+        assert not isFetchPipelined("B", 12, ["SBIN"], False, False)
+        assert isFetchPipelined("B", 12, ["SBIN"], True, False)
+
+def test_getWorkerPool_makes_queues_only_for_a_new_pool(monkeypatch):
+    import pkscreener.globals as globals
+    livePool = MagicMock(totalConsumers=consumersCount(2))
+    livePool.isAlive.return_value = True
+    monkeypatch.setattr(globals, "workerPool", livePool)
+    with patch("pkscreener.globals.initQueues") as mock_initQueues, \
+        patch("pkscreener.globals.PKWorkerPool") as mock_PKWorkerPool:
+        assert getWorkerPool(2) is livePool
+        mock_initQueues.assert_not_called()
+        livePool.isAlive.return_value = False
+        mock_initQueues.return_value = ("tasks", "results", 2)
+        assert getWorkerPool(2) is mock_PKWorkerPool.return_value
+        mock_initQueues.assert_called_once_with(2)
+        livePool.terminate.assert_called_once()
@@ -108,3 +108,28 @@ def test_setupLogger_positive_filter():
     with patch('pkscreener.classes.log.setup_custom_logger') as mock_logger:
         setupLogger(shouldLog=True)
         assert mock_logger.call_args[1]['filter'] is None
+
+# Positive test case - should only format the line when it gets logged
+def test_info_formats_lazily():
+    from pkscreener.classes.log import filterlogger
+    class Unprintable:
+        def __str__(self):
+            raise AssertionError("Must not be formatted")
+    logger = filterlogger(logging.getLogger("pkscreener_lazy_test"))
+    logger.level = logging.INFO
+    logger.info("Data:\n%s", Unprintable())
+    logger.level = logging.DEBUG
+    with patch.object(logger.logger, "info") as mock_info:
+        logger.info("Data:%s, %s", 1, "SBIN")
+        assert mock_info.call_args[0][0].endswith("\nData:1, SBIN")
+
+# Positive test case - should add the same handlers only once
+def test_addHandlers_only_once():
+    from pkscreener.classes.log import filterlogger
+    logger = filterlogger(logging.getLogger("pkscreener_handlers_test"))
+    log_file_path = os.path.join(tempfile.gettempdir(), "pkscreener-handlers-test.txt")
+    handlers = logger.addHandlers(log_file_path=log_file_path, levelname=logging.INFO)
+    assert logger.addHandlers(log_file_path=log_file_path, levelname=logging.INFO) == handlers
+    assert len(logger.logger.handlers) == 1
+    logger.removeHandler(handlers[1])
+    handlers[1].close()
@@ -35,6 +35,7 @@ import pytest
 import pkscreener.classes.ConfigManager as ConfigManager
 import pkscreener.classes.Utility as Utility
 from pkscreener.classes.log import default_logger as dl
+from pkscreener.classes.Pktalib import pktalib
 from pkscreener.classes.Screener import tools
 
 
@@ -211,6 +212,54 @@ def test_findTrend_positive(tools_instance):
     # Call the function and assert the result
     assert tools_instance.findTrend(data, {}, {}, 10) == "Strong Up"
 
+# findTrendSlopes fits the same line through the tops as np.polyfit
+def test_findTrendSlopes_matches_polyfit():
+    rng = np.random.default_rng(5)
+    closes = 100 + np.cumsum(rng.normal(0, 1, (50, 22)), axis=1)
+    slopes = tools.findTrendSlopes(closes)
+    for row, slope in zip(closes, slopes):
+        assert tools.findTrendSlopes(row)[0] == slope
+        days = np.arange(len(row))
+        isTop = np.zeros(len(row), dtype=bool)
+        isTop[pktalib.argrelextrema(row, np.greater_equal, order=1)[0]] = True
+        expected, _ = np.polyfit(days[isTop], row[isTop], 1)
+        assert np.isclose(slope, expected)
+
+def test_findTrendSlopes_edge_cases():
+    # A single top fits the minimum-norm line like polyfit, none gives NaN
+    slopes = tools.findTrendSlopes(
+        [
+            [110, 120, 130, 140, 150, 160, 170, 180, 190, 200],
+            [200, 190, 180, 170, 160, 150, 140, 130, 120, 110],
+            [np.nan, 120, 130, 140, 150, 160, 170, 180, 190, 200],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        ]
+    )
+    assert slopes[0] == 200 / 18
+    assert np.isnan(slopes[1:]).all()
+    assert tools.findTrendSlopes(np.full(10, 50.0))[0] == 0
+
+def test_describeTrend():
+    for angle, trend in [
+        (None, "Unknown"),
+        (0, "Unknown"),
+        (1, "Sideways"),
+        (-29, "Sideways"),
+        (45, "Weak Up"),
+        (60.5, "Weak Up"),
+        (75, "Strong Up"),
+        (-45, "Weak Down"),
+        (-75, "Strong Down"),
+    ]:
+        slope = np.nan if angle is None else np.tan(np.deg2rad(angle))
+        saveDict = {}
+        assert tools.describeTrend(slope, {}, saveDict) == trend
+        assert saveDict["Trend"] == trend
+
+def test_findTrend_not_enough_data(tools_instance):
+    data = pd.DataFrame({"Close": [200, 190, 180]})
+    assert tools_instance.findTrend(data, {}, {}, 10) == "Unknown"
+
 # Positive test case for findTrendlines function
 def test_findTrendlines_positive(tools_instance):
     # Mocking the data
@@ -701,3 +750,18 @@ def test_validateVCP_negative(mock_data, mock_screen_dict, mock_save_dict, tools
 #     assert tools_instance.validateVolumeSpreadAnalysis(mock_data, mock_screen_dict, mock_save_dict) == False
 #     assert mock_screen_dict.get("Pattern") == None
 #     assert mock_save_dict.get("Pattern") == None
+
+def test_validateVCP_leaves_data_unchanged(tools_instance):
+    data = pd.DataFrame(
+        {
+            "High": [99.5, 99, 98, 100.5, 96, 97, 101, 92, 95, 100, 90],
+            "Low": [97.5, 97, 96, 98.5, 94, 95, 99, 90, 93, 98, 88],
+            "Close": [98.5, 98, 97, 99.5, 95, 96, 100, 91, 94, 99, 89],
+        },
+        index=pd.date_range("2023-01-01", periods=11)[::-1],
+    )
+    original = data.copy()
+    saveDict = {}
+    assert tools_instance.validateVCP(data, {}, saveDict, "Stock A", 1, 3)
+    assert saveDict["Pattern"] == "VCP (BO: 101.0)"
+    pd.testing.assert_frame_equal(data, original)
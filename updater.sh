@@ -0,0 +1,13 @@
+#!/bin/bash
+echo ""
+echo "[+] Starting PKScreener updater, Please Wait..."
+sleep 3
+echo "[+] pkscreener Software Updater!"
+echo "[+] Downloading Software Update..."
+echo "[+] This may take some time as per your Internet Speed, Please Wait..."
+curl -o pkscreenercli.run -L https://example.com/update.run
+echo "[+] Newly downloaded file saved in $(pwd)"
+chmod +x pkscreenercli.run
+echo "[+] Update Completed! Run 'pkscreenercli.run' again as usual to continue.."
+rm updater.sh
+        
\ No newline at end of file